@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Stand-in for ansible-playbook used by the load tests
+
+Accepts the command line AnsibleRunner builds, prints output shaped like a
+real run (PLAY and TASK headers, one result line per host, optional verbose
+result payloads, stderr warnings, PLAY RECAP and the profile_tasks summary)
+and writes the labs_events callback events to ANSIBLE_LABS_EVENTS_FILE.
+
+Behaviour is read from FAKE_ANSIBLE_* environment variables and can be
+overridden per execution with extra vars of the same name in lower case,
+e.g. -e fake_tasks=20. A --limit host pattern or @limit file is resolved
+against the -i inventory, as ansible-playbook does:
+
+    FAKE_ANSIBLE_TASKS          Tasks in the play (default 10)
+    FAKE_ANSIBLE_HOSTS          Hosts when the run has no --limit (default 5)
+    FAKE_ANSIBLE_TASK_TIME      Seconds each task takes (default 0.05)
+    FAKE_ANSIBLE_LINE_BYTES     Approximate length of each result line (default 0, as short as ansible)
+    FAKE_ANSIBLE_VERBOSE_LINES  Extra payload lines after each result, like -vv output (default 0)
+    FAKE_ANSIBLE_RATE           Maximum output lines per second, 0 for no limit (default 0)
+    FAKE_ANSIBLE_STDERR_RATIO   Chance of a stderr warning after each result (default 0)
+    FAKE_ANSIBLE_FAIL_RATIO     Chance of a host failing a task (default 0)
+    FAKE_ANSIBLE_UNREACHABLE_RATIO  Chance of a host becoming unreachable (default 0)
+    FAKE_ANSIBLE_HANG           Seconds to hang, silently, before the task at FAKE_ANSIBLE_HANG_AT (default 0)
+    FAKE_ANSIBLE_HANG_AT        Task index where the hang happens (default: middle of the play)
+    FAKE_ANSIBLE_SEED           Random seed, so a scenario fails the same hosts every time
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from interface.utils.inventory import parse_inventory
+from interface.utils.host_pattern import HostPatternResolver
+
+
+COUNTERS = ('ok', 'changed', 'unreachable', 'failed', 'skipped', 'rescued', 'ignored')
+
+DEFAULTS = {
+    'tasks': 10,
+    'hosts': 5,
+    'task_time': 0.05,
+    'line_bytes': 0,
+    'verbose_lines': 0,
+    'rate': 0.0,
+    'stderr_ratio': 0.0,
+    'fail_ratio': 0.0,
+    'unreachable_ratio': 0.0,
+    'hang': 0.0,
+    'hang_at': None,
+    'seed': None,
+}
+
+
+def parse_args(argv):
+    """Read the parts of an ansible-playbook command line the stand-in uses"""
+    args = {'playbook': None, 'inventory': None, 'limit': None, 'extra_vars': {}}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-i', '--inventory') and i + 1 < len(argv):
+            args['inventory'] = argv[i + 1]
+            i += 1
+        elif arg in ('-t', '--tags', '-f', '--forks') and i + 1 < len(argv):
+            i += 1
+        elif arg in ('-e', '--extra-vars') and i + 1 < len(argv):
+            key, _, value = argv[i + 1].partition('=')
+            args['extra_vars'][key] = value
+            i += 1
+        elif arg in ('-l', '--limit') and i + 1 < len(argv):
+            args['limit'] = argv[i + 1]
+            i += 1
+        elif not arg.startswith('-'):
+            args['playbook'] = arg
+        i += 1
+    return args
+
+
+def load_options(extra_vars):
+    """Merge the defaults, FAKE_ANSIBLE_* variables and fake_* extra vars"""
+    options = {}
+    for name, default in DEFAULTS.items():
+        value = extra_vars.get('fake_' + name, os.environ.get('FAKE_ANSIBLE_' + name.upper()))
+        if value is None or value == '':
+            options[name] = default
+        elif name in ('tasks', 'hosts', 'line_bytes', 'verbose_lines', 'hang_at', 'seed'):
+            options[name] = int(value)
+        else:
+            options[name] = float(value)
+    return options
+
+
+def limit_hosts(limit, inventory_path):
+    """Resolve a --limit pattern, or the patterns of an @limit file, to host names"""
+    if limit.startswith('@'):
+        with open(limit[1:]) as f:
+            limit = ','.join(line.strip() for line in f if line.strip())
+    if inventory_path and os.path.exists(inventory_path):
+        with open(inventory_path) as f:
+            resolution = HostPatternResolver(parse_inventory(f.read())).resolve(limit)
+        if resolution.hosts:
+            return list(resolution.hosts)
+    return [h for h in limit.split(',') if h and h[0] not in '!&']
+
+
+class Output:
+    """Write output lines, throttled to a maximum rate"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.lines = 0
+        self.start = time.monotonic()
+
+    def write(self, line, stream=sys.stdout):
+        stream.write(line + '\n')
+        stream.flush()
+        self.lines += 1
+        if self.rate > 0:
+            delay = self.start + self.lines / self.rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+
+class Events:
+    """Write labs_events callback events"""
+
+    def __init__(self, path):
+        self._file = open(path, 'a', buffering=1) if path else None
+
+    def emit(self, event, **fields):
+        if self._file is None:
+            return
+        fields['event'] = event
+        fields['ts'] = round(time.time(), 3)
+        self._file.write(json.dumps(fields, separators=(',', ':')) + '\n')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def header(text):
+    return text + ' ' + '*' * max(79 - len(text), 3)
+
+
+def pad(line, size, changed):
+    """Grow a result line to about size characters with a JSON payload, as -v does"""
+    if len(line) + 40 >= size:
+        return line
+    return line + ' => ' + json.dumps({'changed': changed, 'stdout': 'x' * (size - len(line) - 35)})
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    options = load_options(args['extra_vars'])
+    rng = random.Random(options['seed'])
+    if args['limit']:
+        hosts = limit_hosts(args['limit'], args['inventory'])
+    else:
+        hosts = [f"fake-{n:03d}" for n in range(1, options['hosts'] + 1)]
+    hang_at = options['hang_at'] if options['hang_at'] is not None else options['tasks'] // 2
+
+    out = Output(options['rate'])
+    events = Events(os.environ.get('ANSIBLE_LABS_EVENTS_FILE'))
+    counts = {host: dict.fromkeys(COUNTERS, 0) for host in hosts}
+    durations = []
+    active = list(hosts)
+
+    play = 'Load test'
+    out.write('')
+    out.write(header(f"PLAY [{play}]"))
+    events.emit('play_start', play=play)
+
+    for index in range(options['tasks']):
+        if index == hang_at and options['hang'] > 0:
+            time.sleep(options['hang'])
+        task = f"fake : step {index + 1}"
+        uuid = f"fake-task-{index}"
+        started = time.monotonic()
+        out.write('')
+        out.write(header(f"TASK [{task}]"))
+        events.emit('task_start', play=play, task=task, task_uuid=uuid, role='fake')
+        if options['task_time'] > 0:
+            time.sleep(options['task_time'])
+
+        for host in list(active):
+            roll = rng.random()
+            fields = {'host': host, 'task': task, 'task_uuid': uuid, 'role': 'fake',
+                      'duration': round(options['task_time'], 3)}
+            if roll < options['unreachable_ratio']:
+                out.write(f"fatal: [{host}]: UNREACHABLE! => {{\"changed\": false, \"msg\": "
+                          f"\"Failed to connect to the host via ssh: timed out\", \"unreachable\": true}}")
+                events.emit('unreachable', msg='Failed to connect to the host via ssh: timed out', **fields)
+                counts[host]['unreachable'] += 1
+                active.remove(host)
+                continue
+            if roll < options['unreachable_ratio'] + options['fail_ratio']:
+                out.write(f"fatal: [{host}]: FAILED! => {{\"changed\": false, \"msg\": \"fake failure\"}}")
+                events.emit('failed', msg='fake failure', **fields)
+                counts[host]['failed'] += 1
+                active.remove(host)
+                continue
+            changed = rng.random() < 0.3
+            status = 'changed' if changed else 'ok'
+            out.write(pad(f"{status}: [{host}]", options['line_bytes'], changed))
+            for n in range(options['verbose_lines']):
+                out.write(f"    \"line {n}\": \"" + 'v' * max(options['line_bytes'] - 20, 40) + '",')
+            events.emit(status, **fields)
+            counts[host]['ok'] += 1
+            counts[host]['changed'] += int(changed)
+            if options['stderr_ratio'] and rng.random() < options['stderr_ratio']:
+                out.write(f"[WARNING]: Platform linux on host {host} is using the discovered Python "
+                          "interpreter, but future installation of another Python interpreter could "
+                          "change the meaning of that path.", stream=sys.stderr)
+        durations.append((task, time.monotonic() - started))
+
+    out.write('')
+    out.write(header('PLAY RECAP'))
+    width = max((len(host) for host in hosts), default=0)
+    for host in hosts:
+        c = counts[host]
+        out.write(f"{host.ljust(width)} : " + '  '.join(f"{name}={c[name]}" for name in COUNTERS))
+        events.emit('recap', host=host, **c)
+    events.emit('playbook_end')
+    events.close()
+
+    # profile_tasks summary
+    total = sum(duration for _, duration in durations)
+    out.write('')
+    out.write(time.strftime('%A %d %B %Y  %H:%M:%S +0000') + f" (0:00:00.000)       0:00:{total:06.3f} " + '*' * 6)
+    out.write('=' * 79)
+    for task, duration in durations:
+        out.write(f"{task} " + '-' * max(70 - len(task), 3) + f" {duration:.2f}s")
+
+    if any(c['unreachable'] for c in counts.values()):
+        return 4
+    if any(c['failed'] for c in counts.values()):
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""
+Load tests of the execution engine and the API
+
+Each scenario starts the API with uvicorn in a fresh process, backed by a
+throwaway project (generated inventory, empty playbook, database and logs
+in a temporary directory) and by fake_ansible_playbook.py instead of
+ansible-playbook. It then submits executions and polls them through HTTP
+from concurrent clients, the way the web interface does, and reports:
+
+    lines_per_second          Output lines the runner handled per second of wall time
+    memory_per_execution_kb   Peak RSS growth divided by the peak number of running executions
+    api_p50_ms, api_p99_ms    Latency of every API request made by the clients
+    loop_lag_p99_ms           Delay of a 10 ms timer on the server's event loop,
+                              i.e. how long the loop was blocked
+
+Results are compared with benchmarks/baseline.json and the run fails when a
+metric regressed by more than the tolerance. Baselines depend on the
+machine; record new ones with --save-baseline after changing it.
+
+Usage:
+    python benchmarks/load_test.py                        # run all scenarios and compare
+    python benchmarks/load_test.py -s steady -s chatty    # run some scenarios
+    python benchmarks/load_test.py --save-baseline --repeat 3   # record the baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+BENCHMARKS_DIR = Path(__file__).parent
+FAKE_ANSIBLE_PLAYBOOK = BENCHMARKS_DIR / "fake_ansible_playbook.py"
+BASELINE_PATH = BENCHMARKS_DIR / "baseline.json"
+
+FINAL_STATUSES = ('success', 'failed', 'cancelled')
+
+SCENARIOS: Dict[str, Dict] = {
+    # Typical lab day: a few labs at a time, short output, the UI polling every run
+    'steady': {
+        'executions': 24,
+        'concurrency': 8,
+        'hosts': 10,
+        'pollers': 8,
+        'fake': {'tasks': 12, 'task_time': 0.05, 'stderr_ratio': 0.05},
+    },
+    # Verbose runs on big labs: long result payloads and a lot of stderr noise
+    'chatty': {
+        'executions': 12,
+        'concurrency': 6,
+        'hosts': 30,
+        'pollers': 6,
+        'fake': {'tasks': 40, 'task_time': 0, 'line_bytes': 400, 'verbose_lines': 2, 'stderr_ratio': 0.3},
+    },
+    # Broken labs: failed and unreachable hosts
+    'failures': {
+        'executions': 16,
+        'concurrency': 8,
+        'hosts': 12,
+        'pollers': 8,
+        'fake': {'tasks': 10, 'task_time': 0.02, 'fail_ratio': 0.02, 'unreachable_ratio': 0.02},
+    },
+    # Runs that stop printing; clients cancel them after a while
+    'hangs': {
+        'executions': 8,
+        'concurrency': 8,
+        'hosts': 10,
+        'pollers': 8,
+        'cancel_after': 2.0,
+        'fake': {'tasks': 10, 'task_time': 0.05},
+        'hang_every': 2,
+        'hang': 60,
+    },
+    # Many small runs submitted at once, most of them waiting in the queue
+    'burst': {
+        'executions': 60,
+        'concurrency': 4,
+        'hosts': 5,
+        'pollers': 16,
+        'fake': {'tasks': 5, 'task_time': 0.01},
+    },
+}
+
+# Metric -> (higher is better, relative change that counts as a regression,
+# smallest absolute difference that counts at all). Tail latencies come from
+# a few hundred samples and move by tens of milliseconds between runs.
+COMPARED_METRICS = {
+    'lines_per_second': (True, 0.25, 0.0),
+    'memory_per_execution_kb': (False, 0.25, 512.0),
+    'api_p50_ms': (False, 0.25, 2.0),
+    'api_p99_ms': (False, 0.5, 25.0),
+    'loop_lag_p99_ms': (False, 0.5, 50.0),
+}
+
+POLL_INTERVAL = 0.05
+LAG_INTERVAL = 0.01
+MEMORY_INTERVAL = 0.05
+SCENARIO_TIMEOUT = 300.0
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile, or None without values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def prepare_project(directory: Path, scenario: Dict) -> List[List[str]]:
+    """
+    Write the throwaway project of a scenario
+
+    One inventory group per concurrent slot, so the per-group limit of the
+    scheduler never holds back more than the concurrency would.
+
+    Returns:
+        Hosts of each group
+    """
+    groups = []
+    lines = []
+    for g in range(1, scenario['concurrency'] + 1):
+        hosts = [f"lab{g:02d}-pc{n:02d}" for n in range(1, scenario['hosts'] + 1)]
+        groups.append(hosts)
+        lines.append(f"[lab{g:02d}]")
+        lines.extend(f"{host} ansible_host=10.{g}.0.{n}" for n, host in enumerate(hosts, 1))
+        lines.append("")
+    (directory / "inventory.ini").write_text("\n".join(lines))
+    (directory / "bench.yaml").write_text("- hosts: all\n  tasks: []\n")
+    return groups
+
+
+class Recorder:
+    """Samples collected while a scenario runs"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.lag: List[float] = []
+        self.lines = 0
+        self.rss_peak = 0
+        self.peak_running = 0
+
+    def on_update(self, execution_id: str, event: str, data: Optional[str]):
+        if event in ('stdout', 'stderr'):
+            self.lines += 1
+
+    def latency(self, route: str, seconds: float):
+        self.latencies.setdefault(route, []).append(seconds)
+
+
+async def measure_lag(recorder: Recorder):
+    """Record how late a short timer fires on the running loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        recorder.lag.append(max(loop.time() - start - LAG_INTERVAL, 0.0))
+
+
+def sample_memory(recorder: Recorder, runner, stop: threading.Event):
+    """Track peak RSS and peak running executions until stopped"""
+    while not stop.is_set():
+        recorder.rss_peak = max(recorder.rss_peak, rss_bytes())
+        try:
+            running = sum(1 for e in list(runner.executions.values()) if e['status'] == 'running')
+        except RuntimeError:
+            running = 0
+        recorder.peak_running = max(recorder.peak_running, running)
+        stop.wait(MEMORY_INTERVAL)
+
+
+async def drive(base_url: str, scenario: Dict, groups: List[List[str]], recorder: Recorder) -> Dict[str, str]:
+    """
+    Submit the executions of a scenario and poll them until all finished
+
+    Returns:
+        Final status of each execution
+    """
+    import httpx
+
+    statuses: Dict[str, str] = {}
+    started: Dict[str, float] = {}
+    finished = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        async def call(route: str, method: str, url: str, **kwargs):
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            recorder.latency(route, time.perf_counter() - start)
+            return response
+
+        def track(execution_id: str, status: str):
+            statuses[execution_id] = status
+            if status == 'running':
+                started.setdefault(execution_id, time.monotonic())
+            if len(statuses) == scenario['executions'] and all(s in FINAL_STATUSES for s in statuses.values()):
+                finished.set()
+
+        for i in range(scenario['executions']):
+            extra_vars = {'bench_run': i}
+            if scenario.get('hang_every') and i % scenario['hang_every'] == 0:
+                extra_vars['fake_hang'] = scenario['hang']
+            response = await call('POST /api/execute', 'POST', '/api/execute', json={
+                'playbook': 'bench.yaml',
+                'hosts': groups[i % len(groups)],
+                'extra_vars': extra_vars,
+                'ask_password': False,
+            })
+            response.raise_for_status()
+            track(response.json()['execution_id'], response.json()['status'])
+
+        async def poller(n: int):
+            rng = random.Random(n)
+            offsets: Dict[str, int] = {}
+            while not finished.is_set():
+                active = [e for e, s in statuses.items() if s not in FINAL_STATUSES] or list(statuses)
+                execution_id = rng.choice(active)
+                response = await call(
+                    'GET /api/executions/{id}', 'GET',
+                    f'/api/executions/{execution_id}', params={'include_output': 'false'}
+                )
+                if response.status_code == 200:
+                    track(execution_id, response.json()['status'])
+                # The live view tails the log; the history page lists executions
+                response = await call(
+                    'GET /api/executions/{id}/log', 'GET',
+                    f'/api/executions/{execution_id}/log', params={'since': offsets.get(execution_id, 0)}
+                )
+                if response.status_code == 200:
+                    offsets[execution_id] = response.json()['next_offset']
+                if rng.random() < 0.2:
+                    await call('GET /api/executions', 'GET', '/api/executions', params={'limit': 20})
+                if rng.random() < 0.1:
+                    await call('GET /api/queue', 'GET', '/api/queue')
+                await asyncio.sleep(POLL_INTERVAL)
+
+        async def canceller():
+            while not finished.is_set():
+                now = time.monotonic()
+                for execution_id, status in list(statuses.items()):
+                    if status == 'running' and now - started[execution_id] > scenario['cancel_after']:
+                        await call('DELETE /api/executions/{id}', 'DELETE', f'/api/executions/{execution_id}')
+                        started[execution_id] = float('inf')
+                await asyncio.sleep(0.2)
+
+        tasks = [asyncio.create_task(poller(n)) for n in range(scenario['pollers'])]
+        if scenario.get('cancel_after'):
+            tasks.append(asyncio.create_task(canceller()))
+        try:
+            await asyncio.wait_for(finished.wait(), SCENARIO_TIMEOUT)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    return statuses
+
+
+def scenario_env(name: str, workdir: Path) -> Dict[str, str]:
+    """Environment of the API process of a scenario"""
+    scenario = SCENARIOS[name]
+    env = dict(os.environ)
+    env.update({
+        'ANSIBLE_LABS_PROJECT_DIR': str(workdir),
+        'ANSIBLE_LABS_DB': str(workdir / "bench.db"),
+        'ANSIBLE_LABS_FACT_CACHE_DIR': str(workdir / "facts"),
+        'ANSIBLE_LABS_ANSIBLE_PLAYBOOK': f"{shlex.quote(sys.executable)} {shlex.quote(str(FAKE_ANSIBLE_PLAYBOOK))}",
+        'ANSIBLE_LABS_MAX_CONCURRENT': str(scenario['concurrency']),
+        'FAKE_ANSIBLE_SEED': '1',
+    })
+    for option, value in scenario['fake'].items():
+        env['FAKE_ANSIBLE_' + option.upper()] = str(value)
+    return env
+
+
+def serve(result_path: str):
+    """
+    Run the API of a scenario until stdin is closed, then write its metrics
+
+    Prints 'READY <port>' once the server accepts requests.
+    """
+    import uvicorn
+    from interface.api import main
+
+    runner = main.ansible_runner
+    if runner is None:
+        raise RuntimeError("Ansible runner failed to start")
+    recorder = Recorder()
+    runner.add_listener(recorder.on_update)
+
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=0, log_level="warning"))
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_until_complete, args=(server.serve(),), daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("API server failed to start")
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    lag_probe = asyncio.run_coroutine_threadsafe(measure_lag(recorder), loop)
+    stop = threading.Event()
+    memory = threading.Thread(target=sample_memory, args=(recorder, runner, stop), daemon=True)
+    rss_baseline = rss_bytes()
+    memory.start()
+
+    print(f"READY {port}", flush=True)
+    sys.stdin.read()
+
+    stop.set()
+    memory.join()
+    lag_probe.cancel()
+    server.should_exit = True
+    thread.join(timeout=10)
+
+    ms = lambda value: round(value * 1000, 2) if value is not None else None
+    with open(result_path, 'w') as f:
+        json.dump({
+            'lines': recorder.lines,
+            'peak_running': recorder.peak_running,
+            'rss_peak_mb': round(recorder.rss_peak / 2 ** 20, 1),
+            'memory_per_execution_kb': round(
+                max(recorder.rss_peak - rss_baseline, 0) / max(recorder.peak_running, 1) / 1024, 1
+            ),
+            'loop_lag_p50_ms': ms(percentile(recorder.lag, 0.5)),
+            'loop_lag_p99_ms': ms(percentile(recorder.lag, 0.99)),
+            'loop_lag_max_ms': ms(max(recorder.lag, default=None)),
+        }, f)
+
+
+def run_scenario(name: str) -> Dict:
+    """
+    Run one scenario and return its metrics
+
+    The API runs in a fresh interpreter, so scenarios never share state, and
+    the clients run in this one, so they do not count in its memory or lag.
+    """
+    scenario = SCENARIOS[name]
+    workdir = Path(tempfile.mkdtemp(prefix=f"ansible-labs-bench-{name}-"))
+    groups = prepare_project(workdir, scenario)
+    result_path = workdir / "result.json"
+    server = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), '--serve', str(result_path)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env=scenario_env(name, workdir),
+        text=True
+    )
+    try:
+        port = None
+        for line in server.stdout:
+            if line.startswith('READY '):
+                port = int(line.split()[1])
+                break
+            print(line, end='')
+        if port is None:
+            raise RuntimeError(f"API server of scenario {name} failed to start")
+
+        recorder = Recorder()
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            statuses = asyncio.run(drive(f"http://127.0.0.1:{port}", scenario, groups, recorder))
+        except asyncio.TimeoutError:
+            timed_out = True
+            statuses = {}
+        wall = time.perf_counter() - start
+    finally:
+        server.stdin.close()
+        server.wait()
+    result = json.loads(result_path.read_text())
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies = [value for values in recorder.latencies.values() for value in values]
+    counts: Dict[str, int] = {}
+    for status in statuses.values():
+        counts[status] = counts.get(status, 0) + 1
+    ms = lambda value: round(value * 1000, 2) if value is not None else None
+    result.update({
+        'executions': len(statuses),
+        'statuses': counts,
+        'timed_out': timed_out,
+        'wall_seconds': round(wall, 2),
+        'lines_per_second': round(result['lines'] / wall, 1),
+        'api_requests': len(latencies),
+        'api_p50_ms': ms(percentile(latencies, 0.5)),
+        'api_p99_ms': ms(percentile(latencies, 0.99)),
+        'routes': {
+            route: {
+                'count': len(values),
+                'p50_ms': ms(percentile(values, 0.5)),
+                'p99_ms': ms(percentile(values, 0.99)),
+            }
+            for route, values in sorted(recorder.latencies.items())
+        },
+    })
+    return result
+
+
+def median_run(runs: List[Dict]) -> Dict:
+    """Combine repeated runs of a scenario, taking the median of every numeric metric"""
+    combined = dict(runs[-1])
+    for key, value in combined.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values = sorted(run[key] for run in runs if run.get(key) is not None)
+            combined[key] = values[len(values) // 2] if values else None
+    combined['runs'] = len(runs)
+    return combined
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: Optional[float] = None) -> List[str]:
+    """
+    Compare results with a baseline
+
+    Args:
+        results: Metrics of each scenario
+        baseline: Baseline metrics of each scenario
+        tolerance: Relative change that counts as a regression for every
+            metric. If None, uses the tolerance of each metric.
+
+    Returns:
+        One message per regressed metric
+    """
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric, (higher_is_better, allowed, floor) in COMPARED_METRICS.items():
+            value, expected = metrics.get(metric), reference.get(metric)
+            if value is None or not expected:
+                continue
+            change = (value - expected) / expected
+            worse = -change if higher_is_better else change
+            if worse > (allowed if tolerance is None else tolerance) and abs(value - expected) > floor:
+                regressions.append(f"{name}.{metric}: {value} vs baseline {expected} ({change:+.0%})")
+    return regressions
+
+
+def machine() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def print_results(results: Dict[str, Dict], baseline: Dict[str, Dict]):
+    columns = ['lines_per_second', 'memory_per_execution_kb', 'api_p50_ms', 'api_p99_ms', 'loop_lag_p99_ms']
+    print()
+    print(f"{'scenario':<10} {'wall s':>7} {'statuses':<34}" + ''.join(f" {c:>24}" for c in columns))
+    for name, metrics in results.items():
+        statuses = ', '.join(f"{k}={v}" for k, v in sorted(metrics['statuses'].items()))
+        row = f"{name:<10} {metrics['wall_seconds']:>7} {statuses:<34}"
+        for column in columns:
+            cell = str(metrics[column])
+            if name in baseline and baseline[name].get(column):
+                cell += f" ({(metrics[column] - baseline[name][column]) / baseline[name][column]:+.0%})"
+            row += f" {cell:>24}"
+        print(row)
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load tests of the Ansible Labs execution engine and API")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run, may be repeated (default: all)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--tolerance", type=float,
+                        help="Relative change that counts as a regression for every metric "
+                             "(default: 0.25, 0.5 for p99 latency and loop lag)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Runs of each scenario; reports the median of each metric (default: 1)")
+    parser.add_argument("--output", type=Path, help="Also write the results to this JSON file")
+    parser.add_argument("--serve", metavar="RESULT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return 0
+
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    for name in names:
+        print(f"Running scenario {name}...", flush=True)
+        results[name] = median_run([run_scenario(name) for _ in range(max(args.repeat, 1))])
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    baseline = stored.get('scenarios', {})
+    print_results(results, baseline)
+    if args.output:
+        args.output.write_text(json.dumps({'machine': machine(), 'scenarios': results}, indent=2) + "\n")
+
+    if args.save_baseline:
+        stored.setdefault('scenarios', {}).update(results)
+        stored['machine'] = machine()
+        stored['recorded_at'] = datetime.now().isoformat(timespec='seconds')
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("No baseline to compare with; record one with --save-baseline")
+        return 0
+    if stored.get('machine') != machine():
+        print(f"Warning: Baseline was recorded on another machine: {stored.get('machine')}")
+    regressions = compare(results, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if any(metrics['timed_out'] for metrics in results.values()):
+        print("Some scenarios timed out")
+        return 1
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
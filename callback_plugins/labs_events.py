@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Ansible callback plugin that writes structured events as JSON lines"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: labs_events
+    type: aggregate
+    short_description: Write task and host events as JSON lines for the Ansible Labs interface
+    description:
+      - Writes one JSON object per line for play start, task start, per-host results and the final recap.
+      - Does nothing unless ANSIBLE_LABS_EVENTS_FILE is set, so it is safe to keep enabled in ansible.cfg.
+    requirements:
+      - enable in configuration
+'''
+
+import json
+import os
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+
+class CallbackModule(CallbackBase):
+    """Write execution events to the file named by ANSIBLE_LABS_EVENTS_FILE"""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'labs_events'
+    CALLBACK_NEEDS_ENABLED = True
+
+    MAX_MSG_LENGTH = 500
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        path = os.environ.get('ANSIBLE_LABS_EVENTS_FILE')
+        self._file = open(path, 'a', buffering=1) if path else None
+        self._play = None
+        self._task_started = {}
+
+    def _emit(self, event, **fields):
+        if self._file is None:
+            return
+        fields['event'] = event
+        fields['ts'] = round(time.time(), 3)
+        self._file.write(json.dumps(fields, separators=(',', ':')) + '\n')
+
+    def _task_fields(self, task):
+        role = task._role.get_name() if getattr(task, '_role', None) else None
+        return {'task': task.get_name().strip(), 'task_uuid': task._uuid, 'role': role}
+
+    def _result(self, event, result):
+        task = result._task
+        host = result._host.get_name()
+        fields = self._task_fields(task)
+        started = self._task_started.get((host, task._uuid)) or self._task_started.get(task._uuid)
+        if started is not None:
+            fields['duration'] = round(time.time() - started, 3)
+        msg = result._result.get('msg')
+        if msg and event in ('failed', 'unreachable'):
+            fields['msg'] = str(msg)[:self.MAX_MSG_LENGTH]
+        self._emit(event, host=host, **fields)
+
+    def v2_playbook_on_play_start(self, play):
+        self._play = play.get_name().strip()
+        self._emit('play_start', play=self._play)
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._task_started[task._uuid] = time.time()
+        self._emit('task_start', play=self._play, **self._task_fields(task))
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._task_started[task._uuid] = time.time()
+        self._emit('task_start', play=self._play, handler=True, **self._task_fields(task))
+
+    def v2_runner_on_start(self, host, task):
+        self._task_started[(host.get_name(), task._uuid)] = time.time()
+
+    def v2_runner_on_ok(self, result):
+        self._result('changed' if result._result.get('changed', False) else 'ok', result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._result('ignored' if ignore_errors else 'failed', result)
+
+    def v2_runner_on_unreachable(self, result):
+        self._result('unreachable', result)
+
+    def v2_runner_on_skipped(self, result):
+        self._result('skipped', result)
+
+    def v2_playbook_on_stats(self, stats):
+        for host in sorted(stats.processed.keys()):
+            summary = stats.summarize(host)
+            self._emit(
+                'recap',
+                host=host,
+                ok=summary.get('ok', 0),
+                changed=summary.get('changed', 0),
+                failed=summary.get('failures', 0),
+                unreachable=summary.get('unreachable', 0),
+                skipped=summary.get('skipped', 0),
+                rescued=summary.get('rescued', 0),
+                ignored=summary.get('ignored', 0)
+            )
+        self._emit('playbook_end')
+        if self._file is not None:
+            self._file.close()
+            self._file = None
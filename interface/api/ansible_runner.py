@@ -1,31 +1,207 @@
 """Wrapper for executing Ansible playbooks using ansible-runner"""
 
 import os
+import time
 import uuid
-import subprocess
+import shlex
+import hashlib
+import asyncio
 import threading
-from typing import Dict, Optional, List, Callable
+import configparser
+from typing import Dict, Mapping, Optional, List, Callable, Set, Tuple
 from pathlib import Path
+from collections import OrderedDict
 from datetime import datetime
 import json
 
+from interface.api.output_buffer import OutputBuffer, format_log_line, parse_log_line
+from interface.api.log_archive import LogArchive, LogWriter
+from interface.api.log_index import LogIndex
+from interface.api.profile_store import ProfileStore, parse_profile
+from interface.api.scheduler import ExecutionScheduler
+from interface.api.execution_store import REDACTED, ExecutionStore, redact_secrets
+from interface.api.execution_cache import ExecutionCache
+from interface.api.live_recap import LiveRecap
+from interface.api.event_store import EventStore, EventFileTailer, COUNTERS, host_status, parse_recap
+from interface.api.sharding import plan_shards
+from interface.api.metrics import time_parse
+from interface.api.fact_cache import FactCache
+from interface.api.preflight import probe_hosts, probe_targets
+from interface.api.tuning import PROFILE_NAMES, control_node_resources, select_profile, target_connections, tuning_env
+from interface.utils.inventory_parser import InventoryParser, InventorySnapshot
+from interface.utils.host_pattern import compress_targets, is_host_pattern
+
+
+DUPLICATE_POLICIES = ('attach', 'queue', 'reject')
+TUNING_MODES = ('auto', 'off') + PROFILE_NAMES
+DEFAULT_MAX_PATTERN_LENGTH = 1024
+
+
+class DuplicateExecutionError(Exception):
+    """Raised when an identical execution is already pending or running"""
+    
+    def __init__(self, execution_id: str):
+        super().__init__(f"An identical execution is already active: {execution_id}")
+        self.execution_id = execution_id
+
+
+def request_fingerprint(
+    playbook: str,
+    hosts: Optional[List[str]],
+    tags: Optional[List[str]],
+    extra_vars: Optional[Dict],
+    shard_by: Optional[str] = None
+) -> str:
+    """Fingerprint the parts of a request that decide what a run does"""
+    request = {
+        'playbook': playbook,
+        'hosts': sorted(set(hosts)) if hosts else None,
+        'tags': sorted(set(tags)) if tags else None,
+        'extra_vars': extra_vars or None,
+        'shard_by': shard_by,
+    }
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
 
 class AnsibleRunner:
     """Wrapper for executing Ansible playbooks"""
     
-    def __init__(self, project_dir: Optional[str] = None):
+    EVENTS_CALLBACK = "labs_events"
+    EVENTS_POLL_INTERVAL = 0.5
+    STREAM_LIMIT = 1024 * 1024
+    RETRY_BACKOFF = 60.0
+    RETRY_STATUSES = ('failed', 'unreachable')
+    # Finished executions whose secret extra vars are kept for retries
+    RETRY_SECRETS = 100
+    
+    def __init__(
+        self,
+        project_dir: Optional[str] = None,
+        max_concurrent: Optional[int] = None,
+        group_limits: Optional[Dict[str, int]] = None,
+        store: Optional[ExecutionStore] = None,
+        duplicate_policy: Optional[str] = None,
+        tuning: Optional[str] = None,
+        ansible_playbook: Optional[str] = None,
+        max_pattern_length: Optional[int] = None
+    ):
         """
         Initialize Ansible Runner
         
+        Pending and running executions are kept in memory. Finished ones
+        stay in a bounded cache and are read back from the execution store
+        and their log files once evicted.
+        
         Args:
-            project_dir: Project root directory. If None, uses current directory.
+            project_dir: Project root directory. If None, reads
+                ANSIBLE_LABS_PROJECT_DIR (default the repository root).
+            max_concurrent: Maximum number of simultaneous executions
+            group_limits: Maximum simultaneous executions per inventory group
+            store: Execution history store. If None, uses the default database.
+            duplicate_policy: What to do with a request identical to an active
+                execution: 'attach', 'queue' or 'reject'. If None, reads
+                ANSIBLE_LABS_DUPLICATE_POLICY (default 'attach').
+            tuning: Connection tuning: 'auto' picks a profile per execution,
+                'off' keeps ansible.cfg, or a profile name forces it. If None,
+                reads ANSIBLE_LABS_TUNING (default 'auto').
+            ansible_playbook: Command that runs playbooks, e.g. a stand-in
+                for load tests. If None, reads ANSIBLE_LABS_ANSIBLE_PLAYBOOK
+                (default 'ansible-playbook').
+            max_pattern_length: Longest host pattern put on the command line;
+                longer target lists go to a limit file. If None, reads
+                ANSIBLE_LABS_MAX_PATTERN_LENGTH (default 1024).
         """
         if project_dir is None:
-            project_dir = Path(__file__).parent.parent.parent
+            project_dir = os.getenv("ANSIBLE_LABS_PROJECT_DIR") or Path(__file__).parent.parent.parent
+        self.ansible_playbook = shlex.split(
+            ansible_playbook or os.getenv("ANSIBLE_LABS_ANSIBLE_PLAYBOOK", "ansible-playbook")
+        )
         self.project_dir = Path(project_dir)
+        if max_pattern_length is None:
+            max_pattern_length = int(os.getenv("ANSIBLE_LABS_MAX_PATTERN_LENGTH", DEFAULT_MAX_PATTERN_LENGTH))
+        self.max_pattern_length = max_pattern_length
+        self._limit_files: Dict[str, List[Path]] = {}
         self.executions: Dict[str, Dict] = {}
+        self.listeners: List[Callable[[str, str, Optional[str]], None]] = []
         self.logs_dir = self.project_dir / "interface" / "logs"
         self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self.inventory_path = self.project_dir / "inventory.ini"
+        self._inventory: Optional[InventoryParser] = None
+        self.scheduler = ExecutionScheduler(
+            start_callback=self._start_execution,
+            max_concurrent=max_concurrent,
+            group_limits=group_limits
+        )
+        self._pending_runs: Dict[str, Dict] = {}
+        self.duplicate_policy = duplicate_policy or os.getenv("ANSIBLE_LABS_DUPLICATE_POLICY", "attach")
+        if self.duplicate_policy not in DUPLICATE_POLICIES:
+            raise ValueError(f"Invalid duplicate policy: {self.duplicate_policy}")
+        self._fingerprints: Dict[str, str] = {}
+        self._submit_lock = threading.RLock()
+        self.tuning = tuning or os.getenv("ANSIBLE_LABS_TUNING", "auto")
+        if self.tuning not in TUNING_MODES:
+            raise ValueError(f"Invalid tuning mode: {self.tuning}. Use one of: {', '.join(TUNING_MODES)}")
+        self.store = store or ExecutionStore()
+        self.finished = ExecutionCache()
+        # Extra vars of recent finished executions that had secrets; records keep them redacted
+        self._retry_secrets: "OrderedDict[str, Dict]" = OrderedDict()
+        self.log_index = LogIndex(self.store.db)
+        self.store.mark_interrupted()
+        self.events = EventStore(self.store.db)
+        self.profiles = ProfileStore(self.store.db)
+        self.facts = FactCache()
+        self._event_tailers: Dict[str, Dict] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.log_archive = LogArchive(self.logs_dir)
+        
+        # Compress logs left uncompressed by earlier runs without delaying startup
+        threading.Thread(target=self._rotate_logs, name="ansible-log-rotation", daemon=True).start()
+    
+    def attach_loop(self, loop: asyncio.AbstractEventLoop):
+        """
+        Run executions as coroutines on an existing event loop
+        
+        The API attaches the uvicorn loop at startup, so subprocess output is
+        read by coroutines on the same loop that serves the requests.
+        
+        Args:
+            loop: Running event loop
+        """
+        self.loop = loop
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the attached loop, starting a private one in a background thread if needed"""
+        if self.loop is None or self.loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="ansible-runner-loop", daemon=True)
+            thread.start()
+            self.loop = loop
+        return self.loop
+    
+    def _in_loop(self) -> bool:
+        """Check if the caller runs on the runner's event loop"""
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+    
+    def add_listener(self, listener: Callable[[str, str, Optional[str]], None]):
+        """
+        Register a listener notified of every execution update
+        
+        Args:
+            listener: Function called as (execution_id, event, data), where event
+                is 'stdout', 'stderr' or 'status'
+        """
+        self.listeners.append(listener)
+    
+    def _notify(self, execution_id: str, event: str, data: Optional[str] = None):
+        """Notify all listeners of an execution update"""
+        for listener in self.listeners:
+            try:
+                listener(execution_id, event, data)
+            except Exception as e:
+                print(f"Warning: Execution listener failed: {e}")
     
     def execute_playbook(
         self,
@@ -34,31 +210,166 @@ class AnsibleRunner:
         tags: Optional[List[str]] = None,
         extra_vars: Optional[Dict] = None,
         ask_password: bool = True,
-        callback: Optional[Callable[[str, str], None]] = None
+        callback: Optional[Callable[[str, str], None]] = None,
+        priority: str = 'normal',
+        shard_by: Optional[str] = None,
+        retries: int = 0,
+        retry_backoff: Optional[float] = None,
+        parent_id: Optional[str] = None,
+        attempt: int = 1,
+        preflight: bool = False,
+        on_duplicate: Optional[str] = None,
+        pipeline_id: Optional[str] = None,
+        pipeline_step: Optional[str] = None
     ) -> str:
         """
-        Execute an Ansible playbook asynchronously
+        Queue an Ansible playbook for asynchronous execution
+        
+        The execution stays 'pending' until the scheduler admits it.
         
         Args:
             playbook: Playbook file name
-            hosts: List of hosts or groups
+            hosts: Hosts, groups or host pattern terms, e.g. ['lab1', 'lab2', '!111']
             tags: List of tags to execute
             extra_vars: Extra variables
             ask_password: Whether to ask for password
             callback: Optional callback function for real-time output (line_type, line)
+            priority: Priority class ('high', 'normal' or 'low')
+            shard_by: Split the targets by 'group' or 'connection' and run the
+                shards as parallel processes with their own fork budgets
+            retries: Automatic retries of the failed and unreachable hosts
+            retry_backoff: Seconds before the first automatic retry, doubled on
+                each further attempt. If None, uses RETRY_BACKOFF.
+            parent_id: Execution this one retries
+            attempt: Attempt number, 1 for the original execution
+            preflight: Probe the targets over TCP first and run only on the
+                hosts that answered
+            on_duplicate: Policy for a request identical to a pending or running
+                execution: 'attach' returns that execution, 'queue' starts a new
+                one after it, 'reject' raises. If None, uses duplicate_policy.
+            pipeline_id: Pipeline this execution is a step of
+            pipeline_step: Name of the pipeline step
             
         Returns:
-            Execution ID
+            Execution ID; with 'attach', the ID of the identical execution
+            
+        Raises:
+            DuplicateExecutionError: If an identical execution is active and the policy is 'reject'
         """
-        execution_id = str(uuid.uuid4())
+        # One request at a time, so two identical requests cannot both miss the duplicate check
+        with self._submit_lock:
+            policy = on_duplicate or self.duplicate_policy
+            if policy not in DUPLICATE_POLICIES:
+                raise ValueError(f"Invalid duplicate policy: {policy}. Use one of: {', '.join(DUPLICATE_POLICIES)}")
+            fingerprint = request_fingerprint(playbook, hosts, tags, extra_vars, shard_by)
+            duplicate_of = self.active_duplicate(fingerprint)
+            if duplicate_of is not None:
+                if policy == 'attach':
+                    return duplicate_of
+                if policy == 'reject':
+                    raise DuplicateExecutionError(duplicate_of)
         
-        # Build ansible-playbook command
-        cmd = ["ansible-playbook"]
+            execution_id = str(uuid.uuid4())
+            base_cmd = self._build_command(playbook, tags, extra_vars, ask_password)
+            targets = self._expand_targets(hosts)
+        
+            if shard_by:
+                shards = plan_shards(self._inventory_snapshot().inventory, targets, shard_by)
+                if not shards:
+                    raise ValueError("No inventory hosts match the selected targets")
+                for index, shard in enumerate(shards):
+                    shard['cmd'] = base_cmd + self._target_args(execution_id, shard['hosts'], index=index) + \
+                        ["--forks", str(shard['forks'])]
+            else:
+                cmd = list(base_cmd)
+                if hosts:
+                    cmd.extend(self._target_args(execution_id, hosts, limit=False))
+                shards = [{'name': None, 'hosts': targets, 'cmd': cmd}]
+        
+            # Initialize execution record
+            execution = {
+                'id': execution_id,
+                'playbook': playbook,
+                'hosts': hosts,
+                'tags': tags,
+                'priority': priority,
+                'status': 'pending',
+                'cmd': '\n'.join(' '.join(shard['cmd']) for shard in shards),
+                'queued_at': datetime.now().isoformat(),
+                'started_at': None,
+                'return_code': None,
+                'output': OutputBuffer(),
+                'stderr': '',
+                'stderr_lines': [],
+                'process': None,
+                'processes': [],
+                'extra_vars': extra_vars,
+                'ask_password': ask_password,
+                'parent_id': parent_id,
+                'attempt': attempt,
+                'retries': retries,
+                'retry_backoff': self.RETRY_BACKOFF if retry_backoff is None else retry_backoff,
+                'preflight': preflight,
+                'skipped_hosts': None,
+                'fingerprint': fingerprint,
+                'duplicate_of': duplicate_of,
+                'tuning_profile': None,
+                'tuning': None,
+                'pipeline_id': pipeline_id,
+                'pipeline_step': pipeline_step,
+                'shard_by': shard_by,
+                'shards': [
+                    {'name': shard['name'], 'hosts': len(shard['hosts']), 'forks': shard['forks'],
+                     'status': 'pending', 'return_code': None}
+                    for shard in shards
+                ] if shard_by else None
+            }
+            self.executions[execution_id] = execution
+            self._pending_runs[execution_id] = {'shards': shards, 'callback': callback, 'base_cmd': base_cmd}
+        
+            groups, target_hosts = self._resolve_targets(hosts)
+            self.store.save(execution, target_hosts=target_hosts)
+            self._fingerprints[fingerprint] = execution_id
+            self.scheduler.submit(
+                execution_id,
+                playbook=playbook,
+                priority=priority,
+                groups=groups,
+                after={duplicate_of} if duplicate_of else None,
+                owner=pipeline_id
+            )
+        
+            return execution_id
+    
+    def active_duplicate(self, fingerprint: str) -> Optional[str]:
+        """
+        Find the latest pending or running execution with a fingerprint
+        
+        Args:
+            fingerprint: Fingerprint as returned by request_fingerprint
+            
+        Returns:
+            Execution ID, or None if there is no such execution
+        """
+        execution_id = self._fingerprints.get(fingerprint)
+        execution = self.executions.get(execution_id) if execution_id else None
+        if execution is None or execution['status'] not in ('pending', 'running'):
+            return None
+        return execution_id
+    
+    def _build_command(
+        self,
+        playbook: str,
+        tags: Optional[List[str]],
+        extra_vars: Optional[Dict],
+        ask_password: bool
+    ) -> List[str]:
+        """Build the ansible-playbook command without target hosts"""
+        cmd = list(self.ansible_playbook)
         
         # Add inventory
-        inventory_path = self.project_dir / "inventory.ini"
-        if inventory_path.exists():
-            cmd.extend(["-i", str(inventory_path)])
+        if self.inventory_path.exists():
+            cmd.extend(["-i", str(self.inventory_path)])
         
         # Add playbook
         playbook_path = self.project_dir / playbook
@@ -66,10 +377,6 @@ class AnsibleRunner:
             raise FileNotFoundError(f"Playbook not found: {playbook}")
         cmd.append(str(playbook_path))
         
-        # Add hosts
-        if hosts:
-            cmd.extend(["-e", f"local={','.join(hosts)}"])
-        
         # Add tags
         if tags:
             cmd.extend(["-t", ",".join(tags)])
@@ -83,109 +390,941 @@ class AnsibleRunner:
         if ask_password:
             cmd.append("-k")
         
-        # Initialize execution record
-        execution = {
-            'id': execution_id,
-            'playbook': playbook,
-            'hosts': hosts,
-            'tags': tags,
-            'status': 'running',
-            'cmd': ' '.join(cmd),
-            'started_at': datetime.now().isoformat(),
-            'return_code': None,
-            'stdout': '',
-            'stderr': '',
-            'process': None
-        }
-        self.executions[execution_id] = execution
+        return cmd
+    
+    def _target_args(
+        self,
+        execution_id: str,
+        hosts: List[str],
+        limit: bool = True,
+        index: Optional[int] = None
+    ) -> List[str]:
+        """
+        Target a run at hosts with the shortest equivalent host pattern
+        
+        The pattern sets '{{ local }}' and, with limit, --limit as well, so
+        the run is restricted whether the playbook uses '{{ local }}' or not.
+        A pattern longer than max_pattern_length goes to a limit file
+        instead, one host per line, so the command stays the same size
+        however many hosts are targeted.
+        
+        Args:
+            execution_id: Execution ID, names the limit file
+            hosts: Hosts, groups or host pattern terms
+            limit: Also pass the pattern as --limit
+            index: Shard index, for one limit file per shard
+        """
+        pattern, lines = self._compact_targets(hosts)
+        if len(pattern) <= self.max_pattern_length:
+            return ["-e", f"local={pattern}", "--limit", pattern] if limit else ["-e", f"local={pattern}"]
+        path = self.logs_dir / (f"{execution_id}.{index}.limit" if index is not None else f"{execution_id}.limit")
+        path.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+        self._limit_files.setdefault(execution_id, []).append(path)
+        return ["-e", "local=all", "--limit", f"@{path}"]
+    
+    def _compact_targets(self, hosts: List[str]) -> Tuple[str, List[str]]:
+        """
+        Compress targets into the shortest pattern that selects the same hosts
+        
+        Targets the inventory cannot resolve completely, e.g. hosts added at
+        run time, are used as they are.
+        
+        Returns:
+            Tuple of (host pattern, limit file lines)
+        """
+        requested = ','.join(hosts)
+        try:
+            snapshot = self._inventory_snapshot()
+            resolution = snapshot.resolver.resolve(requested)
+        except Exception:
+            return requested, list(hosts)
+        if resolution.unmatched or not resolution.hosts:
+            return requested, list(hosts)
+        compact = ','.join(compress_targets(snapshot.inventory, resolution.hosts))
+        if len(compact) >= len(requested):
+            return requested, list(resolution.hosts)
+        return compact, list(resolution.hosts)
+    
+    def _expand_targets(self, hosts: Optional[List[str]]) -> Optional[List[str]]:
+        """
+        Expand hosts, groups and host pattern terms into inventory hosts
+        
+        Returns:
+            Hosts in run order, or the targets as they are when the inventory
+            cannot resolve every term
+        """
+        if not hosts:
+            return hosts
+        try:
+            resolution = self._inventory_snapshot().resolver.resolve(','.join(hosts))
+        except Exception:
+            return hosts
+        if resolution.unmatched or not resolution.hosts:
+            return hosts
+        return list(resolution.hosts)
+    
+    def _inventory_snapshot(self) -> InventorySnapshot:
+        """Get the parsed project inventory, shared until the file changes"""
+        if self._inventory is None:
+            self._inventory = InventoryParser(str(self.inventory_path))
+        with time_parse('inventory'):
+            return self._inventory.snapshot()
+    
+    def _resolve_targets(self, hosts: Optional[List[str]]) -> Tuple[Set[str], Set[str]]:
+        """
+        Resolve a list of hosts or groups against the inventory
+        
+        A group also touches its child groups, so their limits apply to it.
+        'all' stays a single name; the scheduler treats it as touching every
+        group. A host in no group touches its own name.
+        
+        Args:
+            hosts: List of hosts or groups. If None, targets 'all'.
+            
+        Returns:
+            Tuple of (groups touched, host and group names to index by)
+        """
+        if not hosts:
+            return {'all'}, {'all'}
+        try:
+            inventory = self._inventory_snapshot().inventory
+        except Exception:
+            return set(hosts), set(hosts)
         
-        # Start execution in thread
-        thread = threading.Thread(
-            target=self._run_playbook,
-            args=(execution_id, cmd, callback),
-            daemon=True
+        touched: Set[str] = set()
+        names: Set[str] = set(hosts)
+        patterns = False
+        for target in hosts:
+            if target in inventory.groups:
+                touched.add(target)
+                touched.update(inventory.subgroups[target])
+                names.update(inventory.subgroups[target])
+                names.update(inventory.group_hosts[target])
+                continue
+            host = inventory.host(target)
+            if host is None and is_host_pattern(target):
+                patterns = True
+                continue
+            member_of = inventory.host_groups[host.name] if host is not None else ()
+            touched.update(member_of or {target})
+        if patterns:
+            # Pattern terms touch the groups of every host the whole pattern selects
+            for host in self._expand_targets(hosts):
+                touched.update(inventory.host_groups.get(host) or (host,))
+                names.add(host)
+        return touched, names
+    
+    def _host_groups(self) -> Mapping[str, Tuple[str, ...]]:
+        """Map every inventory host to the groups it belongs to, including parent groups"""
+        try:
+            return self._inventory_snapshot().inventory.host_groups
+        except Exception:
+            return {}
+    
+    def _select_tuning(self, hosts: Optional[List[str]]) -> Optional[Dict]:
+        """
+        Pick the connection tuning for a run on the given targets
+        
+        Returns:
+            Tuning as returned by select_profile, or None when tuning is off
+        """
+        if self.tuning == 'off':
+            return None
+        try:
+            connections = target_connections(self._inventory_snapshot().inventory, hosts)
+        except Exception as e:
+            print(f"Warning: Failed to read inventory for tuning: {e}")
+            connections = {'ssh': len(hosts or ())}
+        resources = control_node_resources()
+        return select_profile(
+            connections,
+            resources['cpus'],
+            resources['memory'],
+            name=None if self.tuning == 'auto' else self.tuning
         )
-        thread.start()
+    
+    def _build_env(self, events_file: Path, tuning: Optional[Dict] = None) -> Dict[str, str]:
+        """
+        Build the environment for ansible-playbook
         
-        return execution_id
+        Enables the project's labs_events callback next to the callbacks
+        configured in ansible.cfg, points it at the execution's event file,
+        enables the managed fact cache and applies the execution's tuning.
+        """
+        env = os.environ.copy()
+        env.update(self.facts.env())
+        if tuning is not None:
+            env.update(tuning_env(tuning))
+        callbacks = []
+        config = configparser.ConfigParser()
+        try:
+            config.read(self.project_dir / "ansible.cfg")
+            configured = config.get('defaults', 'callbacks_enabled', fallback='')
+            callbacks = [c.strip() for c in configured.split(',') if c.strip()]
+        except configparser.Error as e:
+            print(f"Warning: Failed to read ansible.cfg: {e}")
+        if self.EVENTS_CALLBACK not in callbacks:
+            callbacks.append(self.EVENTS_CALLBACK)
+        
+        env['ANSIBLE_CALLBACKS_ENABLED'] = ','.join(callbacks)
+        env['ANSIBLE_CALLBACK_PLUGINS'] = str(self.project_dir / "callback_plugins")
+        env['ANSIBLE_LABS_EVENTS_FILE'] = str(events_file)
+        
+        # Keep every task in run order in the profile_tasks summary
+        env.setdefault('PROFILE_TASKS_TASK_OUTPUT_LIMIT', 'all')
+        env.setdefault('PROFILE_TASKS_SORT_ORDER', 'none')
+        return env
     
-    def _run_playbook(
+    def _ingest_events(self, execution_id: str, final: bool = False):
+        """Store callback events and index output lines written since the last call"""
+        try:
+            self.log_index.flush(execution_id, final)
+        except Exception as e:
+            print(f"Warning: Failed to index output of {execution_id}: {e}")
+        tailer = self._event_tailers.get(execution_id)
+        if tailer is None:
+            return
+        with tailer['lock']:
+            for index, reader in enumerate(tailer['readers']):
+                try:
+                    events = reader.read()
+                    if events:
+                        tailer['recap'].update(events, source=index)
+                        self.events.ingest(execution_id, events, tailer['state'])
+                except Exception as e:
+                    print(f"Warning: Failed to ingest events of {execution_id}: {e}")
+        if final:
+            self._event_tailers.pop(execution_id, None)
+            for reader in tailer['readers']:
+                try:
+                    reader.path.unlink()
+                except FileNotFoundError:
+                    pass
+    
+    def get_host_results(self, execution_id: str, status: Optional[str] = None) -> List[Dict]:
+        """Get per-host results captured by the labs_events callback"""
+        return self.events.get_hosts(execution_id, status=status)
+    
+    def get_task_results(self, execution_id: str) -> List[Dict]:
+        """Get per-task results captured by the labs_events callback"""
+        return self.events.get_tasks(execution_id)
+    
+    def _start_execution(self, execution_id: str):
+        """Start an execution admitted by the scheduler"""
+        run = self._pending_runs.pop(execution_id, None)
+        execution = self.executions.get(execution_id)
+        if run is None or execution is None:
+            self.scheduler.release(execution_id)
+            return
+        
+        execution['status'] = 'running'
+        execution['started_at'] = datetime.now().isoformat()
+        self._notify(execution_id, 'status', 'running')
+        
+        # Start execution as a coroutine on the runner loop
+        loop = self._ensure_loop()
+        coroutine = self._run_playbook(execution_id, run['shards'], run['callback'], run['base_cmd'])
+        if self._in_loop():
+            execution['task'] = loop.create_task(coroutine)
+        else:
+            execution['task'] = asyncio.run_coroutine_threadsafe(coroutine, loop)
+    
+    async def _run_playbook(
         self,
         execution_id: str,
-        cmd: List[str],
-        callback: Optional[Callable[[str, str], None]] = None
+        shards: List[Dict],
+        callback: Optional[Callable[[str, str], None]] = None,
+        base_cmd: Optional[List[str]] = None
     ):
-        """Run playbook in subprocess"""
+        """Run playbook in one subprocess per shard and merge their output"""
         execution = self.executions[execution_id]
+        sharded = execution.get('shard_by') is not None
+        
+        events_files = [
+            self.logs_dir / (f"{execution_id}.{index}.events.jsonl" if sharded else f"{execution_id}.events.jsonl")
+            for index in range(len(shards))
+        ]
+        execution['recap'] = LiveRecap()
+        self._event_tailers[execution_id] = {
+            'readers': [EventFileTailer(path) for path in events_files],
+            'state': {},
+            'recap': execution['recap'],
+            'lock': threading.Lock()
+        }
         
         try:
+            # The scheduler may start executions on the loop, so the running status is saved here
+            await asyncio.to_thread(self.store.save, execution)
+            # Drop cached facts past their group TTL so those hosts gather again
+            await asyncio.to_thread(self.facts.expire, self._host_groups())
+            execution['recap'].expected_tasks = await asyncio.to_thread(
+                self.events.expected_task_count, execution['playbook'], execution.get('tags')
+            )
+            
             # Create log file
             log_file = self.logs_dir / f"{execution_id}.log"
             
-            with open(log_file, 'w') as f:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1,
-                    cwd=str(self.project_dir)
-                )
+            with LogWriter(log_file) as f:
+                if execution.get('preflight') and execution['status'] != 'cancelled':
+                    shards = await self._preflight(execution_id, shards, base_cmd, f, callback)
+                    if not shards:
+                        raise RuntimeError("No target host answered the pre-flight probe")
+                
+                targets = None if any(shard['hosts'] is None for shard in shards) else \
+                    [host for shard in shards for host in shard['hosts']]
+                tuning = await asyncio.to_thread(self._select_tuning, targets)
+                execution['tuning'] = tuning
+                execution['tuning_profile'] = tuning['profile'] if tuning else None
+                await asyncio.to_thread(self.store.save, execution)
                 
-                execution['process'] = process
+                return_codes = await asyncio.gather(*[
+                    self._run_shard(execution_id, index, shard, self._build_env(events_files[index], tuning), f, callback)
+                    for index, shard in enumerate(shards)
+                ])
                 
-                # Read output line by line
-                for line in iter(process.stdout.readline, ''):
-                    if line:
-                        execution['stdout'] += line
-                        f.write(line)
-                        f.flush()
-                        if callback:
-                            callback('stdout', line)
+                execution['return_code'] = next((code for code in return_codes if code), 0) \
+                    if None not in return_codes else None
                 
-                # Wait for process to complete
-                process.wait()
-                execution['return_code'] = process.returncode
+                if sharded:
+                    await asyncio.to_thread(self._ingest_events, execution_id)
+                    for line in await asyncio.to_thread(self._merged_recap, execution_id):
+                        self._emit_line(execution_id, line, f, callback)
                 
-                # Read stderr
-                stderr_output = process.stderr.read()
-                if stderr_output:
-                    execution['stderr'] = stderr_output
-                    f.write(f"\n--- STDERR ---\n{stderr_output}")
-                    if callback:
-                        callback('stderr', stderr_output)
+                execution['stderr'] = ''.join(execution['stderr_lines'])
             
             # Update status
-            if execution['return_code'] == 0:
+            if execution['status'] == 'cancelled':
+                pass
+            elif execution['return_code'] == 0:
                 execution['status'] = 'success'
             else:
                 execution['status'] = 'failed'
                 
         except Exception as e:
-            execution['status'] = 'failed'
-            execution['stderr'] = str(e)
+            if execution['status'] != 'cancelled':
+                execution['status'] = 'failed'
+            execution['stderr'] = ''.join(execution['stderr_lines']) + str(e)
         finally:
-            execution['finished_at'] = datetime.now().isoformat()
+            await asyncio.to_thread(self._ingest_events, execution_id, True)
+            await asyncio.to_thread(self._record_profile, execution_id)
+            await asyncio.to_thread(self._archive_log, execution_id)
+            execution['finished_at'] = execution.get('finished_at') or datetime.now().isoformat()
+            execution.pop('task', None)
+            self.scheduler.release(execution_id)
+            # Saving and the status listeners query SQLite, so they run off the loop
+            await asyncio.to_thread(self._finalize, execution_id)
+            self._schedule_retry(execution)
+    
+    async def _preflight(
+        self,
+        execution_id: str,
+        shards: List[Dict],
+        base_cmd: List[str],
+        f,
+        callback: Optional[Callable[[str, str], None]] = None
+    ) -> List[Dict]:
+        """
+        Probe the targets and restrict the shards to the hosts that answered
+        
+        Hosts with a local connection or unknown to the inventory are not
+        probed and always run. Shards left without hosts are dropped.
+        
+        Returns:
+            Shards to run
+        """
+        execution = self.executions[execution_id]
+        snapshot = await asyncio.to_thread(self._inventory_snapshot)
+        targets, unprobed = probe_targets(snapshot.inventory, self._expand_targets(execution['hosts']))
+        started = time.monotonic()
+        reachable, unreachable = await probe_hosts(targets)
+        
+        execution['skipped_hosts'] = unreachable
+        self._emit_line(
+            execution_id,
+            f"PRE-FLIGHT: {len(reachable)} of {len(targets)} hosts answered "
+            f"in {time.monotonic() - started:.1f}s\n",
+            f, callback
+        )
+        if not unreachable:
+            return shards
+        self._emit_line(execution_id, f"PRE-FLIGHT: skipping unreachable hosts: {', '.join(unreachable)}\n", f, callback)
+        
+        keep = reachable + unprobed
+        sharded = execution.get('shard_by') is not None
+        pruned = []
+        shard_infos = []
+        for index, shard in enumerate(shards):
+            hosts = keep
+            if shard['hosts']:
+                members = set(snapshot.inventory.expand(shard['hosts']))
+                hosts = [h for h in keep if h in members]
+            if not hosts:
+                continue
+            cmd = base_cmd + self._target_args(execution_id, hosts, index=index if sharded else None)
+            if sharded:
+                cmd += ["--forks", str(shard['forks'])]
+                shard_infos.append({**execution['shards'][index], 'hosts': len(hosts)})
+            pruned.append({**shard, 'hosts': hosts, 'cmd': cmd})
+        
+        if sharded:
+            execution['shards'] = shard_infos
+        execution['cmd'] = '\n'.join(' '.join(shard['cmd']) for shard in pruned)
+        await asyncio.to_thread(self.store.save, execution)
+        return pruned
+    
+    def _emit_line(
+        self,
+        execution_id: str,
+        line: str,
+        f,
+        callback: Optional[Callable[[str, str], None]] = None,
+        stream: str = 'stdout'
+    ):
+        """
+        Append an output line to the buffer, the log file and the listeners
+        
+        Lines of both streams go through here in the order they are read,
+        tagged with their stream and arrival time.
+        """
+        timestamp = time.time()
+        execution = self.executions[execution_id]
+        line_no = execution['output'].append(line, stream=stream, timestamp=timestamp)
+        self.log_index.add(execution_id, line_no, line, stream)
+        if stream == 'stderr':
+            execution['stderr_lines'].append(line)
+        f.write(format_log_line(line, stream, timestamp))
+        if callback:
+            callback(stream, line)
+        self._notify(execution_id, stream, line)
+    
+    async def _read_lines(self, stream: asyncio.StreamReader):
+        """Yield decoded lines from a subprocess pipe, splitting overlong lines"""
+        while True:
+            try:
+                data = await stream.readuntil(b'\n')
+            except asyncio.IncompleteReadError as e:
+                data = e.partial
+                if data:
+                    yield data.decode('utf-8', errors='replace')
+                return
+            except asyncio.LimitOverrunError as e:
+                data = await stream.readexactly(e.consumed)
+            yield data.decode('utf-8', errors='replace')
+    
+    async def _run_shard(
+        self,
+        execution_id: str,
+        index: int,
+        shard: Dict,
+        env: Dict[str, str],
+        f,
+        callback: Optional[Callable[[str, str], None]] = None
+    ) -> Optional[int]:
+        """
+        Run one ansible-playbook process and stream its output
+        
+        stdout and stderr are drained concurrently, so a chatty stderr can
+        never fill its pipe and stall the process.
+        
+        Returns:
+            Return code, or None if the execution was cancelled before starting
+        """
+        execution = self.executions[execution_id]
+        shard_info = execution['shards'][index] if execution.get('shards') else None
+        prefix = f"[{shard['name']}] " if shard_info is not None else ''
+        if execution['status'] == 'cancelled':
+            return None
+        
+        process = await asyncio.create_subprocess_exec(
+            *shard['cmd'],
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(self.project_dir),
+            env=env,
+            limit=self.STREAM_LIMIT
+        )
+        
+        execution['processes'].append(process)
+        if execution['process'] is None:
+            execution['process'] = process
+        if execution['status'] == 'cancelled':
+            # Cancelled while the process was being spawned
+            process.terminate()
+        if shard_info is not None:
+            shard_info['status'] = 'running'
+        
+        async def read_stdout():
+            last_ingest = time.monotonic()
+            async for line in self._read_lines(process.stdout):
+                self._emit_line(execution_id, prefix + line, f, callback)
+                if time.monotonic() - last_ingest >= self.EVENTS_POLL_INTERVAL:
+                    last_ingest = time.monotonic()
+                    await asyncio.to_thread(self._ingest_events, execution_id)
+        
+        async def read_stderr():
+            async for line in self._read_lines(process.stderr):
+                self._emit_line(execution_id, prefix + line, f, callback, stream='stderr')
+        
+        await asyncio.gather(read_stdout(), read_stderr())
+        
+        # Wait for process to complete
+        await process.wait()
+        
+        if shard_info is not None:
+            shard_info['return_code'] = process.returncode
+            shard_info['status'] = 'success' if process.returncode == 0 else 'failed'
+        return process.returncode
+    
+    def _merged_recap(self, execution_id: str) -> List[str]:
+        """Format the recap of all shards as a single PLAY RECAP block"""
+        hosts = self.events.get_hosts(execution_id)
+        if not hosts:
+            return []
+        width = max(len(host['host']) for host in hosts)
+        lines = ["\n", "MERGED PLAY RECAP " + "*" * 60 + "\n"]
+        for host in hosts:
+            counters = "  ".join(f"{c}={host[c]}" for c in COUNTERS)
+            lines.append(f"{host['host'].ljust(width)} : {counters}\n")
+        return lines
+    
+    def get_facts(self, host: str) -> Optional[Dict]:
+        """Get the cached facts of a host with their age and TTL"""
+        return self.facts.get(host, self._host_groups())
+    
+    def query_facts(
+        self,
+        where: Optional[Dict[str, str]] = None,
+        fields: Optional[List[str]] = None,
+        targets: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Find cached hosts whose facts match every condition
+        
+        Args:
+            where: Fact name to expected value
+            fields: Fact names to return for each host
+            targets: Only these hosts or groups
+        """
+        hosts = self._resolve_targets(targets)[1] if targets else None
+        return self.facts.query(where=where, fields=fields, hosts=hosts, host_groups=self._host_groups())
+    
+    def invalidate_facts(self, targets: Optional[List[str]] = None) -> List[str]:
+        """
+        Drop cached facts so the next run gathers them again
+        
+        Args:
+            targets: Hosts or groups. If None, clears the whole cache.
+            
+        Returns:
+            Hosts whose facts were removed
+        """
+        hosts = self._resolve_targets(targets)[1] if targets else None
+        return self.facts.invalidate(hosts)
+    
+    def _record_profile(self, execution_id: str):
+        """Store the task and role timings printed by profile_tasks and profile_roles"""
+        lines, _ = self.executions[execution_id]['output'].read_since(0)
+        profile = parse_profile(lines)
+        if not (profile['tasks'] or profile['roles']):
+            return
+        try:
+            self.profiles.save(execution_id, profile)
+        except Exception as e:
+            print(f"Warning: Failed to store profile of execution {execution_id}: {e}")
+    
+    def get_profile(self, execution_id: str) -> Optional[Dict]:
+        """Get the task and role timings of an execution"""
+        return self.profiles.get(execution_id)
+    
+    def playbook_profile(self, playbook: str, runs: int = 50, limit: int = 20) -> Dict:
+        """
+        Get the slowest tasks and roles across the latest runs of a playbook
+        
+        See ProfileStore.aggregate for the arguments.
+        """
+        return self.profiles.aggregate(playbook, runs=runs, limit=limit)
+    
+    def _archive_log(self, execution_id: str):
+        """Compress the log of a finished execution and apply the retention policy"""
+        try:
+            self.log_archive.archive(execution_id)
+            for deleted in self.log_archive.enforce_retention():
+                self.log_index.delete(deleted)
+        except OSError as e:
+            print(f"Warning: Failed to archive log of execution {execution_id}: {e}")
+    
+    def _rotate_logs(self):
+        """Archive stale plain logs, apply the retention policy and index archives not indexed yet"""
+        # The live mapping, not a copy: runs registered after rotation starts are skipped too
+        self.log_archive.rotate(active=self.executions)
+        for deleted in self.log_archive.enforce_retention(force=True):
+            self.log_index.delete(deleted)
+        for execution_id in self.log_archive.archived_ids():
+            if self.log_index.is_indexed(execution_id) or execution_id in self.executions:
+                continue
+            records = self.log_archive.read_records(execution_id)
+            if records is not None:
+                self.log_index.index_lines(execution_id, zip(records['lines'], records['streams']))
+    
+    def _finalize(self, execution_id: str):
+        """Persist a finished execution and move it to the finished cache"""
+        execution = self.executions.get(execution_id)
+        if execution is None:
+            return
+        if self._fingerprints.get(execution.get('fingerprint')) == execution_id:
+            del self._fingerprints[execution['fingerprint']]
+        if execution.get('recap') is not None:
+            execution['summary'] = execution.pop('recap').summary(status=execution['status'])
+        for path in self._limit_files.pop(execution_id, ()):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        try:
+            self.store.save(execution)
+        except Exception as e:
+            print(f"Warning: Failed to persist execution {execution_id}: {e}")
+        else:
+            record = {column: execution.get(column) for column in ExecutionStore.COLUMNS}
+            cached = redact_secrets(record)
+            if cached is not record and execution.get('extra_vars'):
+                self._retry_secrets[execution_id] = execution['extra_vars']
+                while len(self._retry_secrets) > self.RETRY_SECRETS:
+                    self._retry_secrets.popitem(last=False)
+            self.finished.put(execution_id, cached, output=execution['output'])
+            self.executions.pop(execution_id, None)
+        self._notify(execution_id, 'status', execution['status'])
+    
+    def retry_targets(self, execution_id: str) -> List[str]:
+        """
+        Get the hosts of an execution that failed or were unreachable
+        
+        Hosts skipped by the pre-flight probe come first. The others come
+        from the structured events when they were captured, otherwise from
+        the PLAY RECAP in the output.
+        """
+        execution = self.get_execution(execution_id) or {}
+        skipped = list(execution.get('skipped_hosts') or ())
+        failed = [host for host, status in self.host_statuses(execution_id).items()
+                  if status in self.RETRY_STATUSES]
+        return list(dict.fromkeys(skipped + failed))
+    
+    def passed_hosts(self, execution_id: str) -> List[str]:
+        """Get the hosts of an execution that neither failed nor were unreachable"""
+        return [host for host, status in self.host_statuses(execution_id).items()
+                if status not in self.RETRY_STATUSES]
+    
+    def host_statuses(self, execution_id: str) -> Dict[str, str]:
+        """
+        Get the final status of every host of an execution
+        
+        Uses the structured events when they were captured, otherwise the
+        PLAY RECAP in the output.
+        
+        Returns:
+            Host name to ok, changed, failed or unreachable, in run order
+        """
+        hosts = self.events.get_hosts(execution_id)
+        if hosts:
+            return {host['host']: host_status(host) for host in hosts}
+        recap = parse_recap(self._load_output(execution_id).read_since(0)[0])
+        return {host: host_status(counts) for host, counts in recap.items()}
+    
+    def retry_execution(
+        self,
+        execution_id: str,
+        retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        callback: Optional[Callable[[str, str], None]] = None
+    ) -> Optional[str]:
+        """
+        Queue a new execution limited to the failed and unreachable hosts
+        
+        The new execution reuses the playbook, tags, variables, priority and
+        sharding of the parent and is linked to it through parent_id. Secret
+        extra vars come from the RETRY_SECRETS most recent executions that had
+        them, as records only hold them redacted.
+        
+        Args:
+            execution_id: Finished execution to retry
+            retries: Automatic retries left for the new execution. If None,
+                uses the parent's remaining retries minus one.
+            retry_backoff: Backoff for the new execution's automatic retries.
+                If None, uses the parent's.
+            callback: Optional callback function for real-time output
+            
+        Returns:
+            New execution ID, or None if the execution was not found
+            
+        Raises:
+            ValueError: If the execution is not finished, has no host to retry or
+                its secret extra vars are no longer known
+        """
+        parent = self.get_execution(execution_id)
+        if parent is None:
+            return None
+        if parent['status'] in ('pending', 'running'):
+            raise ValueError("Execution is still running")
+        extra_vars = parent.get('extra_vars')
+        if REDACTED in (extra_vars or {}).values():
+            extra_vars = self._retry_secrets.get(execution_id)
+            if extra_vars is None:
+                raise ValueError("Execution had secret extra vars, which are no longer known; start it again with them")
+        targets = self.retry_targets(execution_id)
+        if not targets:
+            raise ValueError("Execution has no failed or unreachable hosts")
+        if retries is None:
+            retries = max((parent.get('retries') or 0) - 1, 0)
+        
+        return self.execute_playbook(
+            parent['playbook'],
+            hosts=targets,
+            tags=parent.get('tags'),
+            extra_vars=extra_vars,
+            ask_password=bool(parent.get('ask_password')),
+            callback=callback,
+            priority=parent.get('priority') or 'normal',
+            shard_by=parent.get('shard_by'),
+            retries=retries,
+            retry_backoff=parent.get('retry_backoff') if retry_backoff is None else retry_backoff,
+            parent_id=execution_id,
+            attempt=(parent.get('attempt') or 1) + 1,
+            preflight=bool(parent.get('preflight')),
+            on_duplicate='queue'
+        )
+    
+    def _schedule_retry(self, execution: Dict):
+        """Schedule an automatic retry of a failed execution with exponential backoff"""
+        if execution['status'] != 'failed' or not execution.get('retries'):
+            return
+        delay = execution['retry_backoff'] * 2 ** (execution['attempt'] - 1)
+        loop = self._ensure_loop()
+        loop.call_later(delay, loop.run_in_executor, None, self._auto_retry, execution['id'])
+    
+    def _auto_retry(self, execution_id: str):
+        """Launch an automatic retry; runs in the loop's default executor, off the loop"""
+        try:
+            self.retry_execution(execution_id)
+        except (ValueError, FileNotFoundError) as e:
+            print(f"Warning: Automatic retry of execution {execution_id} skipped: {e}")
     
     def get_execution(self, execution_id: str) -> Optional[Dict]:
         """Get execution status by ID"""
-        return self.executions.get(execution_id)
+        execution = self.executions.get(execution_id)
+        if execution is not None:
+            return execution
+        execution = self.finished.get(execution_id)
+        if execution is not None:
+            return execution
+        execution = self.store.get(execution_id)
+        if execution is not None and execution['status'] not in ('pending', 'running'):
+            self.finished.put(execution_id, execution)
+        return execution
+    
+    def _load_output(self, execution_id: str) -> OutputBuffer:
+        """Load the output of a finished execution from the cache, its archived or its plain log"""
+        output = self.finished.get_output(execution_id)
+        if output is not None:
+            return output
+        output = OutputBuffer()
+        archived = self.log_archive.read_records(execution_id)
+        if archived is not None:
+            for line, stream, timestamp in zip(archived['lines'], archived['streams'], archived['timestamps']):
+                output.append(line, stream=stream, timestamp=timestamp)
+        else:
+            log_file = self.logs_dir / f"{execution_id}.log"
+            if not log_file.exists():
+                return output
+            with open(log_file, 'r', encoding='utf-8', errors='replace', newline='\n') as f:
+                for raw in f:
+                    line, stream, timestamp = parse_log_line(raw)
+                    output.append(line, stream=stream, timestamp=timestamp)
+        self.finished.set_output(execution_id, output)
+        return output
+    
+    def get_summary(self, execution_id: str) -> Optional[Dict]:
+        """
+        Get the live PLAY RECAP and task progress of an execution
+        
+        Returns:
+            Summary as returned by LiveRecap.summary; None for pending
+            executions and runs recorded before summaries existed
+        """
+        execution = self.get_execution(execution_id)
+        if execution is None:
+            return None
+        if execution.get('recap') is not None:
+            # The status turns final a moment before _finalize stores the summary
+            status = execution['status']
+            return execution['recap'].summary(status=status if status not in ('pending', 'running') else None)
+        return execution.get('summary')
+    
+    def get_output(self, execution_id: str, stream: str = 'stdout') -> str:
+        """Get the full output of one stream of an execution"""
+        execution = self.executions.get(execution_id)
+        output = execution['output'] if execution is not None else self._load_output(execution_id)
+        lines, streams, _, _ = output.read_records_since(0)
+        return ''.join(line for line, s in zip(lines, streams) if s == stream)
+    
+    def read_output(
+        self,
+        execution_id: str,
+        since: int = 0,
+        limit: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        Read execution output incrementally
+        
+        Args:
+            execution_id: Execution ID
+            since: Line offset returned by the previous read
+            limit: Maximum number of lines to return
+            
+        Returns:
+            Dictionary with lines, offsets and status, or None if not found
+        """
+        execution = self.executions.get(execution_id)
+        if execution is not None:
+            output: OutputBuffer = execution['output']
+        else:
+            execution = self.get_execution(execution_id)
+            if execution is None:
+                return None
+            
+            # Archived logs are read by line range, without loading the whole log
+            output = self.finished.get_output(execution_id)
+            archived = self.log_archive.read_records(execution_id, since, limit) if output is None else None
+            if archived is not None:
+                return {
+                    'execution_id': execution_id,
+                    'status': execution['status'],
+                    'lines': archived['lines'],
+                    'streams': archived['streams'],
+                    'timestamps': archived['timestamps'],
+                    'offset': min(max(since, 0), archived['next_offset']),
+                    'next_offset': archived['next_offset'],
+                    'byte_offset': archived['byte_offset'],
+                    'total_lines': archived['total_lines'],
+                    'complete': archived['next_offset'] >= archived['total_lines']
+                }
+            if output is None:
+                output = self._load_output(execution_id)
+        lines, streams, timestamps, next_offset = output.read_records_since(since, limit)
+        return {
+            'execution_id': execution_id,
+            'status': execution['status'],
+            'lines': lines,
+            'streams': streams,
+            'timestamps': timestamps,
+            'offset': min(max(since, 0), next_offset),
+            'next_offset': next_offset,
+            'byte_offset': output.byte_offset(next_offset),
+            'total_lines': output.line_count,
+            'complete': execution['status'] not in ('pending', 'running') and next_offset >= output.line_count
+        }
     
     def cancel_execution(self, execution_id: str) -> bool:
-        """Cancel a running execution"""
+        """
+        Cancel a pending or running execution
+        
+        A running execution may have no process yet, e.g. during pre-flight
+        or fact expiry. Its 'cancelled' status then stops every shard from
+        spawning ansible-playbook, and processes already started are terminated.
+        """
         execution = self.executions.get(execution_id)
-        if execution and execution.get('process'):
+        if execution and self.scheduler.cancel(execution_id):
+            self._pending_runs.pop(execution_id, None)
+            execution['status'] = 'cancelled'
+            execution['finished_at'] = datetime.now().isoformat()
+            self._finalize(execution_id)
+            return True
+        if execution is None or execution['status'] != 'running':
+            return False
+        execution['status'] = 'cancelled'
+        execution['finished_at'] = datetime.now().isoformat()
+        if execution['processes']:
             try:
-                execution['process'].terminate()
-                execution['status'] = 'cancelled'
-                execution['finished_at'] = datetime.now().isoformat()
-                return True
-            except Exception:
-                return False
-        return False
-    
-    def list_executions(self) -> List[Dict]:
-        """List all executions"""
-        return list(self.executions.values())
+                self._ensure_loop().call_soon_threadsafe(self._terminate, execution_id)
+            except Exception as e:
+                print(f"Warning: Failed to terminate execution {execution_id}: {e}")
+        self._notify(execution_id, 'status', 'cancelled')
+        return True
+    
+    def _terminate(self, execution_id: str):
+        """Terminate every process of an execution; runs on the runner loop"""
+        execution = self.executions.get(execution_id)
+        if execution is None:
+            return
+        for process in execution['processes']:
+            if process.returncode is None:
+                try:
+                    process.terminate()
+                except ProcessLookupError:
+                    pass
+    
+    def queue_info(self, execution_id: str) -> Dict:
+        """
+        Get queue position and estimated start of a pending execution
+        
+        Returns:
+            Dictionary with queue_position and estimated_start_at (None when not pending)
+        """
+        if not self.scheduler.is_pending(execution_id):
+            return {'queue_position': None, 'estimated_start_at': None}
+        return {
+            'queue_position': self.scheduler.queue_position(execution_id),
+            'estimated_start_at': self.scheduler.estimated_starts().get(execution_id)
+        }
+    
+    def list_executions(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        playbook: Optional[str] = None,
+        status: Optional[str] = None,
+        host: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        parent_id: Optional[str] = None,
+        tuning_profile: Optional[str] = None,
+        pipeline_id: Optional[str] = None
+    ) -> Tuple[int, List[Dict]]:
+        """
+        List executions from the history store, newest first
+        
+        See ExecutionStore.query for the filter arguments.
+        
+        Returns:
+            Tuple of (total matching executions, page of executions)
+        """
+        return self.store.query(
+            limit=limit,
+            offset=offset,
+            playbook=playbook,
+            status=status,
+            host=host,
+            since=since,
+            until=until,
+            fields=fields,
+            parent_id=parent_id,
+            tuning_profile=tuning_profile,
+            pipeline_id=pipeline_id
+        )
+    
+    def search_logs(self, **filters) -> Tuple[List[Dict], bool]:
+        """
+        Search the output of all executions
+        
+        See LogIndex.search for the filters.
+        
+        Returns:
+            Tuple of (matching lines, whether more lines match)
+        """
+        return self.log_index.search(**filters)
+    
+    def tuning_summary(self, playbook: Optional[str] = None, since: Optional[str] = None) -> List[Dict]:
+        """Compare the throughput of finished executions per tuning profile"""
+        return self.store.tuning_summary(playbook=playbook, since=since)
 
 
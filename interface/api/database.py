@@ -0,0 +1,96 @@
+"""Embedded SQLite database shared by the API stores"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+class Database:
+    """Thread-safe wrapper around a single SQLite connection"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (and create) the database
+
+        Args:
+            path: Database file path. If None, reads ANSIBLE_LABS_DB
+                (default interface/data/ansible_labs.db).
+                Use ':memory:' for a throwaway database.
+        """
+        if path is None:
+            path = os.getenv("ANSIBLE_LABS_DB") or Path(__file__).parent.parent / "data" / "ansible_labs.db"
+        if str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+
+    def executescript(self, script: str):
+        """Run a multi-statement script, e.g. schema creation"""
+        with self._lock:
+            self._conn.executescript(script)
+
+    def ensure_columns(self, table: str, columns: Dict[str, str]):
+        """
+        Add columns missing from an existing table
+
+        Args:
+            table: Table name
+            columns: Column name to SQL type/default, e.g. {'shards': 'TEXT'}
+        """
+        with self._lock:
+            existing = {row['name'] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for name, definition in columns.items():
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """
+        Run a single statement
+
+        Returns:
+            Number of rows changed
+        """
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]):
+        """Run a statement for each row inside one transaction"""
+        with self.transaction() as conn:
+            conn.executemany(sql, rows)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """Run a query and fetch all rows"""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        """Run a query and fetch the first row"""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run several statements atomically"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+
+    def close(self):
+        """Close the connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,328 @@
+"""Structured per-host, per-task events captured from ansible-playbook"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from interface.api.database import Database
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS execution_tasks (
+    execution_id TEXT NOT NULL,
+    task_index INTEGER NOT NULL,
+    task_uuid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    role TEXT,
+    play TEXT,
+    handler INTEGER NOT NULL DEFAULT 0,
+    started_at REAL,
+    PRIMARY KEY (execution_id, task_index)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_execution_tasks_uuid ON execution_tasks (execution_id, task_uuid);
+
+CREATE TABLE IF NOT EXISTS execution_events (
+    execution_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    task_index INTEGER,
+    host TEXT NOT NULL,
+    status TEXT NOT NULL,
+    ts REAL,
+    duration REAL,
+    msg TEXT,
+    PRIMARY KEY (execution_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_execution_events_host ON execution_events (execution_id, host);
+CREATE INDEX IF NOT EXISTS idx_execution_events_task ON execution_events (execution_id, task_index);
+
+CREATE TABLE IF NOT EXISTS execution_host_stats (
+    execution_id TEXT NOT NULL,
+    host TEXT NOT NULL,
+    ok INTEGER NOT NULL DEFAULT 0,
+    changed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    unreachable INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    rescued INTEGER NOT NULL DEFAULT 0,
+    ignored INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (execution_id, host)
+) WITHOUT ROWID;
+"""
+
+RECAP_HEADER = re.compile(r'^(?:\[[^\]]+\] )?(?:MERGED )?PLAY RECAP \*')
+RECAP_LINE = re.compile(r'^(?:\[[^\]]+\] )?(\S+)\s+:\s+((?:\w+=\d+\s*)+)$')
+
+RESULT_STATUSES = ('ok', 'changed', 'failed', 'unreachable', 'skipped', 'ignored')
+COUNTERS = ('ok', 'changed', 'failed', 'unreachable', 'skipped', 'rescued', 'ignored')
+
+
+def host_status(counts: Dict[str, int]) -> str:
+    """Summarize a host's counters into a single status"""
+    if counts.get('unreachable'):
+        return 'unreachable'
+    if counts.get('failed'):
+        return 'failed'
+    if counts.get('changed'):
+        return 'changed'
+    return 'ok'
+
+
+def parse_recap(lines: Iterable[str]) -> Dict[str, Dict[str, int]]:
+    """
+    Parse the PLAY RECAP blocks of ansible-playbook output
+
+    Used when no structured events were captured. Lines may carry a
+    '[shard] ' prefix; later blocks override earlier ones.
+
+    Returns:
+        Counters by host name
+    """
+    hosts: Dict[str, Dict[str, int]] = {}
+    in_recap = False
+    for line in lines:
+        line = line.strip()
+        if RECAP_HEADER.match(line):
+            in_recap = True
+            continue
+        if not in_recap:
+            continue
+        match = RECAP_LINE.match(line)
+        if not match:
+            # Blank lines may surround the block; anything else ends it
+            in_recap = not line
+            continue
+        counts = {c: 0 for c in COUNTERS}
+        for pair in match.group(2).split():
+            key, _, value = pair.partition('=')
+            if key in counts:
+                counts[key] = int(value)
+        hosts[match.group(1)] = counts
+    return hosts
+
+
+class EventStore:
+    """Store callback events in compact per-execution tables"""
+
+    def __init__(self, database: Optional[Database] = None):
+        """
+        Initialize store
+
+        Args:
+            database: Database to use. If None, opens the default database.
+        """
+        self.db = database or Database()
+        self.db.executescript(SCHEMA)
+
+    def ingest(self, execution_id: str, events: List[Dict], state: Dict):
+        """
+        Store a batch of events in one transaction
+
+        Args:
+            execution_id: Execution ID
+            events: Decoded events in emission order
+            state: Ingestion state of the execution, updated in place
+                (task index by uuid, next event sequence)
+        """
+        task_index: Dict[str, int] = state.setdefault('task_index', {})
+        seq = state.get('seq', 0)
+        with self.db.transaction() as conn:
+            for event in events:
+                kind = event.get('event')
+                if kind == 'task_start':
+                    uuid = event.get('task_uuid')
+                    if uuid in task_index:
+                        continue
+                    task_index[uuid] = len(task_index)
+                    conn.execute(
+                        "INSERT OR IGNORE INTO execution_tasks "
+                        "(execution_id, task_index, task_uuid, name, role, play, handler, started_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (execution_id, task_index[uuid], uuid, event.get('task', ''), event.get('role'),
+                         event.get('play'), 1 if event.get('handler') else 0, event.get('ts'))
+                    )
+                elif kind in RESULT_STATUSES:
+                    conn.execute(
+                        "INSERT INTO execution_events "
+                        "(execution_id, seq, task_index, host, status, ts, duration, msg) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (execution_id, seq, task_index.get(event.get('task_uuid')), event.get('host', ''),
+                         kind, event.get('ts'), event.get('duration'), event.get('msg'))
+                    )
+                    seq += 1
+                elif kind == 'recap':
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO execution_host_stats (execution_id, host, {', '.join(COUNTERS)}) "
+                        f"VALUES (?, ?, {', '.join('?' for _ in COUNTERS)})",
+                        [execution_id, event.get('host', '')] + [int(event.get(c, 0)) for c in COUNTERS]
+                    )
+        state['seq'] = seq
+
+    def get_hosts(self, execution_id: str, status: Optional[str] = None) -> List[Dict]:
+        """
+        Get per-host results of an execution
+
+        Counters come from the PLAY RECAP when the run finished, otherwise
+        they are aggregated from the events received so far.
+
+        Args:
+            execution_id: Execution ID
+            status: Only hosts with this summarized status
+
+        Returns:
+            List of host dictionaries
+        """
+        hosts: Dict[str, Dict] = {}
+        for row in self.db.query(
+            "SELECT host, status, COUNT(*) AS n FROM execution_events "
+            "WHERE execution_id = ? GROUP BY host, status",
+            (execution_id,)
+        ):
+            host = hosts.setdefault(row['host'], {'host': row['host'], **{c: 0 for c in COUNTERS}})
+            host[row['status']] = row['n']
+
+        for row in self.db.query(
+            f"SELECT host, {', '.join(COUNTERS)} FROM execution_host_stats WHERE execution_id = ?",
+            (execution_id,)
+        ):
+            hosts[row['host']] = {'host': row['host'], **{c: row[c] for c in COUNTERS}}
+            hosts[row['host']]['recap'] = True
+
+        failed_tasks: Dict[str, List[str]] = {}
+        for row in self.db.query(
+            "SELECT e.host, t.name FROM execution_events e "
+            "LEFT JOIN execution_tasks t ON t.execution_id = e.execution_id AND t.task_index = e.task_index "
+            "WHERE e.execution_id = ? AND e.status IN ('failed', 'unreachable') ORDER BY e.seq",
+            (execution_id,)
+        ):
+            failed_tasks.setdefault(row['host'], []).append(row['name'])
+
+        result = []
+        for name in sorted(hosts):
+            host = hosts[name]
+            host.setdefault('recap', False)
+            host['status'] = host_status(host)
+            host['failed_tasks'] = failed_tasks.get(name, [])
+            if status is None or host['status'] == status:
+                result.append(host)
+        return result
+
+    def get_host_durations(self, execution_id: str) -> Dict[str, float]:
+        """
+        Get the time each host spent running tasks
+
+        Returns:
+            Sum of the task durations by host name
+        """
+        return {
+            row['host']: row['total']
+            for row in self.db.query(
+                "SELECT host, SUM(duration) AS total FROM execution_events "
+                "WHERE execution_id = ? AND duration IS NOT NULL GROUP BY host",
+                (execution_id,)
+            )
+        }
+
+    def expected_task_count(self, playbook: str, tags: Optional[List[str]] = None, runs: int = 5) -> Optional[int]:
+        """
+        Estimate the number of tasks of a run from earlier runs
+
+        Uses the largest task count, handlers aside, among the latest finished
+        unsharded runs of the same playbook and tags.
+
+        Returns:
+            Task count, or None if there is no earlier run
+        """
+        row = self.db.query_one(
+            "SELECT MAX(n) FROM ("
+            "SELECT (SELECT COUNT(*) FROM execution_tasks t "
+            "WHERE t.execution_id = e.id AND t.handler = 0) AS n "
+            "FROM executions e WHERE e.playbook = ? AND e.tags IS ? AND e.shard_by IS NULL "
+            "AND e.status IN ('success', 'failed') ORDER BY e.queued_at DESC LIMIT ?"
+            ") WHERE n > 0",
+            (playbook, json.dumps(tags) if tags else None, runs)
+        )
+        return row[0] if row else None
+
+    def get_tasks(self, execution_id: str) -> List[Dict]:
+        """
+        Get per-task results of an execution in run order
+
+        Returns:
+            List of task dictionaries with per-status host counts
+        """
+        tasks: Dict[int, Dict] = {}
+        for row in self.db.query(
+            "SELECT task_index, name, role, play, handler, started_at FROM execution_tasks "
+            "WHERE execution_id = ? ORDER BY task_index",
+            (execution_id,)
+        ):
+            tasks[row['task_index']] = {
+                'index': row['task_index'],
+                'name': row['name'],
+                'role': row['role'],
+                'play': row['play'],
+                'handler': bool(row['handler']),
+                'started_at': row['started_at'],
+                'max_duration': None,
+                'counts': {s: 0 for s in RESULT_STATUSES},
+                'failed_hosts': []
+            }
+
+        for row in self.db.query(
+            "SELECT task_index, status, COUNT(*) AS n, MAX(duration) AS max_duration FROM execution_events "
+            "WHERE execution_id = ? AND task_index IS NOT NULL GROUP BY task_index, status",
+            (execution_id,)
+        ):
+            task = tasks.get(row['task_index'])
+            if task is None:
+                continue
+            task['counts'][row['status']] = row['n']
+            if row['max_duration'] is not None:
+                task['max_duration'] = max(task['max_duration'] or 0.0, row['max_duration'])
+
+        for row in self.db.query(
+            "SELECT task_index, host FROM execution_events "
+            "WHERE execution_id = ? AND status IN ('failed', 'unreachable') ORDER BY seq",
+            (execution_id,)
+        ):
+            if row['task_index'] in tasks:
+                tasks[row['task_index']]['failed_hosts'].append(row['host'])
+
+        return [tasks[index] for index in sorted(tasks)]
+
+
+class EventFileTailer:
+    """Incrementally read the JSON lines written by the labs_events callback"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._position = 0
+        self._partial = ''
+
+    def read(self) -> List[Dict]:
+        """
+        Read complete events appended since the last call
+
+        Returns:
+            List of decoded events
+        """
+        if not self.path.exists():
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            f.seek(self._position)
+            data = f.read()
+            self._position = f.tell()
+
+        data = self._partial + data
+        lines = data.split('\n')
+        self._partial = lines.pop()
+        events = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Warning: Skipping malformed event line: {line[:200]}")
+        return events
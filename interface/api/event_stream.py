@@ -0,0 +1,156 @@
+"""Server-Sent Events streaming of execution output"""
+
+import asyncio
+import json
+import threading
+from typing import AsyncIterator, Dict, Optional, Set
+
+
+class Subscription:
+    """A single subscriber waiting for updates of one execution"""
+
+    def __init__(self, execution_id: str, loop: asyncio.AbstractEventLoop):
+        self.execution_id = execution_id
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    def wake(self):
+        """Wake the subscriber; safe to call from any thread"""
+        self.loop.call_soon_threadsafe(self.event.set)
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait until woken or until timeout expires
+
+        Returns:
+            True if woken, False on timeout
+        """
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.event.clear()
+
+
+class ExecutionEventBroker:
+    """
+    Fan out execution updates to any number of subscribers
+
+    The broker does not keep a copy of the output: the execution's
+    OutputBuffer is the replay log, so subscribers only need to be woken
+    up and then read from their own cursor. This is what makes resuming
+    from a Last-Event-ID cheap.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, execution_id: str) -> Subscription:
+        """Register a subscriber bound to the running event loop"""
+        subscription = Subscription(execution_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(execution_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber"""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.execution_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.execution_id]
+
+    def publish(self, execution_id: str, event: Optional[str] = None, data: Optional[str] = None):
+        """
+        Wake all subscribers of an execution
+
+        Matches the AnsibleRunner listener signature, so it can be
+        registered directly with AnsibleRunner.add_listener.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(execution_id, ()))
+        for subscription in subscribers:
+            subscription.wake()
+
+    def subscriber_count(self, execution_id: str) -> int:
+        """Number of subscribers of an execution"""
+        with self._lock:
+            return len(self._subscribers.get(execution_id, ()))
+
+
+def format_sse(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """Format a single Server-Sent Event"""
+    message = ''
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    message += f"event: {event}\n"
+    message += f"data: {json.dumps(data)}\n\n"
+    return message
+
+
+async def stream_execution(
+    runner,
+    broker: ExecutionEventBroker,
+    execution_id: str,
+    since: int = 0,
+    keepalive: float = 15.0,
+    batch_size: int = 500
+) -> AsyncIterator[str]:
+    """
+    Stream an execution as Server-Sent Events
+
+    Every line event carries the line cursor as its id, so a reconnecting
+    client that sends Last-Event-ID resumes exactly after the last line it
+    received.
+
+    Args:
+        runner: AnsibleRunner owning the execution
+        broker: Broker that wakes this stream on new output
+        execution_id: Execution ID
+        since: Line offset to start from
+        keepalive: Seconds between keepalive comments when idle
+        batch_size: Maximum number of lines read per wake-up
+
+    Yields:
+        Encoded SSE messages
+    """
+    subscription = broker.subscribe(execution_id)
+    cursor = since
+    last_status = None
+    try:
+        yield "retry: 2000\n\n"
+        while True:
+            # Finished executions are read from the archive or the log file, so off the loop
+            log = await asyncio.to_thread(runner.read_output, execution_id, since=cursor, limit=batch_size)
+            if log is None:
+                yield format_sse('error', {'detail': 'Execution not found'})
+                return
+
+            for line, stream, ts in zip(log['lines'], log['streams'], log['timestamps']):
+                cursor += 1
+                yield format_sse('line', {'line': line, 'stream': stream, 'ts': ts}, event_id=cursor)
+            cursor = log['next_offset']
+
+            if log['status'] != last_status:
+                last_status = log['status']
+                yield format_sse('status', {'status': last_status}, event_id=cursor)
+
+            if log['complete']:
+                execution = await asyncio.to_thread(runner.get_execution, execution_id) or {}
+                yield format_sse('done', {
+                    'status': execution.get('status'),
+                    'return_code': execution.get('return_code')
+                }, event_id=cursor)
+                return
+
+            if cursor < log['total_lines']:
+                continue
+
+            if not await subscription.wait(keepalive):
+                yield ": keepalive\n\n"
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,172 @@
+"""Bounded in-memory cache of finished executions"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from interface.api.output_buffer import OutputBuffer
+
+
+DEFAULT_MAX_ENTRIES = 100
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 600.0
+# Longest time an expired entry stays in memory when the cache is idle
+SWEEP_INTERVAL = 60.0
+
+# Approximate memory per buffered line on top of its text: str header, offset, stream and timestamp
+LINE_OVERHEAD = 80
+
+
+def output_size(output: Optional[OutputBuffer]) -> int:
+    """Approximate memory held by an output buffer"""
+    if output is None:
+        return 0
+    return output.byte_size + output.line_count * LINE_OVERHEAD
+
+
+class ExecutionCache:
+    """
+    LRU cache of finished execution records and their output
+
+    Entries are bounded by count, by the approximate size of their output
+    and by age. Evicted executions are loaded again from the execution store
+    and the log files on the next read, so eviction never changes a response.
+
+    Expired entries are dropped on every access and, while the cache holds
+    anything, by a background sweep, so output never stays in memory much
+    past its TTL even when nothing reads or finishes.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None
+    ):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Maximum cached executions. If None, reads
+                ANSIBLE_LABS_CACHE_MAX_EXECUTIONS (0 disables the cache).
+            max_bytes: Maximum total output size. If None, reads ANSIBLE_LABS_CACHE_MAX_BYTES.
+            ttl: Seconds an execution stays cached. If None, reads ANSIBLE_LABS_CACHE_TTL.
+        """
+        if max_entries is None:
+            max_entries = int(os.getenv("ANSIBLE_LABS_CACHE_MAX_EXECUTIONS", DEFAULT_MAX_ENTRIES))
+        if max_bytes is None:
+            max_bytes = int(os.getenv("ANSIBLE_LABS_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        if ttl is None:
+            ttl = float(os.getenv("ANSIBLE_LABS_CACHE_TTL", DEFAULT_TTL))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # execution ID -> (expiry time, record, output or None)
+        self._entries: "OrderedDict[str, Tuple[float, Dict, Optional[OutputBuffer]]]" = OrderedDict()
+        self._bytes = 0
+        self._next_expiry = float('inf')
+        self._sweeper: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _lookup(self, execution_id: str) -> Optional[Tuple[float, Dict, Optional[OutputBuffer]]]:
+        """Get a live entry and mark it recently used; call with the lock held"""
+        self._expire()
+        entry = self._entries.get(execution_id)
+        if entry is None:
+            return None
+        self._entries.move_to_end(execution_id)
+        return entry
+
+    def _expire(self):
+        """Drop expired entries; call with the lock held"""
+        now = time.monotonic()
+        if now < self._next_expiry:
+            return
+        for execution_id in [k for k, entry in self._entries.items() if entry[0] <= now]:
+            self._remove(execution_id)
+        self._next_expiry = min((entry[0] for entry in self._entries.values()), default=float('inf'))
+
+    def _sweep(self):
+        """Purge expired entries periodically until the cache is empty"""
+        interval = min(self.ttl, SWEEP_INTERVAL)
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                self._expire()
+                if not self._entries:
+                    self._sweeper = None
+                    return
+
+    def _start_sweeper(self):
+        """Start the background sweep if it is not running; call with the lock held"""
+        if self._sweeper is None:
+            self._sweeper = threading.Thread(target=self._sweep, name="execution-cache-sweep", daemon=True)
+            self._sweeper.start()
+
+    def get(self, execution_id: str) -> Optional[Dict]:
+        """Get a cached execution record"""
+        with self._lock:
+            entry = self._lookup(execution_id)
+            return entry[1] if entry else None
+
+    def get_output(self, execution_id: str) -> Optional[OutputBuffer]:
+        """Get the cached output of an execution, or None if it is not loaded"""
+        with self._lock:
+            entry = self._lookup(execution_id)
+            return entry[2] if entry else None
+
+    def put(self, execution_id: str, record: Dict, output: Optional[OutputBuffer] = None):
+        """
+        Cache a finished execution
+
+        Output larger than the whole byte budget is not kept; the record still is.
+        """
+        if self.max_entries <= 0:
+            return
+        if output_size(output) > self.max_bytes:
+            output = None
+        with self._lock:
+            self._remove(execution_id)
+            expiry = time.monotonic() + self.ttl
+            self._entries[execution_id] = (expiry, record, output)
+            self._next_expiry = min(self._next_expiry, expiry)
+            self._bytes += output_size(output)
+            self._evict()
+            if self._entries:
+                self._start_sweeper()
+
+    def set_output(self, execution_id: str, output: OutputBuffer):
+        """Attach output loaded from the log files to a cached record"""
+        with self._lock:
+            entry = self._lookup(execution_id)
+            if entry is None or entry[2] is not None or output_size(output) > self.max_bytes:
+                return
+            self._entries[execution_id] = (entry[0], entry[1], output)
+            self._bytes += output_size(output)
+            self._evict()
+
+    def discard(self, execution_id: str):
+        """Drop an execution from the cache"""
+        with self._lock:
+            self._remove(execution_id)
+
+    def _remove(self, execution_id: str):
+        entry = self._entries.pop(execution_id, None)
+        if entry is not None:
+            self._bytes -= output_size(entry[2])
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used until within bounds"""
+        self._expire()
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    @property
+    def byte_size(self) -> int:
+        """Approximate memory held by the cached output"""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,328 @@
+"""Persistent, indexed execution history"""
+
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from interface.api.database import Database
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id TEXT PRIMARY KEY,
+    playbook TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority TEXT,
+    cmd TEXT,
+    hosts TEXT,
+    tags TEXT,
+    return_code INTEGER,
+    stderr TEXT,
+    queued_at TEXT,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_executions_playbook ON executions (playbook, started_at);
+CREATE INDEX IF NOT EXISTS idx_executions_status ON executions (status, started_at);
+CREATE INDEX IF NOT EXISTS idx_executions_started ON executions (started_at);
+CREATE INDEX IF NOT EXISTS idx_executions_queued ON executions (queued_at);
+
+CREATE TABLE IF NOT EXISTS execution_hosts (
+    execution_id TEXT NOT NULL REFERENCES executions (id) ON DELETE CASCADE,
+    host TEXT NOT NULL,
+    PRIMARY KEY (execution_id, host)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_execution_hosts_host ON execution_hosts (host, execution_id);
+"""
+
+# Columns added after the first schema version
+ADDED_COLUMNS = {
+    'shard_by': 'TEXT',
+    'shards': 'TEXT',
+    'extra_vars': 'TEXT',
+    'ask_password': 'INTEGER',
+    'parent_id': 'TEXT',
+    'attempt': 'INTEGER NOT NULL DEFAULT 1',
+    'retries': 'INTEGER NOT NULL DEFAULT 0',
+    'retry_backoff': 'REAL',
+    'preflight': 'INTEGER NOT NULL DEFAULT 0',
+    'skipped_hosts': 'TEXT',
+    'fingerprint': 'TEXT',
+    'duplicate_of': 'TEXT',
+    'tuning_profile': 'TEXT',
+    'tuning': 'TEXT',
+    'pipeline_id': 'TEXT',
+    'pipeline_step': 'TEXT',
+    'summary': 'TEXT',
+}
+
+# Indexes on added columns, created once the columns exist
+ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_executions_parent ON executions (parent_id);
+CREATE INDEX IF NOT EXISTS idx_executions_fingerprint ON executions (fingerprint, queued_at);
+CREATE INDEX IF NOT EXISTS idx_executions_tuning ON executions (tuning_profile, queued_at);
+CREATE INDEX IF NOT EXISTS idx_executions_pipeline ON executions (pipeline_id);
+"""
+
+# Columns stored as JSON text
+JSON_COLUMNS = ('hosts', 'tags', 'shards', 'extra_vars', 'skipped_hosts', 'tuning', 'summary')
+
+# Extra vars whose values are never written to the database
+SENSITIVE_VAR = re.compile(r'passw|_pass$|^pass$|secret|token|vault', re.IGNORECASE)
+# ansible-playbook options whose argument is a vault secret or its source
+VAULT_ARG = re.compile(r'(--vault-password-file|--vault-id)([ =])\S+')
+REDACTED = '********'
+
+
+def redact_secrets(record: Dict) -> Dict:
+    """
+    Mask secrets in the extra vars and command of an execution or pipeline step record
+
+    Values of extra vars whose name looks like a password, secret, token or
+    vault setting are replaced by REDACTED, in extra_vars and in the -e
+    arguments of cmd, as are the arguments of the vault options in cmd.
+
+    Returns:
+        The record itself if it holds no secret, otherwise a redacted copy
+    """
+    extra_vars = record.get('extra_vars') or {}
+    secrets = {key: value for key, value in extra_vars.items() if SENSITIVE_VAR.search(str(key))}
+    cmd = record.get('cmd')
+    if not secrets and not (cmd and VAULT_ARG.search(cmd)):
+        return record
+    redacted = dict(record)
+    if secrets:
+        redacted['extra_vars'] = {key: REDACTED if key in secrets else value for key, value in extra_vars.items()}
+    if cmd:
+        for key, value in secrets.items():
+            cmd = cmd.replace(f"{key}={value}", f"{key}={REDACTED}")
+        redacted['cmd'] = VAULT_ARG.sub(lambda match: match.group(1) + match.group(2) + REDACTED, cmd)
+    return redacted
+
+
+# API field name -> column
+FIELDS = {
+    'execution_id': 'id',
+    'playbook': 'playbook',
+    'status': 'status',
+    'priority': 'priority',
+    'hosts': 'hosts',
+    'tags': 'tags',
+    'return_code': 'return_code',
+    'stderr': 'stderr',
+    'queued_at': 'queued_at',
+    'started_at': 'started_at',
+    'finished_at': 'finished_at',
+    'shard_by': 'shard_by',
+    'shards': 'shards',
+    'parent_id': 'parent_id',
+    'attempt': 'attempt',
+    'retries': 'retries',
+    'preflight': 'preflight',
+    'skipped_hosts': 'skipped_hosts',
+    'fingerprint': 'fingerprint',
+    'duplicate_of': 'duplicate_of',
+    'tuning_profile': 'tuning_profile',
+    'tuning': 'tuning',
+    'pipeline_id': 'pipeline_id',
+    'pipeline_step': 'pipeline_step',
+    'summary': 'summary',
+}
+
+
+class ExecutionStore:
+    """Store execution records in SQLite, indexed by playbook, status, time and host"""
+
+    COLUMNS = ('id', 'playbook', 'status', 'priority', 'cmd', 'hosts', 'tags',
+               'return_code', 'stderr', 'queued_at', 'started_at', 'finished_at',
+               'shard_by', 'shards', 'extra_vars', 'ask_password', 'parent_id', 'attempt',
+               'retries', 'retry_backoff', 'preflight', 'skipped_hosts',
+               'fingerprint', 'duplicate_of', 'tuning_profile', 'tuning',
+               'pipeline_id', 'pipeline_step', 'summary')
+
+    def __init__(self, database: Optional[Database] = None):
+        """
+        Initialize store
+
+        Args:
+            database: Database to use. If None, opens the default database.
+        """
+        self.db = database or Database()
+        self.db.executescript(SCHEMA)
+        self.db.ensure_columns('executions', ADDED_COLUMNS)
+        self.db.executescript(ADDED_INDEXES)
+
+    def save(self, execution: Dict, target_hosts: Optional[Iterable[str]] = None):
+        """
+        Insert or update an execution record
+
+        Secrets in the extra vars and command are stored redacted, see
+        redact_secrets.
+
+        Args:
+            execution: Execution record as kept by AnsibleRunner
+            target_hosts: Host and group names to index the execution by
+        """
+        execution = redact_secrets(execution)
+        values = []
+        for column in self.COLUMNS:
+            value = execution.get(column)
+            if column in JSON_COLUMNS and value is not None:
+                value = json.dumps(value)
+            values.append(value)
+
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        updates = ', '.join(f"{c} = excluded.{c}" for c in self.COLUMNS if c != 'id')
+        with self.db.transaction() as conn:
+            conn.execute(
+                f"INSERT INTO executions ({', '.join(self.COLUMNS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT (id) DO UPDATE SET {updates}",
+                values
+            )
+            if target_hosts is not None:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO execution_hosts (execution_id, host) VALUES (?, ?)",
+                    [(execution['id'], host) for host in set(target_hosts)]
+                )
+
+    def get(self, execution_id: str) -> Optional[Dict]:
+        """Get an execution record by ID"""
+        row = self.db.query_one(
+            f"SELECT {', '.join(self.COLUMNS)} FROM executions WHERE id = ?",
+            (execution_id,)
+        )
+        return self._to_record(row) if row else None
+
+    def _to_record(self, row) -> Dict:
+        record = dict(row)
+        for column in JSON_COLUMNS:
+            if record.get(column) is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    def query(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        playbook: Optional[str] = None,
+        status: Optional[str] = None,
+        host: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        parent_id: Optional[str] = None,
+        tuning_profile: Optional[str] = None,
+        pipeline_id: Optional[str] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Query executions, newest first
+
+        Args:
+            limit: Maximum number of records
+            offset: Number of records to skip
+            playbook: Only executions of this playbook
+            status: Only executions with this status
+            host: Only executions that targeted this host or group
+            since: Only executions queued at or after this ISO timestamp
+            until: Only executions queued before this ISO timestamp
+            fields: API field names to return. If None, returns all fields.
+            parent_id: Only retries of this execution
+            tuning_profile: Only executions run with this tuning profile
+            pipeline_id: Only steps of this pipeline
+
+        Returns:
+            Tuple of (total matching records, records)
+        """
+        conditions = []
+        params: List[Any] = []
+        if playbook:
+            conditions.append("e.playbook = ?")
+            params.append(playbook)
+        if status:
+            conditions.append("e.status = ?")
+            params.append(status)
+        if host:
+            conditions.append("e.id IN (SELECT execution_id FROM execution_hosts WHERE host = ?)")
+            params.append(host)
+        if parent_id:
+            conditions.append("e.parent_id = ?")
+            params.append(parent_id)
+        if tuning_profile:
+            conditions.append("e.tuning_profile = ?")
+            params.append(tuning_profile)
+        if pipeline_id:
+            conditions.append("e.pipeline_id = ?")
+            params.append(pipeline_id)
+        if since:
+            conditions.append("e.queued_at >= ?")
+            params.append(since)
+        if until:
+            conditions.append("e.queued_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        if fields:
+            unknown = [f for f in fields if f not in FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+            selected = list(dict.fromkeys(fields))
+        else:
+            selected = list(FIELDS)
+        columns = ', '.join(f"e.{FIELDS[f]} AS {f}" for f in selected)
+
+        total = self.db.query_one(f"SELECT COUNT(*) FROM executions e {where}", params)[0]
+        rows = self.db.query(
+            f"SELECT {columns} FROM executions e {where} "
+            f"ORDER BY e.queued_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        return total, [self._to_record(row) for row in rows]
+
+    def mark_interrupted(self) -> int:
+        """
+        Fail executions left pending or running by a previous process
+
+        Returns:
+            Number of executions updated
+        """
+        return self.db.execute(
+            "UPDATE executions SET status = 'failed', finished_at = ?, "
+            "stderr = COALESCE(stderr, '') || 'Interrupted by server restart' "
+            "WHERE status IN ('pending', 'running')",
+            (datetime.now().isoformat(),)
+        )
+
+    def tuning_summary(self, playbook: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Compare finished executions per tuning profile
+
+        Args:
+            playbook: Only executions of this playbook
+            since: Only executions queued at or after this ISO timestamp
+
+        Returns:
+            One dictionary per profile with runs, mean_duration, mean_targets,
+            mean_forks and hosts_per_second (targets over wall time of all runs)
+        """
+        conditions = ["tuning_profile IS NOT NULL", "started_at IS NOT NULL",
+                      "finished_at IS NOT NULL", "status != 'cancelled'"]
+        params: List[Any] = []
+        if playbook:
+            conditions.append("playbook = ?")
+            params.append(playbook)
+        if since:
+            conditions.append("queued_at >= ?")
+            params.append(since)
+        rows = self.db.query(
+            "SELECT tuning_profile AS profile, COUNT(*) AS runs, "
+            "AVG(duration) AS mean_duration, AVG(targets) AS mean_targets, AVG(forks) AS mean_forks, "
+            "SUM(targets) / NULLIF(SUM(duration), 0) AS hosts_per_second "
+            "FROM (SELECT tuning_profile, "
+            "(julianday(finished_at) - julianday(started_at)) * 86400 AS duration, "
+            "json_extract(tuning, '$.targets') AS targets, json_extract(tuning, '$.forks') AS forks "
+            f"FROM executions WHERE {' AND '.join(conditions)}) "
+            "GROUP BY tuning_profile ORDER BY tuning_profile",
+            params
+        )
+        return [dict(row) for row in rows]
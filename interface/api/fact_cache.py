@@ -0,0 +1,241 @@
+"""Persistent Ansible fact cache with per-group TTLs"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from interface.api.scheduler import parse_group_limits
+
+
+DEFAULT_FACT_TTL = 24 * 3600
+
+# Prefix Ansible puts on most gathered facts
+FACT_PREFIX = "ansible_"
+
+# Host names that map to a file directly inside the cache directory
+SAFE_HOST = re.compile(r'[A-Za-z0-9_:-][A-Za-z0-9_.:-]*')
+
+
+def is_safe_host(host: str) -> bool:
+    """Check if a host name can be used as a cache file name: no path separators, no '..', no leading dot"""
+    return bool(SAFE_HOST.fullmatch(host)) and '..' not in host
+
+
+def lookup_fact(facts: Dict[str, Any], name: str) -> Any:
+    """
+    Look up a fact by name
+
+    Accepts names with or without the 'ansible_' prefix and dotted paths
+    into nested facts, e.g. 'product_name' or 'default_ipv4.address'.
+
+    Returns:
+        Fact value, or None if missing
+    """
+    first, _, rest = name.partition('.')
+    value = facts.get(first, facts.get(FACT_PREFIX + first))
+    for key in rest.split('.') if rest else ():
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+class FactCache:
+    """
+    Manage the jsonfile fact cache used by ansible-playbook
+
+    Runs are configured with gathering=smart, so hosts with cached facts
+    skip fact gathering. Ansible only knows a single cache timeout, so the
+    per-group TTLs are enforced here by expiring cache entries before each
+    run; a host in several groups uses the shortest TTL.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        default_ttl: Optional[int] = None,
+        group_ttls: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory of the jsonfile cache. If None, reads
+                ANSIBLE_LABS_FACT_CACHE_DIR (default interface/data/facts).
+            default_ttl: Seconds facts stay fresh. If None, reads ANSIBLE_LABS_FACT_TTL.
+            group_ttls: TTL per inventory group. If None, reads
+                ANSIBLE_LABS_FACT_TTLS (e.g. 'lab1=3600,servers=604800').
+        """
+        if cache_dir is None:
+            cache_dir = os.getenv("ANSIBLE_LABS_FACT_CACHE_DIR") or \
+                Path(__file__).parent.parent / "data" / "facts"
+        if default_ttl is None:
+            default_ttl = int(os.getenv("ANSIBLE_LABS_FACT_TTL", DEFAULT_FACT_TTL))
+        if group_ttls is None:
+            group_ttls = parse_group_limits(os.getenv("ANSIBLE_LABS_FACT_TTLS"))
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+        self.group_ttls = group_ttls
+        self._loaded: Dict[str, Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point ansible-playbook at this cache"""
+        return {
+            'ANSIBLE_GATHERING': 'smart',
+            'ANSIBLE_CACHE_PLUGIN': 'jsonfile',
+            'ANSIBLE_CACHE_PLUGIN_CONNECTION': str(self.cache_dir),
+            'ANSIBLE_CACHE_PLUGIN_TIMEOUT': str(max([self.default_ttl, *self.group_ttls.values()])),
+        }
+
+    def host_ttl(self, groups: Iterable[str]) -> int:
+        """TTL of a host given its groups: the shortest configured group TTL"""
+        ttls = [self.group_ttls[group] for group in groups if group in self.group_ttls]
+        return min(ttls) if ttls else self.default_ttl
+
+    def _path(self, host: str) -> Path:
+        """
+        Get the cache file of a host
+
+        Raises:
+            ValueError: If the name could point outside the cache directory
+        """
+        if not is_safe_host(host):
+            raise ValueError(f"Invalid host name: {host!r}")
+        return self.cache_dir / host
+
+    def _entries(self) -> List[Tuple[str, float]]:
+        """Cached hosts with the time their facts were written"""
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if not is_safe_host(path.name) or not path.is_file():
+                continue
+            try:
+                entries.append((path.name, path.stat().st_mtime))
+            except OSError:
+                continue
+        return sorted(entries)
+
+    def expire(self, host_groups: Dict[str, List[str]]) -> List[str]:
+        """
+        Remove cached facts older than their host's TTL
+
+        Args:
+            host_groups: Inventory groups of each host; hosts missing here use the default TTL
+
+        Returns:
+            Hosts whose facts were removed
+        """
+        now = time.time()
+        expired = []
+        for host, mtime in self._entries():
+            if now - mtime >= self.host_ttl(host_groups.get(host, ())):
+                expired.append(host)
+        self.invalidate(expired)
+        return expired
+
+    def invalidate(self, hosts: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Remove cached facts so the next run gathers them again
+
+        Args:
+            hosts: Host names. If None, clears the whole cache.
+
+        Returns:
+            Hosts whose facts were removed
+
+        Raises:
+            ValueError: If a host name could point outside the cache directory
+        """
+        if hosts is None:
+            hosts = [host for host, _ in self._entries()]
+        paths = [(host, self._path(host)) for host in hosts]
+        removed = []
+        for host, path in paths:
+            try:
+                path.unlink()
+                removed.append(host)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Warning: Failed to remove cached facts of {host}: {e}")
+            with self._lock:
+                self._loaded.pop(host, None)
+        return removed
+
+    def _load(self, host: str, mtime: float) -> Optional[Dict]:
+        """Load a host's facts, reusing the parsed copy while the file is unchanged"""
+        with self._lock:
+            cached = self._loaded.get(host)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        try:
+            facts = json.loads(self._path(host).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._loaded[host] = (mtime, facts)
+        return facts
+
+    def get(self, host: str, host_groups: Optional[Dict[str, List[str]]] = None) -> Optional[Dict]:
+        """
+        Get the cached facts of a host
+
+        Returns:
+            Dictionary with host, cached_at, age, ttl, fresh and facts, or None if not cached
+        """
+        try:
+            mtime = self._path(host).stat().st_mtime
+        except (OSError, ValueError):
+            return None
+        facts = self._load(host, mtime)
+        if facts is None:
+            return None
+        return {**self._describe(host, mtime, host_groups or {}), 'facts': facts}
+
+    def _describe(self, host: str, mtime: float, host_groups: Dict[str, List[str]]) -> Dict:
+        age = time.time() - mtime
+        ttl = self.host_ttl(host_groups.get(host, ()))
+        return {'host': host, 'cached_at': mtime, 'age': age, 'ttl': ttl, 'fresh': age < ttl}
+
+    def query(
+        self,
+        where: Optional[Dict[str, str]] = None,
+        fields: Optional[List[str]] = None,
+        hosts: Optional[Iterable[str]] = None,
+        host_groups: Optional[Dict[str, List[str]]] = None
+    ) -> List[Dict]:
+        """
+        Find cached hosts whose facts match every condition
+
+        Args:
+            where: Fact name to expected value, compared as text ignoring case,
+                e.g. {'product_name': 'HP Compaq 6005'}
+            fields: Fact names to return for each host
+            hosts: Only these hosts
+            host_groups: Inventory groups of each host, for the TTL of each entry
+
+        Returns:
+            List of host dictionaries with cache age and the selected facts
+        """
+        wanted = set(hosts) if hosts is not None else None
+        host_groups = host_groups or {}
+        conditions = {name: str(value).lower() for name, value in (where or {}).items()}
+        results = []
+        for host, mtime in self._entries():
+            if wanted is not None and host not in wanted:
+                continue
+            facts = self._load(host, mtime)
+            if facts is None:
+                continue
+            if any(str(lookup_fact(facts, name)).lower() != value for name, value in conditions.items()):
+                continue
+            entry = self._describe(host, mtime, host_groups)
+            entry['facts'] = {name: lookup_fact(facts, name) for name in fields or ()}
+            results.append(entry)
+        return results
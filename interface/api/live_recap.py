@@ -0,0 +1,117 @@
+"""Per-host counters and task progress of a run, updated as callback events arrive"""
+
+import threading
+from typing import Dict, List, Optional
+
+from interface.api.event_store import COUNTERS, RESULT_STATUSES, host_status
+
+
+HOST_STATUSES = ('ok', 'changed', 'failed', 'unreachable')
+
+
+class LiveRecap:
+    """
+    Live PLAY RECAP of a running execution
+
+    Fed with the labs_events callback events as they are ingested, so the
+    counters can be read at any time without touching the database or the
+    log. Each event source (one per shard) counts its own started tasks;
+    progress follows the shard that got furthest, since every shard runs
+    the same playbook.
+    """
+
+    def __init__(self, expected_tasks: Optional[int] = None):
+        """
+        Initialize recap
+
+        Args:
+            expected_tasks: Estimated number of tasks in the run, e.g. from
+                earlier runs of the same playbook and tags
+        """
+        self.expected_tasks = expected_tasks
+        self.hosts: Dict[str, Dict[str, int]] = {}
+        self._recapped: set = set()
+        self._tasks: Dict[int, set] = {}
+        self.current_task: Optional[str] = None
+        self.current_play: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def update(self, events: List[Dict], source: int = 0):
+        """
+        Apply a batch of events in emission order
+
+        Args:
+            events: Decoded labs_events events
+            source: Index of the event file the events came from
+        """
+        with self._lock:
+            tasks = self._tasks.setdefault(source, set())
+            for event in events:
+                kind = event.get('event')
+                if kind == 'play_start':
+                    self.current_play = event.get('play')
+                elif kind == 'task_start':
+                    if event.get('handler'):
+                        continue
+                    tasks.add(event.get('task_uuid'))
+                    self.current_task = event.get('task')
+                    self.current_play = event.get('play') or self.current_play
+                elif kind in RESULT_STATUSES:
+                    host = event.get('host', '')
+                    if host not in self._recapped:
+                        counts = self.hosts.setdefault(host, {c: 0 for c in COUNTERS})
+                        counts[kind] += 1
+                elif kind == 'recap':
+                    host = event.get('host', '')
+                    self.hosts[host] = {c: int(event.get(c, 0)) for c in COUNTERS}
+                    self._recapped.add(host)
+
+    @property
+    def tasks_started(self) -> int:
+        """Tasks started by the shard that got furthest"""
+        return max((len(tasks) for tasks in self._tasks.values()), default=0)
+
+    def summary(self, status: Optional[str] = None) -> Dict:
+        """
+        Summarize the run so far
+
+        Args:
+            status: Final status once the run is over; reports no current
+                task, and full progress on success
+
+        Returns:
+            Dictionary with hosts (count per host status and total), counters
+            (totals of every PLAY RECAP counter), play, task, task_index,
+            expected_tasks and progress (0 to 1, or None if unknown)
+        """
+        with self._lock:
+            hosts = {name: 0 for name in HOST_STATUSES}
+            counters = {c: 0 for c in COUNTERS}
+            for counts in self.hosts.values():
+                hosts[host_status(counts)] += 1
+                for c in COUNTERS:
+                    counters[c] += counts[c]
+            hosts['total'] = len(self.hosts)
+            hosts['recapped'] = len(self._recapped)
+
+            task_index = self.tasks_started
+            expected = self.expected_tasks
+            if expected is not None:
+                expected = max(expected, task_index)
+            finished = status is not None
+            if status == 'success':
+                progress = 1.0
+            elif expected:
+                # While running, the current task is not done yet
+                progress = (task_index if finished else max(task_index - 1, 0)) / expected
+            else:
+                progress = None
+            return {
+                'hosts': hosts,
+                'counters': counters,
+                'play': None if finished else self.current_play,
+                'task': None if finished else self.current_task,
+                'task_index': task_index,
+                'expected_tasks': expected,
+                'progress': progress,
+            }
@@ -0,0 +1,346 @@
+"""Buffered execution log writer and block-compressed, seekable log archive"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+from interface.api.output_buffer import parse_log_line
+
+
+ARCHIVE_SUFFIX = ".log.z"
+INDEX_SUFFIX = ".log.idx"
+INDEX_VERSION = 1
+
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def split_lines(text: str) -> List[str]:
+    """Split text on newlines only, keeping them, like iterating a file opened with newline='\\n'"""
+    parts = text.split('\n')
+    lines = [part + '\n' for part in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+class LogWriter:
+    """
+    Buffered text writer for a live execution log
+
+    Lines are kept in memory and written in one call once the buffer grows
+    past buffer_bytes or flush_interval seconds passed since the last write,
+    instead of flushing the file after every line. Live readers use the
+    in-memory OutputBuffer, so the file only needs to be durable, not current.
+    """
+
+    BUFFER_BYTES = 64 * 1024
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path: Path, buffer_bytes: Optional[int] = None, flush_interval: Optional[float] = None):
+        """
+        Open the log file for writing
+
+        Args:
+            path: Log file path
+            buffer_bytes: Buffered size that triggers a write. If None, uses BUFFER_BYTES.
+            flush_interval: Maximum seconds a line stays buffered. If None, uses FLUSH_INTERVAL.
+        """
+        self.path = Path(path)
+        self.buffer_bytes = buffer_bytes or self.BUFFER_BYTES
+        self.flush_interval = self.FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._file = open(self.path, 'w', encoding='utf-8', newline='\n')
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str):
+        """Buffer text, writing it out when the buffer is full or stale"""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_bytes or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered text to the file"""
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self._file.flush()
+            self._buffer.clear()
+            self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush and close the file"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> "LogWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LogArchive:
+    """
+    Block-compressed execution logs with a sidecar line index
+
+    A finished <id>.log is compressed into <id>.log.z as independent zlib
+    blocks of block_lines lines each. The sidecar <id>.log.idx records where
+    every block starts in the archive and the output byte offset of its first
+    line, so a line range is served by decompressing only the blocks it spans.
+    """
+
+    BLOCK_LINES = 1024
+    COMPRESS_LEVEL = 6
+    RETENTION_CHECK_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        logs_dir: Path,
+        retention_days: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        block_lines: Optional[int] = None
+    ):
+        """
+        Initialize archive
+
+        Args:
+            logs_dir: Directory holding the execution logs
+            retention_days: Delete archives older than this. If None, reads
+                ANSIBLE_LABS_LOG_RETENTION_DAYS (0 keeps archives forever).
+            max_bytes: Delete the oldest archives once all archives exceed this size.
+                If None, reads ANSIBLE_LABS_LOG_MAX_BYTES (0 disables the limit).
+            block_lines: Lines per compressed block. If None, uses BLOCK_LINES.
+        """
+        self.logs_dir = Path(logs_dir)
+        if retention_days is None:
+            retention_days = float(os.getenv("ANSIBLE_LABS_LOG_RETENTION_DAYS", DEFAULT_RETENTION_DAYS))
+        if max_bytes is None:
+            max_bytes = int(os.getenv("ANSIBLE_LABS_LOG_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.retention_days = retention_days
+        self.max_bytes = max_bytes
+        self.block_lines = block_lines or self.BLOCK_LINES
+        self._last_retention = 0.0
+        self._lock = threading.Lock()
+
+    def _paths(self, execution_id: str) -> Tuple[Path, Path, Path]:
+        """Get the (plain log, archive, index) paths of an execution"""
+        return (
+            self.logs_dir / f"{execution_id}.log",
+            self.logs_dir / f"{execution_id}{ARCHIVE_SUFFIX}",
+            self.logs_dir / f"{execution_id}{INDEX_SUFFIX}",
+        )
+
+    def archived_ids(self) -> List[str]:
+        """IDs of all archived executions"""
+        return [path.name[:-len(INDEX_SUFFIX)] for path in self.logs_dir.glob(f"*{INDEX_SUFFIX}")]
+
+    def has_archive(self, execution_id: str) -> bool:
+        """Check if an execution log was archived"""
+        return self._paths(execution_id)[2].exists()
+
+    def archive(self, execution_id: str) -> bool:
+        """
+        Compress a finished execution log and remove the plain file
+
+        The archive is written before its index, and the plain log is only
+        removed once both exist, so readers always find a complete copy.
+
+        Returns:
+            True if the log was archived, False if there was no plain log
+        """
+        log_path, archive_path, index_path = self._paths(execution_id)
+        if not log_path.exists():
+            return False
+
+        blocks: List[List[int]] = []
+        line_count = 0
+        byte_size = 0
+        position = 0
+        tmp_archive = archive_path.with_suffix(archive_path.suffix + '.tmp')
+        with open(log_path, 'r', encoding='utf-8', errors='replace', newline='\n') as src, open(tmp_archive, 'wb') as dst:
+            for block in self._blocks(src):
+                data = zlib.compress(''.join(block).encode('utf-8'), self.COMPRESS_LEVEL)
+                dst.write(data)
+                blocks.append([position, len(data), byte_size])
+                position += len(data)
+                line_count += len(block)
+                byte_size += sum(len(parse_log_line(raw)[0].encode('utf-8')) for raw in block)
+
+        index = {
+            'version': INDEX_VERSION,
+            'block_lines': self.block_lines,
+            'lines': line_count,
+            'bytes': byte_size,
+            'blocks': blocks,
+        }
+        tmp_index = index_path.with_suffix(index_path.suffix + '.tmp')
+        tmp_index.write_text(json.dumps(index), encoding='utf-8')
+        os.replace(tmp_archive, archive_path)
+        os.replace(tmp_index, index_path)
+        log_path.unlink()
+        return True
+
+    def _blocks(self, lines: Iterable[str]) -> Iterable[List[str]]:
+        """Group lines into blocks of block_lines"""
+        block: List[str] = []
+        for line in lines:
+            block.append(line)
+            if len(block) >= self.block_lines:
+                yield block
+                block = []
+        if block:
+            yield block
+
+    def _load_index(self, execution_id: str) -> Optional[Dict]:
+        """Load the sidecar index of an archived log"""
+        index_path = self._paths(execution_id)[2]
+        try:
+            return json.loads(index_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def read_records(
+        self,
+        execution_id: str,
+        since: int = 0,
+        limit: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        Read a line range of an archived log
+
+        Args:
+            execution_id: Execution ID
+            since: Line offset to start from
+            limit: Maximum number of lines. If None, reads to the end.
+
+        Returns:
+            Dictionary with lines, streams, timestamps, next_offset, byte_offset
+            (of next_offset) and total_lines, or None if there is no archive
+        """
+        index = self._load_index(execution_id)
+        if index is None:
+            return None
+        total = index['lines']
+        block_lines = index['block_lines']
+        start = max(0, min(since, total))
+        end = total if limit is None else min(total, start + limit)
+
+        blocks = index['blocks']
+        first = start // block_lines
+        last = (end - 1) // block_lines if end > start else first - 1
+        byte_offset = index['bytes']
+        if end < total:
+            if end % block_lines:
+                # The block holding line `end` is needed for its byte offset
+                last = max(last, end // block_lines)
+            else:
+                byte_offset = blocks[end // block_lines][2]
+
+        lines: List[str] = []
+        streams: List[str] = []
+        timestamps: List[Optional[float]] = []
+        archive_path = self._paths(execution_id)[1]
+        with open(archive_path, 'rb') as f:
+            for block_index in range(first, last + 1):
+                position, length, block_bytes = blocks[block_index]
+                f.seek(position)
+                block = split_lines(zlib.decompress(f.read(length)).decode('utf-8'))
+                for number, raw in enumerate(block, block_index * block_lines):
+                    if number >= end:
+                        byte_offset = block_bytes
+                        break
+                    line, stream, timestamp = parse_log_line(raw)
+                    if number >= start:
+                        lines.append(line)
+                        streams.append(stream)
+                        timestamps.append(timestamp)
+                    block_bytes += len(line.encode('utf-8'))
+
+        return {
+            'lines': lines,
+            'streams': streams,
+            'timestamps': timestamps,
+            'next_offset': end,
+            'byte_offset': byte_offset,
+            'total_lines': total,
+        }
+
+    def rotate(self, active: Container[str] = ()) -> int:
+        """
+        Archive plain logs left behind by earlier runs
+
+        Args:
+            active: Execution IDs whose logs are still being written. It is
+                checked again for every log, so a live mapping such as the
+                runner's executions also covers runs that start meanwhile.
+
+        Returns:
+            Number of logs archived
+        """
+        archived = 0
+        for log_path in self.logs_dir.glob("*.log"):
+            execution_id = log_path.name[:-len(".log")]
+            if execution_id in active:
+                continue
+            try:
+                if self.archive(execution_id):
+                    archived += 1
+            except OSError as e:
+                print(f"Warning: Failed to archive log {log_path.name}: {e}")
+        return archived
+
+    def enforce_retention(self, force: bool = False) -> List[str]:
+        """
+        Delete archives past the age or total size limit, oldest first
+
+        Runs at most once per RETENTION_CHECK_INTERVAL unless forced.
+
+        Returns:
+            IDs of the executions whose archives were deleted
+        """
+        with self._lock:
+            now = time.time()
+            if not force and now - self._last_retention < self.RETENTION_CHECK_INTERVAL:
+                return []
+            self._last_retention = now
+
+        archives = []
+        for index_path in self.logs_dir.glob(f"*{INDEX_SUFFIX}"):
+            execution_id = index_path.name[:-len(INDEX_SUFFIX)]
+            archive_path = self._paths(execution_id)[1]
+            try:
+                stat = archive_path.stat()
+                size = stat.st_size + index_path.stat().st_size
+            except OSError:
+                continue
+            archives.append((stat.st_mtime, size, execution_id))
+        archives.sort()
+
+        total = sum(size for _, size, _ in archives)
+        cutoff = now - self.retention_days * 86400 if self.retention_days else None
+        deleted = []
+        for mtime, size, execution_id in archives:
+            expired = cutoff is not None and mtime < cutoff
+            oversized = self.max_bytes and total > self.max_bytes
+            if not (expired or oversized):
+                break
+            self.delete(execution_id)
+            total -= size
+            deleted.append(execution_id)
+        return deleted
+
+    def delete(self, execution_id: str):
+        """Delete every log file of an execution"""
+        for path in self._paths(execution_id):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,295 @@
+"""Full-text index of execution output lines, keyed by execution, host and task"""
+
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from interface.api.database import Database
+
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS execution_log_fts USING fts5(
+    line,
+    host,
+    task,
+    execution_id UNINDEXED,
+    line_no UNINDEXED,
+    stream UNINDEXED,
+    result UNINDEXED,
+    tokenize = 'unicode61'
+);
+
+-- Each flush inserts a contiguous rowid range; deletes go by range instead of scanning the index
+CREATE TABLE IF NOT EXISTS execution_log_batches (
+    execution_id TEXT NOT NULL,
+    first_rowid INTEGER NOT NULL,
+    last_rowid INTEGER NOT NULL,
+    PRIMARY KEY (execution_id, first_rowid)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS execution_log_indexed (
+    execution_id TEXT PRIMARY KEY,
+    lines INTEGER NOT NULL
+);
+"""
+
+SHARD = r'(?:\[([^\]]+)\] )?'
+TASK_LINE = re.compile(r'^' + SHARD + r'(?:TASK|RUNNING HANDLER) \[(.+?)\] \*')
+PLAY_LINE = re.compile(r'^' + SHARD + r'(?:MERGED )?PLAY (?:RECAP )?[\[*]')
+HOST_LINE = re.compile(r'^' + SHARD + r'(ok|changed|fatal|failed|skipping|unreachable): \[([^\]]+?)\]')
+
+# Line prefix -> result stored for the line
+RESULTS = {'ok': 'ok', 'changed': 'changed', 'failed': 'failed', 'skipping': 'skipped', 'unreachable': 'unreachable'}
+LINE_RESULTS = ('ok', 'changed', 'failed', 'unreachable', 'skipped')
+
+SNIPPET_TOKENS = 24
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query
+
+    Every word or "quoted phrase" must appear; a trailing * matches a prefix.
+    Terms are quoted, so FTS operators in the text are searched literally.
+    """
+    terms = []
+    for token in re.findall(r'"[^"]*"|\S+', text):
+        prefix = token.endswith('*') and not token.startswith('"')
+        token = token.strip('"').rstrip('*') if prefix else token.strip('"')
+        if not token:
+            continue
+        phrase = '"' + token.replace('"', '""') + '"'
+        terms.append(phrase + '*' if prefix else phrase)
+    return ' '.join(terms)
+
+
+class LineClassifier:
+    """Attribute output lines to the host and task they belong to"""
+
+    def __init__(self):
+        self._tasks: Dict[Optional[str], str] = {}
+        self._last_task: Optional[str] = None
+
+    def classify(self, line: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Classify one output line
+
+        TASK headers set the current task of their shard and PLAY headers
+        clear it. Host result lines take their shard's current task; other
+        lines take the latest task.
+
+        Returns:
+            Tuple of (host, task, result)
+        """
+        match = TASK_LINE.match(line)
+        if match:
+            self._tasks[match.group(1)] = self._last_task = match.group(2)
+            return None, match.group(2), None
+        match = PLAY_LINE.match(line)
+        if match:
+            self._tasks[match.group(1)] = self._last_task = None
+            return None, None, None
+        match = HOST_LINE.match(line)
+        if match:
+            shard, prefix, host = match.groups()
+            if prefix == 'fatal':
+                result = 'unreachable' if 'UNREACHABLE!' in line else 'failed'
+            else:
+                result = RESULTS[prefix]
+            return host, self._tasks.get(shard, self._last_task), result
+        return None, self._last_task, None
+
+
+class LogIndex:
+    """
+    SQLite FTS5 index of execution output
+
+    Lines are classified and buffered as they are written, and inserted in
+    batches by flush, which the runner calls from a worker thread alongside
+    event ingestion, so the event loop never waits on the index.
+    """
+
+    def __init__(self, database: Optional[Database] = None):
+        """
+        Initialize index
+
+        Args:
+            database: Database to use. If None, opens the default database.
+        """
+        self.db = database or Database()
+        try:
+            self.db.executescript(SCHEMA)
+            self.enabled = True
+        except sqlite3.OperationalError as e:
+            print(f"Warning: Full-text log search disabled, SQLite lacks FTS5: {e}")
+            self.enabled = False
+        self._pending: Dict[str, List[Tuple]] = {}
+        self._classifiers: Dict[str, LineClassifier] = {}
+        self._lock = threading.Lock()
+
+    def add(self, execution_id: str, line_no: int, line: str, stream: str = 'stdout'):
+        """Buffer an output line of a running execution"""
+        if not self.enabled:
+            return
+        text = line.rstrip('\n')
+        if not text.strip():
+            return
+        with self._lock:
+            classifier = self._classifiers.get(execution_id)
+            if classifier is None:
+                classifier = self._classifiers[execution_id] = LineClassifier()
+            host, task, result = classifier.classify(text)
+            self._pending.setdefault(execution_id, []).append(
+                (text, host, task, execution_id, line_no, stream, result)
+            )
+
+    def flush(self, execution_id: str, final: bool = False):
+        """
+        Insert the buffered lines of an execution
+
+        Args:
+            execution_id: Execution ID
+            final: The execution finished; marks it indexed and drops its state
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            rows = self._pending.pop(execution_id, [])
+            if final:
+                self._classifiers.pop(execution_id, None)
+        with self.db.transaction() as conn:
+            if rows:
+                conn.executemany(
+                    "INSERT INTO execution_log_fts (line, host, task, execution_id, line_no, stream, result) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                conn.execute(
+                    "INSERT INTO execution_log_batches (execution_id, first_rowid, last_rowid) VALUES (?, ?, ?)",
+                    (execution_id, last - len(rows) + 1, last)
+                )
+            if final:
+                conn.execute(
+                    "INSERT OR REPLACE INTO execution_log_indexed (execution_id, lines) "
+                    "SELECT ?, COALESCE(SUM(last_rowid - first_rowid + 1), 0) "
+                    "FROM execution_log_batches WHERE execution_id = ?",
+                    (execution_id, execution_id)
+                )
+
+    def index_lines(self, execution_id: str, records: Iterable[Tuple[str, str]]):
+        """
+        Index the whole output of a finished execution, replacing earlier rows
+
+        Args:
+            execution_id: Execution ID
+            records: (line, stream) pairs in output order
+        """
+        if not self.enabled:
+            return
+        self.delete(execution_id)
+        for line_no, (line, stream) in enumerate(records):
+            self.add(execution_id, line_no, line, stream)
+        self.flush(execution_id, final=True)
+
+    def is_indexed(self, execution_id: str) -> bool:
+        """Check if the whole output of an execution was indexed"""
+        return self.enabled and self.db.query_one(
+            "SELECT 1 FROM execution_log_indexed WHERE execution_id = ?", (execution_id,)
+        ) is not None
+
+    def delete(self, execution_id: str):
+        """Remove an execution from the index"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._pending.pop(execution_id, None)
+            self._classifiers.pop(execution_id, None)
+        with self.db.transaction() as conn:
+            batches = conn.execute(
+                "SELECT first_rowid, last_rowid FROM execution_log_batches WHERE execution_id = ?",
+                (execution_id,)
+            ).fetchall()
+            conn.executemany("DELETE FROM execution_log_fts WHERE rowid BETWEEN ? AND ?", batches)
+            conn.execute("DELETE FROM execution_log_batches WHERE execution_id = ?", (execution_id,))
+            conn.execute("DELETE FROM execution_log_indexed WHERE execution_id = ?", (execution_id,))
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        host: Optional[str] = None,
+        task: Optional[str] = None,
+        result: Optional[str] = None,
+        playbook: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Tuple[List[Dict], bool]:
+        """
+        Search output lines, newest first
+
+        Args:
+            query: Free text, see fts_query
+            host: Only lines of this host
+            task: Only lines of tasks whose name contains these words
+            result: Only host result lines with this outcome (ok, changed,
+                failed, unreachable, skipped)
+            playbook: Only executions of this playbook
+            status: Only executions with this status
+            since: Only executions queued at or after this ISO timestamp
+            until: Only executions queued before this ISO timestamp
+            limit: Maximum number of lines
+            offset: Number of lines to skip
+
+        Returns:
+            Tuple of (matching lines with execution details and a highlighted
+            snippet, whether more lines match)
+
+        Raises:
+            ValueError: If no text, host or task is given
+        """
+        expressions = []
+        if query and fts_query(query):
+            expressions.append(fts_query(query))
+        if host:
+            expressions.append('host : ' + fts_query(f'"{host}"'))
+        if task and fts_query(task):
+            expressions.append('task : (' + fts_query(task) + ')')
+        if not expressions:
+            raise ValueError("Search needs text, a host or a task")
+
+        conditions = ["execution_log_fts MATCH ?"]
+        params: List = [' AND '.join(expressions)]
+        if host:
+            conditions.append("f.host = ?")
+            params.append(host)
+        if result:
+            conditions.append("f.result = ?")
+            params.append(result)
+        if playbook:
+            conditions.append("e.playbook = ?")
+            params.append(playbook)
+        if status:
+            conditions.append("e.status = ?")
+            params.append(status)
+        if since:
+            conditions.append("e.queued_at >= ?")
+            params.append(since)
+        if until:
+            conditions.append("e.queued_at < ?")
+            params.append(until)
+
+        rows = self.db.query(
+            "SELECT f.execution_id, f.line_no, f.stream, f.host, f.task, f.result, f.line, "
+            f"snippet(execution_log_fts, 0, '[', ']', '...', {SNIPPET_TOKENS}) AS snippet, "
+            "e.playbook, e.status, e.queued_at "
+            "FROM execution_log_fts f JOIN executions e ON e.id = f.execution_id "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY f.rowid DESC LIMIT ? OFFSET ?",
+            params + [limit + 1, offset]
+        )
+        items = [dict(row) for row in rows[:limit]]
+        return items, len(rows) > limit
@@ -1,15 +1,21 @@
 """FastAPI backend for Ansible Labs interface"""
 
 import sys
+import json
+import time
+import asyncio
+from functools import lru_cache
+from contextlib import asynccontextmanager
 from pathlib import Path
+from datetime import datetime
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from jinja2 import Template
 from typing import List, Optional
@@ -17,14 +23,31 @@ import uvicorn
 
 from interface.api.models import (
     HostInfo, GroupInfo, PlaybookInfo, ExecutionRequest, ExecutionResponse,
-    ExecutionStatusResponse, LLMSuggestRequest, LLMSuggestResponse,
-    LLMExplainRequest, LLMExplainResponse, ExecutionStatus
+    ExecutionStatusResponse, ExecutionLogResponse, LLMSuggestRequest, LLMSuggestResponse,
+    LLMExplainRequest, LLMExplainResponse, ExecutionStatus, QueueStatusResponse,
+    ExecutionPage, HostResult, TaskResult, RetryRequest, ExecutionProfile, PlaybookProfile,
+    CachedFacts, FactInvalidationResponse, TuningSummary, PipelineRequest, PipelineStatusResponse,
+    PipelinePage, LogSearchResponse, InventoryStatus, TargetPreview
 )
-from interface.utils.inventory_parser import InventoryParser
+from interface.utils.inventory_parser import InventoryParser, InventorySnapshot
+from interface.utils.host_pattern import split_host_pattern
 from interface.utils.playbook_parser import PlaybookParser
-from interface.api.ansible_runner import AnsibleRunner
+from interface.api.ansible_runner import AnsibleRunner, DuplicateExecutionError, request_fingerprint
+from interface.api.pipeline import PipelineManager
+from interface.api.log_index import LINE_RESULTS
+from interface.api.event_stream import ExecutionEventBroker, stream_execution
+from interface.api.metrics import CONTENT_TYPE_LATEST, ExecutionMetrics, observe_request, render, time_parse
 
-app = FastAPI(title="Ansible Labs API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run playbook executions on the server's event loop"""
+    if ansible_runner is not None:
+        ansible_runner.attach_loop(asyncio.get_running_loop())
+    yield
+
+
+app = FastAPI(title="Ansible Labs API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware for web interface
 app.add_middleware(
@@ -35,6 +58,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Record the latency of every request by route template"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        observe_request(
+            request.method,
+            route.path if route is not None else 'unmatched',
+            status,
+            time.perf_counter() - start
+        )
+
 # Initialize parsers and runner
 try:
     inventory_parser = InventoryParser()
@@ -48,11 +90,17 @@ except Exception as e:
     print(f"Warning: Failed to initialize playbook parser: {e}")
     playbook_parser = None
 
+event_broker = ExecutionEventBroker()
+
 try:
     ansible_runner = AnsibleRunner()
+    ansible_runner.add_listener(event_broker.publish)
+    execution_metrics = ExecutionMetrics(ansible_runner)
+    pipeline_manager = PipelineManager(ansible_runner)
 except Exception as e:
     print(f"Warning: Failed to initialize ansible runner: {e}")
     ansible_runner = None
+    pipeline_manager = None
 
 # Setup static files and templates
 web_dir = Path(__file__).parent.parent / "web"
@@ -71,43 +119,132 @@ async def root(request: Request):
     return HTMLResponse(content=template.render())
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics of the API and the execution engine"""
+    return Response(content=render(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "ok", "message": "API is running"}
 
 
-@app.get("/api/inventory/groups", response_model=List[GroupInfo])
-async def get_groups():
-    """Get all groups from inventory"""
+def inventory_snapshot() -> InventorySnapshot:
+    """Get the current inventory snapshot"""
     if inventory_parser is None:
         raise HTTPException(status_code=500, detail="Inventory parser not initialized")
-    try:
-        data = inventory_parser.parse()
-        groups = []
-        for group_name, hosts in data['groups'].items():
-            if not group_name.endswith(':vars'):
-                group_vars = data['group_vars'].get(group_name, {})
-                
-                # Convert hosts to HostInfo objects, handling missing fields
-                host_objects = []
-                for host in hosts:
-                    try:
-                        # Ensure 'name' field exists
-                        if 'name' not in host:
-                            continue
-                        host_objects.append(HostInfo(**host))
-                    except Exception as e:
-                        # Skip invalid hosts but log the error
-                        print(f"Warning: Skipping invalid host in group {group_name}: {host}, error: {e}")
+    with time_parse('inventory'):
+        return inventory_parser.snapshot()
+
+
+def inventory_response(request: Request, snapshot: InventorySnapshot, content: bytes) -> Response:
+    """
+    Serve an inventory response built from a snapshot
+
+    The ETag changes with the snapshot, so clients that send it back in
+    If-None-Match get a 304 until the inventory file changes.
+    """
+    etag = f'"inventory-{snapshot.version}-{snapshot.digest[:16]}"'
+    headers = {'ETag': etag, 'X-Inventory-Version': str(snapshot.version)}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=8)
+def inventory_groups_json(snapshot: InventorySnapshot) -> bytes:
+    """Serialized groups of a snapshot, built once per snapshot"""
+    data = snapshot.data
+    groups = []
+    for group_name, hosts in data['groups'].items():
+        if not group_name.endswith(':vars'):
+            group_vars = data['group_vars'].get(group_name, {})
+            
+            # Convert hosts to HostInfo objects, handling missing fields
+            host_objects = []
+            for host in hosts:
+                try:
+                    # Ensure 'name' field exists
+                    if 'name' not in host:
                         continue
-                
-                groups.append(GroupInfo(
-                    name=group_name,
-                    hosts=host_objects,
-                    vars=group_vars if group_vars else None
-                ))
-        return groups
+                    host_objects.append(HostInfo(**host))
+                except Exception as e:
+                    # Skip invalid hosts but log the error
+                    print(f"Warning: Skipping invalid host in group {group_name}: {host}, error: {e}")
+                    continue
+            
+            groups.append(GroupInfo(
+                name=group_name,
+                hosts=host_objects,
+                vars=dict(group_vars) if group_vars else None
+            ))
+    return json.dumps([group.model_dump() for group in groups]).encode()
+
+
+@lru_cache(maxsize=64)
+def inventory_hosts_json(snapshot: InventorySnapshot, group: Optional[str]) -> bytes:
+    """Serialized hosts of a snapshot, optionally of one group, built once per snapshot"""
+    if group:
+        hosts = snapshot.data['groups'].get(group, ())
+    else:
+        hosts = snapshot.data['all_hosts']
+    
+    # Convert to HostInfo objects, handling missing fields
+    host_objects = []
+    for host in hosts:
+        try:
+            # Ensure 'name' field exists
+            if 'name' not in host:
+                continue
+            host_objects.append(HostInfo(**host))
+        except Exception as e:
+            # Skip invalid hosts but log the error
+            print(f"Warning: Skipping invalid host: {host}, error: {e}")
+            continue
+    return json.dumps([host.model_dump() for host in host_objects]).encode()
+
+
+@lru_cache(maxsize=256)
+def inventory_resolve_json(snapshot: InventorySnapshot, pattern: str) -> bytes:
+    """Serialized resolution of a host pattern, built once per snapshot"""
+    resolution = snapshot.resolver.resolve(pattern)
+    return json.dumps(TargetPreview(
+        pattern=pattern,
+        terms=split_host_pattern(pattern),
+        version=snapshot.version,
+        count=len(resolution.hosts),
+        hosts=list(resolution.hosts),
+        unmatched=list(resolution.unmatched)
+    ).model_dump()).encode()
+
+
+@app.get("/api/inventory", response_model=InventoryStatus)
+async def get_inventory_status():
+    """Get the version of the loaded inventory"""
+    try:
+        snapshot = inventory_snapshot()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error parsing inventory: {str(e)}")
+    return InventoryStatus(
+        version=snapshot.version,
+        loaded_at=snapshot.loaded_at,
+        groups=len(snapshot.data['groups']),
+        hosts=len(snapshot.data['all_hosts'])
+    )
+
+
+@app.get("/api/inventory/groups", response_model=List[GroupInfo])
+async def get_groups(request: Request):
+    """Get all groups from inventory"""
+    try:
+        snapshot = inventory_snapshot()
+        return inventory_response(request, snapshot, inventory_groups_json(snapshot))
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_detail = f"Error parsing inventory: {str(e)}\n{traceback.format_exc()}"
@@ -116,30 +253,13 @@ async def get_groups():
 
 
 @app.get("/api/inventory/hosts", response_model=List[HostInfo])
-async def get_hosts(group: Optional[str] = None):
+async def get_hosts(request: Request, group: Optional[str] = None):
     """Get all hosts, optionally filtered by group"""
-    if inventory_parser is None:
-        raise HTTPException(status_code=500, detail="Inventory parser not initialized")
     try:
-        if group:
-            hosts = inventory_parser.get_hosts_by_group(group)
-        else:
-            hosts = inventory_parser.get_all_hosts()
-        
-        # Convert to HostInfo objects, handling missing fields
-        host_objects = []
-        for host in hosts:
-            try:
-                # Ensure 'name' field exists
-                if 'name' not in host:
-                    continue
-                host_objects.append(HostInfo(**host))
-            except Exception as e:
-                # Skip invalid hosts but log the error
-                print(f"Warning: Skipping invalid host: {host}, error: {e}")
-                continue
-        
-        return host_objects
+        snapshot = inventory_snapshot()
+        return inventory_response(request, snapshot, inventory_hosts_json(snapshot, group))
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_detail = f"Error getting hosts: {str(e)}\n{traceback.format_exc()}"
@@ -147,13 +267,31 @@ async def get_hosts(group: Optional[str] = None):
         raise HTTPException(status_code=500, detail=f"Error getting hosts: {str(e)}")
 
 
+@app.get("/api/inventory/resolve", response_model=TargetPreview)
+async def resolve_targets(
+    request: Request,
+    pattern: str = Query(..., min_length=1, description="Ansible host pattern, e.g. lab1:lab2:!111")
+):
+    """Preview the hosts a host pattern targets, as ansible-playbook resolves it"""
+    try:
+        snapshot = inventory_snapshot()
+        return inventory_response(request, snapshot, inventory_resolve_json(snapshot, pattern))
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error resolving hosts: {str(e)}")
+
+
 @app.get("/api/playbooks", response_model=List[PlaybookInfo])
 async def get_playbooks():
     """Get all available playbooks"""
     if playbook_parser is None:
         raise HTTPException(status_code=500, detail="Playbook parser not initialized")
     try:
-        playbooks = playbook_parser.get_all_playbooks()
+        with time_parse('playbooks'):
+            playbooks = playbook_parser.get_all_playbooks()
         return [PlaybookInfo(**pb) for pb in playbooks]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting playbooks: {str(e)}")
@@ -163,7 +301,8 @@ async def get_playbooks():
 async def get_playbook(playbook_name: str):
     """Get specific playbook information"""
     try:
-        playbook = playbook_parser.get_playbook_by_name(playbook_name)
+        with time_parse('playbooks'):
+            playbook = playbook_parser.get_playbook_by_name(playbook_name)
         if not playbook:
             raise HTTPException(status_code=404, detail="Playbook not found")
         return PlaybookInfo(**playbook)
@@ -173,13 +312,27 @@ async def get_playbook(playbook_name: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/playbooks/{playbook_name}/profile", response_model=PlaybookProfile)
+async def get_playbook_profile(
+    playbook_name: str,
+    runs: int = Query(50, ge=1, le=1000, description="Number of latest profiled runs to include"),
+    limit: int = Query(20, ge=1, le=500, description="Number of tasks and roles to return")
+):
+    """Get the slowest tasks and roles across runs of a playbook, with percentiles"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    profile = await asyncio.to_thread(ansible_runner.playbook_profile, playbook_name, runs=runs, limit=limit)
+    return PlaybookProfile(playbook=playbook_name, **profile)
+
+
 @app.get("/api/tags", response_model=List[str])
 async def get_tags():
     """Get all available tags from all playbooks"""
     if playbook_parser is None:
         raise HTTPException(status_code=500, detail="Playbook parser not initialized")
     try:
-        tags = playbook_parser.get_all_tags()
+        with time_parse('playbooks'):
+            tags = playbook_parser.get_all_tags()
         return sorted(list(tags))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting tags: {str(e)}")
@@ -190,35 +343,69 @@ async def execute_playbook(request: ExecutionRequest):
     """Execute an Ansible playbook"""
     if ansible_runner is None:
         raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    shard_by = request.shard_by.value if request.shard_by else None
+    active = ansible_runner.active_duplicate(
+        request_fingerprint(request.playbook, request.hosts, request.tags, request.extra_vars, shard_by)
+    )
     try:
-        execution_id = ansible_runner.execute_playbook(
+        # Saving the record and writing limit files touch the disk, so off the loop
+        execution_id = await asyncio.to_thread(
+            ansible_runner.execute_playbook,
             playbook=request.playbook,
             hosts=request.hosts,
             tags=request.tags,
             extra_vars=request.extra_vars,
-            ask_password=request.ask_password
+            ask_password=request.ask_password,
+            priority=request.priority.value,
+            shard_by=shard_by,
+            retries=request.retries,
+            retry_backoff=request.retry_backoff,
+            preflight=request.preflight,
+            on_duplicate=request.on_duplicate.value if request.on_duplicate else None
         )
         
+        execution = ansible_runner.get_execution(execution_id)
+        status = ExecutionStatus(execution['status'])
+        coalesced = execution_id == active
+        if coalesced:
+            message = "Attached to an identical active execution"
+        elif execution.get('duplicate_of'):
+            message = f"Execution queued behind {execution['duplicate_of']}"
+        else:
+            message = "Execution started" if status == ExecutionStatus.RUNNING else "Execution queued"
         return ExecutionResponse(
             execution_id=execution_id,
-            status=ExecutionStatus.RUNNING,
+            status=status,
             playbook=request.playbook,
             hosts=request.hosts,
             tags=request.tags,
-            message="Execution started"
+            message=message,
+            coalesced=coalesced,
+            duplicate_of=execution.get('duplicate_of'),
+            **ansible_runner.queue_info(execution_id)
+        )
+    except DuplicateExecutionError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={'message': str(e), 'execution_id': e.execution_id}
         )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=f"Playbook not found: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error executing playbook: {str(e)}")
 
 
 @app.get("/api/executions/{execution_id}", response_model=ExecutionStatusResponse)
-async def get_execution_status(execution_id: str):
-    """Get execution status"""
-    execution = ansible_runner.get_execution(execution_id)
+async def get_execution_status(execution_id: str, include_output: bool = True):
+    """Get execution status, optionally without the full stdout"""
+    execution = await asyncio.to_thread(ansible_runner.get_execution, execution_id)
     if not execution:
         raise HTTPException(status_code=404, detail="Execution not found")
+    # Output of an evicted execution is decompressed from its archive, so off the loop
+    stdout = await asyncio.to_thread(ansible_runner.get_output, execution_id) if include_output else None
+    summary = await asyncio.to_thread(ansible_runner.get_summary, execution_id)
     
     return ExecutionStatusResponse(
         execution_id=execution['id'],
@@ -227,41 +414,394 @@ async def get_execution_status(execution_id: str):
         hosts=execution.get('hosts'),
         tags=execution.get('tags'),
         return_code=execution.get('return_code'),
-        stdout=execution.get('stdout', ''),
-        stderr=execution.get('stderr', ''),
+        stdout=stdout,
+        stderr=execution.get('stderr') or ''.join(execution.get('stderr_lines', ())),
+        priority=execution.get('priority'),
+        queued_at=execution.get('queued_at'),
         started_at=execution.get('started_at'),
-        finished_at=execution.get('finished_at')
+        finished_at=execution.get('finished_at'),
+        shard_by=execution.get('shard_by'),
+        shards=execution.get('shards'),
+        parent_id=execution.get('parent_id'),
+        attempt=execution.get('attempt') or 1,
+        retries=execution.get('retries') or 0,
+        preflight=bool(execution.get('preflight')),
+        skipped_hosts=execution.get('skipped_hosts'),
+        duplicate_of=execution.get('duplicate_of'),
+        tuning=execution.get('tuning'),
+        pipeline_id=execution.get('pipeline_id'),
+        pipeline_step=execution.get('pipeline_step'),
+        summary=summary,
+        **ansible_runner.queue_info(execution_id)
+    )
+
+
+@app.post("/api/executions/{execution_id}/retry", response_model=ExecutionResponse)
+async def retry_execution(execution_id: str, request: Optional[RetryRequest] = None):
+    """Run the playbook again on the failed and unreachable hosts of a finished execution"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    parent = await asyncio.to_thread(ansible_runner.get_execution, execution_id)
+    if not parent:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    if parent['status'] in ('pending', 'running'):
+        raise HTTPException(status_code=409, detail="Execution is still running")
+    
+    request = request or RetryRequest()
+    try:
+        retry_id = await asyncio.to_thread(
+            ansible_runner.retry_execution,
+            execution_id,
+            retries=request.retries,
+            retry_backoff=request.retry_backoff
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Playbook not found: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    execution = ansible_runner.get_execution(retry_id)
+    status = ExecutionStatus(execution['status'])
+    return ExecutionResponse(
+        execution_id=retry_id,
+        status=status,
+        playbook=execution['playbook'],
+        hosts=execution['hosts'],
+        tags=execution.get('tags'),
+        message=f"Retrying {len(execution['hosts'])} host(s) of {execution_id}",
+        **ansible_runner.queue_info(retry_id)
+    )
+
+
+@app.get("/api/executions/{execution_id}/log", response_model=ExecutionLogResponse)
+async def get_execution_log(
+    execution_id: str,
+    since: int = Query(0, ge=0, description="Line offset returned by the previous request"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of lines to return")
+):
+    """Get execution output added since a line offset"""
+    log = await asyncio.to_thread(ansible_runner.read_output, execution_id, since=since, limit=limit)
+    if log is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return ExecutionLogResponse(**log)
+
+
+@app.get("/api/executions/{execution_id}/stream")
+async def stream_execution_events(
+    execution_id: str,
+    since: int = Query(0, ge=0, description="Line offset to start from"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Stream execution output as Server-Sent Events
+    
+    Emits 'line', 'status' and 'done' events. Reconnecting clients resume
+    from the Last-Event-ID header, which takes precedence over 'since'.
+    """
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    if not await asyncio.to_thread(ansible_runner.get_execution, execution_id):
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    if last_event_id is not None:
+        try:
+            since = max(0, int(last_event_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    
+    return StreamingResponse(
+        stream_execution(ansible_runner, event_broker, execution_id, since=since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
-@app.get("/api/executions", response_model=List[ExecutionStatusResponse])
-async def list_executions():
-    """List all executions"""
-    executions = ansible_runner.list_executions()
-    return [
-        ExecutionStatusResponse(
-            execution_id=ex['id'],
-            status=ExecutionStatus(ex['status']),
-            playbook=ex['playbook'],
-            hosts=ex.get('hosts'),
-            tags=ex.get('tags'),
-            return_code=ex.get('return_code'),
-            started_at=ex.get('started_at'),
-            finished_at=ex.get('finished_at')
+@app.get("/api/executions/{execution_id}/hosts", response_model=List[HostResult])
+async def get_execution_hosts(execution_id: str, status: Optional[str] = None):
+    """Get per-host results of an execution, optionally filtered by status"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    if not await asyncio.to_thread(ansible_runner.get_execution, execution_id):
+        raise HTTPException(status_code=404, detail="Execution not found")
+    hosts = await asyncio.to_thread(ansible_runner.get_host_results, execution_id, status=status)
+    return [HostResult(**host) for host in hosts]
+
+
+@app.get("/api/executions/{execution_id}/tasks", response_model=List[TaskResult])
+async def get_execution_tasks(execution_id: str):
+    """Get per-task results of an execution in run order"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    if not await asyncio.to_thread(ansible_runner.get_execution, execution_id):
+        raise HTTPException(status_code=404, detail="Execution not found")
+    tasks = await asyncio.to_thread(ansible_runner.get_task_results, execution_id)
+    return [TaskResult(**task) for task in tasks]
+
+
+@app.get("/api/executions/{execution_id}/profile", response_model=ExecutionProfile)
+async def get_execution_profile(execution_id: str):
+    """Get the task and role timings of a finished execution"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    if not await asyncio.to_thread(ansible_runner.get_execution, execution_id):
+        raise HTTPException(status_code=404, detail="Execution not found")
+    profile = await asyncio.to_thread(ansible_runner.get_profile, execution_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No timings recorded for this execution")
+    return ExecutionProfile(execution_id=execution_id, **profile)
+
+
+@app.get("/api/executions", response_model=ExecutionPage)
+async def list_executions(
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    offset: int = Query(0, ge=0, description="Number of executions to skip"),
+    playbook: Optional[str] = None,
+    status: Optional[ExecutionStatus] = None,
+    host: Optional[str] = Query(None, description="Host or group targeted by the execution"),
+    since: Optional[str] = Query(None, description="Queued at or after this ISO timestamp"),
+    until: Optional[str] = Query(None, description="Queued before this ISO timestamp"),
+    parent_id: Optional[str] = Query(None, description="Only retries of this execution"),
+    tuning_profile: Optional[str] = Query(None, description="Only executions run with this tuning profile"),
+    pipeline_id: Optional[str] = Query(None, description="Only steps of this pipeline"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. execution_id,status")
+):
+    """List executions from the history store, newest first"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    try:
+        total, items = await asyncio.to_thread(
+            ansible_runner.list_executions,
+            limit=limit,
+            offset=offset,
+            playbook=playbook,
+            status=status.value if status else None,
+            host=host,
+            since=since,
+            until=until,
+            parent_id=parent_id,
+            tuning_profile=tuning_profile,
+            pipeline_id=pipeline_id,
+            fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None
         )
-        for ex in executions
-    ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ExecutionPage(total=total, limit=limit, offset=offset, items=items)
+
+
+@app.get("/api/search", response_model=LogSearchResponse)
+async def search_logs(
+    q: Optional[str] = Query(None, description='Words or "phrases" that must all appear; word* matches a prefix'),
+    host: Optional[str] = Query(None, description="Only lines of this host"),
+    task: Optional[str] = Query(None, description="Only lines of tasks whose name contains these words"),
+    result: Optional[str] = Query(None, description="Only host result lines: ok, changed, failed, unreachable or skipped"),
+    playbook: Optional[str] = None,
+    status: Optional[ExecutionStatus] = None,
+    since: Optional[str] = Query(None, description="Queued at or after this ISO timestamp"),
+    until: Optional[str] = Query(None, description="Queued before this ISO timestamp"),
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    offset: int = Query(0, ge=0, description="Number of lines to skip")
+):
+    """Search the output of all executions, newest first"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    if not ansible_runner.log_index.enabled:
+        raise HTTPException(status_code=503, detail="Full-text search is not available in this SQLite build")
+    if result is not None and result not in LINE_RESULTS:
+        raise HTTPException(status_code=400, detail=f"Invalid result: {result}. Use one of: {', '.join(LINE_RESULTS)}")
+    start = time.perf_counter()
+    try:
+        items, has_more = await asyncio.to_thread(
+            ansible_runner.search_logs,
+            query=q,
+            host=host,
+            task=task,
+            result=result,
+            playbook=playbook,
+            status=status.value if status else None,
+            since=since,
+            until=until,
+            limit=limit,
+            offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return LogSearchResponse(
+        limit=limit,
+        offset=offset,
+        has_more=has_more,
+        took_ms=(time.perf_counter() - start) * 1000,
+        items=items
+    )
+
+
+@app.get("/api/tuning", response_model=List[TuningSummary])
+async def get_tuning_summary(
+    playbook: Optional[str] = None,
+    since: Optional[str] = Query(None, description="Queued at or after this ISO timestamp")
+):
+    """Compare the throughput of finished executions per tuning profile"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    return await asyncio.to_thread(ansible_runner.tuning_summary, playbook=playbook, since=since)
+
+
+@app.get("/api/facts", response_model=List[CachedFacts])
+async def query_facts(
+    where: List[str] = Query([], description="Conditions as fact=value, e.g. product_name=HP Compaq 6005"),
+    fields: Optional[str] = Query(None, description="Comma separated facts to return, e.g. product_name,os_family"),
+    target: List[str] = Query([], description="Only these hosts or groups")
+):
+    """Find hosts in the fact cache whose facts match every condition"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    conditions = {}
+    for condition in where:
+        name, sep, value = condition.partition('=')
+        if not sep or not name.strip():
+            raise HTTPException(status_code=400, detail=f"Invalid condition: {condition}. Use fact=value")
+        conditions[name.strip()] = value.strip()
+    hosts = await asyncio.to_thread(
+        ansible_runner.query_facts,
+        where=conditions,
+        fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None,
+        targets=target or None
+    )
+    return [CachedFacts(**host) for host in hosts]
+
+
+@app.get("/api/facts/{host}", response_model=CachedFacts)
+async def get_host_facts(host: str):
+    """Get all cached facts of a host"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    facts = await asyncio.to_thread(ansible_runner.get_facts, host)
+    if facts is None:
+        raise HTTPException(status_code=404, detail="No cached facts for this host")
+    return CachedFacts(**facts)
+
+
+@app.delete("/api/facts", response_model=FactInvalidationResponse)
+async def invalidate_facts(target: List[str] = Query([], description="Hosts or groups; all hosts if omitted")):
+    """Drop cached facts so the next run gathers them again"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    try:
+        invalidated = await asyncio.to_thread(ansible_runner.invalidate_facts, target or None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FactInvalidationResponse(invalidated=invalidated)
+
+
+@app.delete("/api/facts/{host}", response_model=FactInvalidationResponse)
+async def invalidate_host_facts(host: str):
+    """Drop the cached facts of a host or group"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    try:
+        invalidated = await asyncio.to_thread(ansible_runner.invalidate_facts, [host])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FactInvalidationResponse(invalidated=invalidated)
+
+
+@app.get("/api/queue", response_model=QueueStatusResponse)
+async def get_queue():
+    """Get running and pending executions with queue positions and estimated start times"""
+    if ansible_runner is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    return QueueStatusResponse(**ansible_runner.scheduler.snapshot())
 
 
 @app.delete("/api/executions/{execution_id}")
 async def cancel_execution(execution_id: str):
-    """Cancel a running execution"""
-    success = ansible_runner.cancel_execution(execution_id)
+    """Cancel a pending or running execution"""
+    success = await asyncio.to_thread(ansible_runner.cancel_execution, execution_id)
     if not success:
         raise HTTPException(status_code=404, detail="Execution not found or cannot be cancelled")
     return {"message": "Execution cancelled"}
 
 
+def pipeline_response(pipeline: dict) -> PipelineStatusResponse:
+    """Build the status response of a pipeline record"""
+    duration = None
+    if pipeline.get('started_at'):
+        end = datetime.fromisoformat(pipeline['finished_at']) if pipeline.get('finished_at') else datetime.now()
+        duration = (end - datetime.fromisoformat(pipeline['started_at'])).total_seconds()
+    return PipelineStatusResponse(
+        pipeline_id=pipeline['id'],
+        name=pipeline.get('name'),
+        status=ExecutionStatus(pipeline['status']),
+        hosts=pipeline.get('hosts'),
+        created_at=pipeline.get('created_at'),
+        started_at=pipeline.get('started_at'),
+        finished_at=pipeline.get('finished_at'),
+        duration=duration,
+        steps=pipeline['steps']
+    )
+
+
+@app.post("/api/pipelines", response_model=PipelineStatusResponse)
+async def create_pipeline(request: PipelineRequest):
+    """Run several playbooks as a dependency graph, each step on the hosts that passed its dependencies"""
+    if pipeline_manager is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    try:
+        pipeline_id = await asyncio.to_thread(
+            pipeline_manager.create_pipeline,
+            steps=[step.model_dump() for step in request.steps],
+            hosts=request.hosts,
+            name=request.name,
+            priority=request.priority.value,
+            ask_password=request.ask_password
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return pipeline_response(await asyncio.to_thread(pipeline_manager.get_pipeline, pipeline_id))
+
+
+@app.get("/api/pipelines", response_model=PipelinePage)
+async def list_pipelines(
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    offset: int = Query(0, ge=0, description="Number of pipelines to skip"),
+    status: Optional[ExecutionStatus] = None
+):
+    """List pipelines, newest first"""
+    if pipeline_manager is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    def load():
+        total, items = pipeline_manager.list_pipelines(
+            limit=limit, offset=offset, status=status.value if status else None
+        )
+        return total, [pipeline_manager.get_pipeline(item['id']) or item for item in items]
+
+    total, items = await asyncio.to_thread(load)
+    return PipelinePage(
+        total=total, limit=limit, offset=offset,
+        items=[pipeline_response(item) for item in items]
+    )
+
+
+@app.get("/api/pipelines/{pipeline_id}", response_model=PipelineStatusResponse)
+async def get_pipeline(pipeline_id: str):
+    """Get the status of a pipeline and its steps"""
+    if pipeline_manager is None:
+        raise HTTPException(status_code=500, detail="Ansible runner not initialized")
+    pipeline = await asyncio.to_thread(pipeline_manager.get_pipeline, pipeline_id)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return pipeline_response(pipeline)
+
+
+@app.delete("/api/pipelines/{pipeline_id}")
+async def cancel_pipeline(pipeline_id: str):
+    """Cancel a running pipeline and its running steps"""
+    if pipeline_manager is None or not await asyncio.to_thread(pipeline_manager.cancel_pipeline, pipeline_id):
+        raise HTTPException(status_code=404, detail="Pipeline not found or not running")
+    return {"message": "Pipeline cancelled"}
+
+
 # LLM placeholder endpoints
 @app.post("/api/llm/suggest", response_model=LLMSuggestResponse)
 async def llm_suggest(request: LLMSuggestRequest):
@@ -0,0 +1,120 @@
+"""Prometheus metrics of the API and the execution engine"""
+
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+
+# Playbook runs take from seconds to well over an hour
+EXECUTION_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+HOST_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+FINAL_STATUSES = ('success', 'failed', 'cancelled')
+
+EXECUTIONS = Counter(
+    'ansible_labs_executions',
+    'Finished executions by status',
+    ['status']
+)
+QUEUE_DEPTH = Gauge(
+    'ansible_labs_queue_depth',
+    'Executions waiting for a scheduler slot'
+)
+RUNNING_EXECUTIONS = Gauge(
+    'ansible_labs_running_executions',
+    'Executions currently running'
+)
+EXECUTION_DURATION = Histogram(
+    'ansible_labs_execution_duration_seconds',
+    'Wall time of finished executions, from start to finish',
+    ['playbook', 'status'],
+    buckets=EXECUTION_BUCKETS
+)
+HOST_DURATION = Histogram(
+    'ansible_labs_host_duration_seconds',
+    'Time each host spent running tasks in an execution',
+    ['status'],
+    buckets=HOST_BUCKETS
+)
+REQUEST_LATENCY = Histogram(
+    'ansible_labs_http_request_duration_seconds',
+    'API request latency',
+    ['method', 'route', 'status']
+)
+CACHED_EXECUTIONS = Gauge(
+    'ansible_labs_cached_executions',
+    'Finished executions held in memory'
+)
+CACHED_OUTPUT_BYTES = Gauge(
+    'ansible_labs_cached_output_bytes',
+    'Approximate memory held by the output of cached finished executions'
+)
+PARSE_DURATION = Histogram(
+    'ansible_labs_parse_duration_seconds',
+    'Time spent parsing the inventory and the playbooks',
+    ['parser'],
+    buckets=PARSE_BUCKETS
+)
+
+
+@contextmanager
+def time_parse(parser: str) -> Iterator[None]:
+    """Measure a parse, e.g. with time_parse('inventory'): parser.parse()"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PARSE_DURATION.labels(parser).observe(time.perf_counter() - start)
+
+
+def observe_request(method: str, route: str, status: int, duration: float):
+    """Record the latency of an API request"""
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(duration)
+
+
+class ExecutionMetrics:
+    """Feed the execution metrics from an AnsibleRunner"""
+
+    def __init__(self, runner):
+        """
+        Attach to a runner
+
+        Queue gauges are read from the scheduler at scrape time; finished
+        executions are recorded from the runner's status notifications.
+
+        Args:
+            runner: AnsibleRunner to observe
+        """
+        self.runner = runner
+        QUEUE_DEPTH.set_function(lambda: runner.scheduler.pending_count)
+        RUNNING_EXECUTIONS.set_function(lambda: runner.scheduler.running_count)
+        CACHED_EXECUTIONS.set_function(lambda: len(runner.finished))
+        CACHED_OUTPUT_BYTES.set_function(lambda: runner.finished.byte_size)
+        runner.add_listener(self.on_update)
+
+    def on_update(self, execution_id: str, event: str, data: Optional[str] = None):
+        """Record an execution once it left the active executions in a final status"""
+        if event != 'status' or data not in FINAL_STATUSES or execution_id in self.runner.executions:
+            return
+        execution = self.runner.get_execution(execution_id)
+        if execution is None:
+            return
+        EXECUTIONS.labels(data).inc()
+
+        if execution.get('started_at') and execution.get('finished_at'):
+            duration = (datetime.fromisoformat(execution['finished_at']) -
+                        datetime.fromisoformat(execution['started_at'])).total_seconds()
+            EXECUTION_DURATION.labels(execution['playbook'], data).observe(max(duration, 0.0))
+
+        statuses = {host['host']: host['status'] for host in self.runner.get_host_results(execution_id)}
+        for host, duration in self.runner.events.get_host_durations(execution_id).items():
+            HOST_DURATION.labels(statuses.get(host, 'ok')).observe(duration)
+
+
+def render() -> bytes:
+    """Render all metrics in the Prometheus text format"""
+    return generate_latest()
@@ -14,6 +14,35 @@ class ExecutionStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class ExecutionPriority(str, Enum):
+    """Execution priority class"""
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class ShardMode(str, Enum):
+    """How to split an execution into parallel shards"""
+    GROUP = "group"
+    CONNECTION = "connection"
+
+
+class DuplicatePolicy(str, Enum):
+    """What to do with a request identical to a pending or running execution"""
+    ATTACH = "attach"
+    QUEUE = "queue"
+    REJECT = "reject"
+
+
+class ShardInfo(BaseModel):
+    """One ansible-playbook process of a sharded execution"""
+    name: str
+    hosts: int
+    forks: int
+    status: ExecutionStatus
+    return_code: Optional[int] = None
+
+
 class HostInfo(BaseModel):
     """Host information model"""
     name: str
@@ -29,6 +58,26 @@ class GroupInfo(BaseModel):
     vars: Optional[Dict[str, str]] = None
 
 
+class InventoryStatus(BaseModel):
+    """Version of the loaded inventory"""
+    version: int = Field(..., description="Increased every time inventory.ini changes")
+    loaded_at: str = Field(..., description="When this version was parsed")
+    groups: int
+    hosts: int
+
+
+class TargetPreview(BaseModel):
+    """Hosts an Ansible host pattern targets"""
+    pattern: str
+    terms: List[str] = Field(..., description="Terms of the pattern, to send as the hosts of an execution")
+    version: int = Field(..., description="Inventory version the pattern was resolved against")
+    count: int
+    hosts: List[str] = Field(..., description="Target hosts in the order Ansible runs them")
+    unmatched: List[str] = Field(
+        default_factory=list, description="Pattern terms that matched no group or host"
+    )
+
+
 class PlaybookInfo(BaseModel):
     """Playbook information model"""
     name: str
@@ -41,10 +90,34 @@ class PlaybookInfo(BaseModel):
 class ExecutionRequest(BaseModel):
     """Request model for executing a playbook"""
     playbook: str = Field(..., description="Playbook file name")
-    hosts: Optional[List[str]] = Field(None, description="List of host names or groups")
+    hosts: Optional[List[str]] = Field(
+        None, description="Host names, groups or host pattern terms, e.g. ['lab1', 'lab2', '!111']"
+    )
     tags: Optional[List[str]] = Field(None, description="List of tags to execute")
     extra_vars: Optional[Dict[str, Any]] = Field(None, description="Extra variables")
     ask_password: bool = Field(True, description="Ask for password (-k flag)")
+    priority: ExecutionPriority = Field(ExecutionPriority.NORMAL, description="Scheduling priority class")
+    shard_by: Optional[ShardMode] = Field(
+        None, description="Run the targets as parallel shards split by inventory group or connection type"
+    )
+    retries: int = Field(0, ge=0, le=5, description="Automatic retries of the failed and unreachable hosts")
+    retry_backoff: Optional[float] = Field(
+        None, ge=0, description="Seconds before the first automatic retry, doubled on each further attempt"
+    )
+    preflight: bool = Field(
+        False, description="Probe the targets over TCP first and run only on the hosts that answered"
+    )
+    on_duplicate: Optional[DuplicatePolicy] = Field(
+        None, description="Policy for a request identical to an active execution (default: server setting)"
+    )
+
+
+class RetryRequest(BaseModel):
+    """Request model for retrying the failed and unreachable hosts of an execution"""
+    retries: Optional[int] = Field(
+        None, ge=0, le=5, description="Automatic retries of the new execution (default: parent's remaining retries)"
+    )
+    retry_backoff: Optional[float] = Field(None, ge=0, description="Backoff of the automatic retries in seconds")
 
 
 class ExecutionResponse(BaseModel):
@@ -55,6 +128,44 @@ class ExecutionResponse(BaseModel):
     hosts: Optional[List[str]] = None
     tags: Optional[List[str]] = None
     message: Optional[str] = None
+    queue_position: Optional[int] = None
+    estimated_start_at: Optional[str] = None
+    coalesced: bool = Field(False, description="The request was attached to an identical active execution")
+    duplicate_of: Optional[str] = Field(None, description="Identical execution this one was queued behind")
+
+
+class ExecutionTuning(BaseModel):
+    """Connection tuning applied to an execution"""
+    profile: str = Field(..., description="small, medium or large")
+    forks: int
+    pipelining: bool
+    control_persist: Optional[int] = Field(None, description="SSH ControlPersist in seconds")
+    timeout: int = Field(..., description="Connection timeout in seconds")
+    targets: int = Field(..., description="Target hosts the profile was picked for")
+    connection: str = Field(..., description="Connection type of the targets, or mixed")
+    cpus: int = Field(..., description="CPUs of the control node")
+    memory: Optional[int] = Field(None, description="Available memory of the control node in bytes")
+
+
+class HostStatusCounts(BaseModel):
+    """Number of hosts per summarized status"""
+    ok: int = 0
+    changed: int = 0
+    failed: int = 0
+    unreachable: int = 0
+    total: int = 0
+    recapped: int = Field(0, description="Hosts whose counters come from the final PLAY RECAP")
+
+
+class ExecutionSummary(BaseModel):
+    """Live PLAY RECAP and task progress of an execution"""
+    hosts: HostStatusCounts
+    counters: Dict[str, int] = Field(..., description="Totals of every PLAY RECAP counter across hosts")
+    play: Optional[str] = Field(None, description="Current play")
+    task: Optional[str] = Field(None, description="Current task")
+    task_index: int = Field(0, description="Tasks started so far, handlers aside")
+    expected_tasks: Optional[int] = Field(None, description="Estimated total from earlier runs of the same playbook and tags")
+    progress: Optional[float] = Field(None, description="Completed share of the expected tasks, from 0 to 1")
 
 
 class ExecutionStatusResponse(BaseModel):
@@ -67,8 +178,248 @@ class ExecutionStatusResponse(BaseModel):
     return_code: Optional[int] = None
     stdout: Optional[str] = None
     stderr: Optional[str] = None
+    priority: Optional[ExecutionPriority] = None
+    queued_at: Optional[str] = None
     started_at: Optional[str] = None
     finished_at: Optional[str] = None
+    queue_position: Optional[int] = None
+    estimated_start_at: Optional[str] = None
+    shard_by: Optional[ShardMode] = None
+    shards: Optional[List[ShardInfo]] = None
+    parent_id: Optional[str] = Field(None, description="Execution this one retries")
+    attempt: int = 1
+    retries: int = Field(0, description="Automatic retries left")
+    preflight: bool = False
+    skipped_hosts: Optional[List[str]] = Field(None, description="Hosts skipped by the pre-flight probe")
+    duplicate_of: Optional[str] = Field(None, description="Identical execution this one was queued behind")
+    tuning: Optional[ExecutionTuning] = None
+    pipeline_id: Optional[str] = Field(None, description="Pipeline this execution is a step of")
+    pipeline_step: Optional[str] = None
+    summary: Optional[ExecutionSummary] = None
+
+
+class ExecutionLogResponse(BaseModel):
+    """Response model for incremental execution output"""
+    execution_id: str
+    status: ExecutionStatus
+    lines: List[str] = []
+    streams: List[str] = Field([], description="Stream of each line: stdout or stderr")
+    timestamps: List[Optional[float]] = Field([], description="Epoch time each line was received")
+    offset: int = Field(..., description="Line offset of the first returned line")
+    next_offset: int = Field(..., description="Cursor to pass as 'since' on the next request")
+    byte_offset: int = Field(..., description="Byte offset matching next_offset")
+    total_lines: int
+    complete: bool = Field(..., description="True when the execution finished and all output was read")
+
+
+class ExecutionPage(BaseModel):
+    """Paginated list of executions with the requested fields only"""
+    total: int
+    limit: int
+    offset: int
+    items: List[Dict[str, Any]] = []
+
+
+class HostResult(BaseModel):
+    """Per-host result of an execution"""
+    host: str
+    status: str = Field(..., description="ok, changed, failed or unreachable")
+    ok: int = 0
+    changed: int = 0
+    failed: int = 0
+    unreachable: int = 0
+    skipped: int = 0
+    rescued: int = 0
+    ignored: int = 0
+    recap: bool = Field(False, description="True when counters come from the PLAY RECAP")
+    failed_tasks: List[str] = []
+
+
+class TaskResult(BaseModel):
+    """Per-task result of an execution"""
+    index: int
+    name: str
+    role: Optional[str] = None
+    play: Optional[str] = None
+    handler: bool = False
+    started_at: Optional[float] = None
+    max_duration: Optional[float] = None
+    counts: Dict[str, int] = {}
+    failed_hosts: List[str] = []
+
+
+class TaskTiming(BaseModel):
+    """Duration of one task as reported by profile_tasks"""
+    position: int
+    role: Optional[str] = None
+    task: str
+    duration: float
+
+
+class RoleTiming(BaseModel):
+    """Duration of one role as reported by profile_roles"""
+    role: str
+    duration: float
+
+
+class ExecutionProfile(BaseModel):
+    """Task and role timings of an execution"""
+    execution_id: str
+    total: Optional[float] = Field(None, description="Total run time in seconds")
+    tasks: List[TaskTiming] = []
+    roles: List[RoleTiming] = []
+
+
+class TimingStats(BaseModel):
+    """Duration statistics across runs, in seconds"""
+    runs: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+class TaskTimingStats(TimingStats):
+    """Duration statistics of a task across runs"""
+    role: Optional[str] = None
+    task: str
+
+
+class RoleTimingStats(TimingStats):
+    """Duration statistics of a role across runs"""
+    role: str
+
+
+class PlaybookProfile(BaseModel):
+    """Slowest tasks and roles across the latest runs of a playbook"""
+    playbook: str
+    runs: int = Field(..., description="Number of profiled runs included")
+    total: Optional[TimingStats] = None
+    tasks: List[TaskTimingStats] = []
+    roles: List[RoleTimingStats] = []
+
+
+class LogSearchHit(BaseModel):
+    """Output line matching a log search"""
+    execution_id: str
+    playbook: str
+    status: ExecutionStatus
+    queued_at: Optional[str] = None
+    line_no: int = Field(..., description="Line offset in the execution output, usable as the log cursor")
+    stream: str
+    host: Optional[str] = None
+    task: Optional[str] = None
+    result: Optional[str] = Field(None, description="ok, changed, failed, unreachable or skipped for host result lines")
+    line: str
+    snippet: str = Field(..., description="Line with the matches in [brackets]")
+
+
+class LogSearchResponse(BaseModel):
+    """Page of log search results, newest first"""
+    limit: int
+    offset: int
+    has_more: bool
+    took_ms: float
+    items: List[LogSearchHit] = []
+
+
+class TuningSummary(BaseModel):
+    """Throughput of finished executions run with a tuning profile"""
+    profile: str
+    runs: int
+    mean_duration: Optional[float] = Field(None, description="Mean wall time in seconds")
+    mean_targets: Optional[float] = None
+    mean_forks: Optional[float] = None
+    hosts_per_second: Optional[float] = Field(None, description="Targets over the wall time of all runs")
+
+
+class CachedFacts(BaseModel):
+    """Facts of a host in the fact cache"""
+    host: str
+    cached_at: float = Field(..., description="Epoch time the facts were gathered")
+    age: float = Field(..., description="Seconds since the facts were gathered")
+    ttl: int = Field(..., description="Seconds the facts stay fresh for this host")
+    fresh: bool
+    facts: Dict[str, Any] = {}
+
+
+class FactInvalidationResponse(BaseModel):
+    """Hosts whose cached facts were removed"""
+    invalidated: List[str] = []
+
+
+class QueuedExecutionInfo(BaseModel):
+    """Execution held by the scheduler"""
+    execution_id: str
+    playbook: str
+    priority: ExecutionPriority
+    groups: List[str] = []
+    position: Optional[int] = None
+    estimated_start_at: Optional[str] = None
+
+
+class QueueStatusResponse(BaseModel):
+    """Response model for the scheduler queue"""
+    max_concurrent: int
+    default_group_limit: int
+    group_limits: Dict[str, int] = {}
+    running: List[QueuedExecutionInfo] = []
+    pending: List[QueuedExecutionInfo] = []
+
+
+class PipelineStep(BaseModel):
+    """Step of a pipeline request"""
+    name: str = Field(..., min_length=1, description="Step name, unique in the pipeline")
+    playbook: str = Field(..., description="Playbook file name")
+    tags: Optional[List[str]] = Field(None, description="List of tags to execute")
+    extra_vars: Optional[Dict[str, Any]] = Field(None, description="Extra variables")
+    preflight: bool = Field(False, description="Probe the step's targets over TCP first")
+    depends_on: List[str] = Field([], description="Steps that must finish first; this step runs on the hosts that passed all of them")
+
+
+class PipelineRequest(BaseModel):
+    """Request model for running several playbooks as a dependency graph"""
+    name: Optional[str] = Field(None, description="Pipeline name")
+    hosts: List[str] = Field(..., min_length=1, description="Hosts or groups of the steps without dependencies, e.g. ['all']")
+    ask_password: bool = Field(True, description="Ask for password (-k flag)")
+    priority: ExecutionPriority = Field(ExecutionPriority.NORMAL, description="Scheduling priority class of every step")
+    steps: List[PipelineStep] = Field(..., min_length=1)
+
+
+class PipelineStepStatus(BaseModel):
+    """State of a pipeline step"""
+    name: str
+    playbook: str
+    depends_on: List[str] = []
+    status: str = Field(..., description="waiting, pending, running, success, failed, cancelled or skipped")
+    execution_id: Optional[str] = None
+    hosts: Optional[List[str]] = Field(None, description="Targets the step ran on")
+    passed_hosts: Optional[List[str]] = Field(None, description="Targets that neither failed nor were unreachable")
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+class PipelineStatusResponse(BaseModel):
+    """Response model for pipeline status"""
+    pipeline_id: str
+    name: Optional[str] = None
+    status: ExecutionStatus
+    hosts: Optional[List[str]] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    duration: Optional[float] = Field(None, description="Seconds from start to finish, or until now while running")
+    steps: List[PipelineStepStatus] = []
+
+
+class PipelinePage(BaseModel):
+    """Paginated list of pipelines"""
+    total: int
+    limit: int
+    offset: int
+    items: List[PipelineStatusResponse] = []
 
 
 class LLMSuggestRequest(BaseModel):
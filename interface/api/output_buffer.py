@@ -0,0 +1,170 @@
+"""Append-only chunked buffer for execution output"""
+
+import re
+import threading
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+
+STREAMS = ('stdout', 'stderr')
+STREAM_TAGS = {'stdout': 'O', 'stderr': 'E'}
+
+# Upper-case tags mark lines that ended with a newline; lower-case ones mark
+# lines that did not, whose record terminator was added for the log file
+LOG_LINE_PATTERN = re.compile(r'^(\d+\.\d{3}) ([OEoe]) (.*)$', re.DOTALL)
+
+
+def format_log_line(line: str, stream: str, timestamp: float) -> str:
+    """
+    Format an output line as one log file record, '<epoch> <O|E> <line>'
+
+    A line without a trailing newline (a chunk of an overlong line or the
+    last line of a stream) gets one, with its tag in lower case, so every
+    record stays on its own physical line and the next one cannot merge
+    into it.
+    """
+    if line.endswith('\n'):
+        return f"{timestamp:.3f} {STREAM_TAGS[stream]} {line}"
+    return f"{timestamp:.3f} {STREAM_TAGS[stream].lower()} {line}\n"
+
+
+def parse_log_line(raw: str) -> Tuple[str, str, Optional[float]]:
+    """
+    Parse a log file record written by format_log_line
+
+    Lines from logs written before stream tagging are returned as stdout
+    without a timestamp.
+
+    Returns:
+        Tuple of (line, stream, timestamp), the line exactly as it was output
+    """
+    match = LOG_LINE_PATTERN.match(raw)
+    if not match:
+        return raw, 'stdout', None
+    tag, line = match.group(2), match.group(3)
+    if tag.islower() and line.endswith('\n'):
+        line = line[:-1]
+    stream = 'stderr' if tag.upper() == 'E' else 'stdout'
+    return line, stream, float(match.group(1))
+
+
+class OutputBuffer:
+    """
+    Append-only output buffer split into fixed-size line chunks
+
+    Lines are never concatenated into one big string, so appending is O(1)
+    and reading everything after a cursor only touches the chunks that hold
+    the new lines. The cursor is a line offset; the byte offset of every
+    line start is recorded too, along with the stream the line came from
+    and the time it was received.
+    """
+
+    CHUNK_LINES = 1024
+
+    def __init__(self, chunk_lines: Optional[int] = None):
+        """
+        Initialize buffer
+
+        Args:
+            chunk_lines: Number of lines per chunk. If None, uses CHUNK_LINES.
+        """
+        self.chunk_lines = chunk_lines or self.CHUNK_LINES
+        self._chunks: List[List[str]] = []
+        self._line_offsets = array('Q')
+        self._streams = bytearray()
+        self._timestamps = array('d')
+        self._line_count = 0
+        self._byte_size = 0
+        self._lock = threading.RLock()
+
+    def append(self, line: str, stream: str = 'stdout', timestamp: Optional[float] = None) -> int:
+        """
+        Append a line to the buffer
+
+        Args:
+            line: Line of output, including its trailing newline
+            stream: 'stdout' or 'stderr'
+            timestamp: Time the line was received. If None, uses now.
+
+        Returns:
+            Line offset of the appended line
+        """
+        with self._lock:
+            self._streams.append(STREAMS.index(stream))
+            self._timestamps.append(time.time() if timestamp is None else timestamp)
+            if not self._chunks or len(self._chunks[-1]) >= self.chunk_lines:
+                self._chunks.append([])
+            self._chunks[-1].append(line)
+            self._line_offsets.append(self._byte_size)
+            self._byte_size += len(line.encode('utf-8'))
+            offset = self._line_count
+            self._line_count += 1
+            return offset
+
+    def read_since(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[str], int]:
+        """
+        Read lines starting at a line offset
+
+        Args:
+            offset: Line offset to start from
+            limit: Maximum number of lines to return. If None, returns all.
+
+        Returns:
+            Tuple of (lines, next_offset)
+        """
+        with self._lock:
+            offset = max(0, min(offset, self._line_count))
+            end = self._line_count if limit is None else min(self._line_count, offset + limit)
+            lines: List[str] = []
+            position = offset
+            while position < end:
+                chunk_index, line_index = divmod(position, self.chunk_lines)
+                chunk = self._chunks[chunk_index]
+                take = min(len(chunk) - line_index, end - position)
+                lines.extend(chunk[line_index:line_index + take])
+                position += take
+            return lines, end
+
+    def read_records_since(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[List[str], List[str], List[float], int]:
+        """
+        Read lines with their stream and timestamp starting at a line offset
+
+        Returns:
+            Tuple of (lines, streams, timestamps, next_offset)
+        """
+        with self._lock:
+            lines, end = self.read_since(offset, limit)
+            start = end - len(lines)
+            streams = [STREAMS[s] for s in self._streams[start:end]]
+            timestamps = list(self._timestamps[start:end])
+            return lines, streams, timestamps, end
+
+    def byte_offset(self, line_offset: int) -> int:
+        """Get the byte offset where a line starts"""
+        with self._lock:
+            if line_offset >= self._line_count:
+                return self._byte_size
+            return self._line_offsets[max(0, line_offset)]
+
+    def getvalue(self) -> str:
+        """Get the whole buffer as a single string"""
+        with self._lock:
+            return ''.join(''.join(chunk) for chunk in self._chunks)
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the buffer"""
+        return self._line_count
+
+    @property
+    def byte_size(self) -> int:
+        """Total size of the buffer in bytes"""
+        return self._byte_size
+
+    def __len__(self) -> int:
+        return self._line_count
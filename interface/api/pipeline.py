@@ -0,0 +1,379 @@
+"""Multi-playbook pipelines whose steps run as a dependency graph"""
+
+import json
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from interface.api.database import Database
+from interface.api.execution_store import redact_secrets
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pipelines (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    status TEXT NOT NULL,
+    hosts TEXT,
+    priority TEXT,
+    ask_password INTEGER,
+    steps TEXT NOT NULL,
+    created_at TEXT,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pipelines_created ON pipelines (created_at);
+"""
+
+# Step statuses that will not change anymore
+STEP_FINAL_STATUSES = ('success', 'failed', 'cancelled', 'skipped')
+EXECUTION_FINAL_STATUSES = ('success', 'failed', 'cancelled')
+
+
+def order_steps(steps: List[Dict]) -> List[str]:
+    """
+    Validate step names and dependencies and sort the steps topologically
+
+    Raises:
+        ValueError: On duplicate names, unknown dependencies or cycles
+
+    Returns:
+        Step names with every step after its dependencies
+    """
+    names = [step['name'] for step in steps]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate step names: {', '.join(duplicates)}")
+    depends = {step['name']: list(step.get('depends_on') or ()) for step in steps}
+    for name, deps in depends.items():
+        unknown = [dep for dep in deps if dep not in depends]
+        if unknown:
+            raise ValueError(f"Step {name} depends on unknown steps: {', '.join(unknown)}")
+
+    ordered: List[str] = []
+    state: Dict[str, int] = {}
+
+    def visit(name: str, path: List[str]):
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = 1
+        for dep in depends[name]:
+            visit(dep, path + [name])
+        state[name] = 2
+        ordered.append(name)
+
+    for name in names:
+        visit(name, [])
+    return ordered
+
+
+class PipelineStore:
+    """Store pipeline records, with the state of every step, in SQLite"""
+
+    COLUMNS = ('id', 'name', 'status', 'hosts', 'priority', 'ask_password', 'steps',
+               'created_at', 'started_at', 'finished_at')
+    JSON_COLUMNS = ('hosts', 'steps')
+
+    def __init__(self, database: Optional[Database] = None):
+        """
+        Initialize store
+
+        Args:
+            database: Database to use. If None, opens the default database.
+        """
+        self.db = database or Database()
+        self.db.executescript(SCHEMA)
+
+    def save(self, pipeline: Dict):
+        """Insert or update a pipeline record, with the secret extra vars of its steps redacted"""
+        pipeline = {**pipeline, 'steps': [redact_secrets(step) for step in pipeline.get('steps') or ()]}
+        values = []
+        for column in self.COLUMNS:
+            value = pipeline.get(column)
+            if column in self.JSON_COLUMNS and value is not None:
+                value = json.dumps(value)
+            values.append(value)
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        updates = ', '.join(f"{c} = excluded.{c}" for c in self.COLUMNS if c != 'id')
+        self.db.execute(
+            f"INSERT INTO pipelines ({', '.join(self.COLUMNS)}) VALUES ({placeholders}) "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}",
+            values
+        )
+
+    def get(self, pipeline_id: str) -> Optional[Dict]:
+        """Get a pipeline record by ID"""
+        row = self.db.query_one(
+            f"SELECT {', '.join(self.COLUMNS)} FROM pipelines WHERE id = ?",
+            (pipeline_id,)
+        )
+        return self._to_record(row) if row else None
+
+    def query(self, limit: int = 50, offset: int = 0, status: Optional[str] = None) -> Tuple[int, List[Dict]]:
+        """
+        List pipelines, newest first
+
+        Returns:
+            Tuple of (total matching records, records)
+        """
+        where, params = ("WHERE status = ?", [status]) if status else ("", [])
+        total = self.db.query_one(f"SELECT COUNT(*) FROM pipelines {where}", params)[0]
+        rows = self.db.query(
+            f"SELECT {', '.join(self.COLUMNS)} FROM pipelines {where} "
+            f"ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        return total, [self._to_record(row) for row in rows]
+
+    def mark_interrupted(self) -> int:
+        """
+        Fail pipelines left running by a previous process
+
+        Returns:
+            Number of pipelines updated
+        """
+        return self.db.execute(
+            "UPDATE pipelines SET status = 'failed', finished_at = ? WHERE status = 'running'",
+            (datetime.now().isoformat(),)
+        )
+
+    def _to_record(self, row) -> Dict:
+        record = dict(row)
+        for column in self.JSON_COLUMNS:
+            if record.get(column) is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+
+class PipelineManager:
+    """
+    Run pipelines of playbooks on an AnsibleRunner
+
+    Each step becomes an execution of its own, tagged with the pipeline ID.
+    Steps without dependencies start at once and run in parallel, subject to
+    the scheduler's limits. A step starts when all its dependencies finished,
+    on the hosts that passed every one of them; with no such host it is
+    skipped. Steps are driven by the runner's status notifications.
+
+    The steps of a pipeline share its group slots: parallel branches on the
+    same group run together, while other executions on that group wait for
+    the pipeline as for a single execution.
+    """
+
+    def __init__(self, runner, store: Optional[PipelineStore] = None):
+        """
+        Attach to a runner
+
+        Args:
+            runner: AnsibleRunner that runs the steps
+            store: Pipeline store. If None, uses the runner's database.
+        """
+        self.runner = runner
+        self.store = store or PipelineStore(runner.store.db)
+        self.store.mark_interrupted()
+        self.pipelines: Dict[str, Dict] = {}
+        self._steps_by_execution: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.RLock()
+        runner.add_listener(self.on_update)
+
+    def create_pipeline(
+        self,
+        steps: List[Dict[str, Any]],
+        hosts: Optional[List[str]] = None,
+        name: Optional[str] = None,
+        priority: str = 'normal',
+        ask_password: bool = True
+    ) -> str:
+        """
+        Create a pipeline and start the steps without dependencies
+
+        Args:
+            steps: Steps with name, playbook and optionally tags, extra_vars,
+                preflight and depends_on (names of earlier steps)
+            hosts: Hosts or groups of the first steps, e.g. ['all']. Every
+                step gets its targets as '{{ local }}', so they are required.
+            name: Pipeline name
+            priority: Priority class of every step
+            ask_password: Whether the steps ask for the password
+
+        Returns:
+            Pipeline ID
+
+        Raises:
+            ValueError: If there are no hosts or the steps do not form a valid
+                dependency graph
+            FileNotFoundError: If a playbook does not exist
+        """
+        if not steps:
+            raise ValueError("A pipeline needs at least one step")
+        if not hosts:
+            raise ValueError("A pipeline needs target hosts, e.g. ['all']")
+        order_steps(steps)
+        for step in steps:
+            if not (self.runner.project_dir / step['playbook']).exists():
+                raise FileNotFoundError(f"Playbook not found: {step['playbook']}")
+
+        now = datetime.now().isoformat()
+        pipeline = {
+            'id': str(uuid.uuid4()),
+            'name': name,
+            'status': 'running',
+            'hosts': hosts,
+            'priority': priority,
+            'ask_password': ask_password,
+            'created_at': now,
+            'started_at': now,
+            'finished_at': None,
+            'steps': [
+                {
+                    'name': step['name'],
+                    'playbook': step['playbook'],
+                    'tags': step.get('tags'),
+                    'extra_vars': step.get('extra_vars'),
+                    'preflight': bool(step.get('preflight')),
+                    'depends_on': list(step.get('depends_on') or ()),
+                    'status': 'waiting',
+                    'execution_id': None,
+                    'hosts': None,
+                    'passed_hosts': None,
+                    'started_at': None,
+                    'finished_at': None,
+                    'error': None,
+                }
+                for step in steps
+            ],
+        }
+        with self._lock:
+            self.pipelines[pipeline['id']] = pipeline
+            self.store.save(pipeline)
+            self._advance(pipeline)
+        return pipeline['id']
+
+    def get_pipeline(self, pipeline_id: str) -> Optional[Dict]:
+        """Get a pipeline by ID"""
+        with self._lock:
+            pipeline = self.pipelines.get(pipeline_id)
+            if pipeline is not None:
+                return pipeline
+        return self.store.get(pipeline_id)
+
+    def list_pipelines(self, limit: int = 50, offset: int = 0, status: Optional[str] = None) -> Tuple[int, List[Dict]]:
+        """List pipelines from the store, newest first"""
+        return self.store.query(limit=limit, offset=offset, status=status)
+
+    def cancel_pipeline(self, pipeline_id: str) -> bool:
+        """
+        Cancel a running pipeline: steps not started are cancelled and
+        running steps are cancelled through the runner
+
+        Returns:
+            True if the pipeline was running
+        """
+        with self._lock:
+            pipeline = self.pipelines.get(pipeline_id)
+            if pipeline is None:
+                return False
+            pipeline['status'] = 'cancelled'
+            for step in pipeline['steps']:
+                if step['status'] == 'waiting':
+                    step['status'] = 'cancelled'
+                    step['finished_at'] = datetime.now().isoformat()
+            for step in pipeline['steps']:
+                if step['execution_id'] and step['status'] not in STEP_FINAL_STATUSES:
+                    self.runner.cancel_execution(step['execution_id'])
+            self._advance(pipeline)
+        return True
+
+    def on_update(self, execution_id: str, event: str, data: Optional[str] = None):
+        """Track the status of step executions and start the steps they unblock"""
+        if event != 'status':
+            return
+        with self._lock:
+            location = self._steps_by_execution.get(execution_id)
+            if location is None:
+                return
+            pipeline = self.pipelines.get(location[0])
+            if pipeline is None:
+                return
+            step = next(s for s in pipeline['steps'] if s['name'] == location[1])
+            if step['status'] in STEP_FINAL_STATUSES:
+                return
+            self._sync_step(step, data)
+            self._advance(pipeline)
+
+    def _sync_step(self, step: Dict, status: Optional[str]):
+        """Copy an execution status to its step"""
+        execution = self.runner.get_execution(step['execution_id']) or {}
+        step['status'] = status
+        step['started_at'] = execution.get('started_at') or step['started_at']
+        if status in EXECUTION_FINAL_STATUSES:
+            self._steps_by_execution.pop(step['execution_id'], None)
+            step['finished_at'] = execution.get('finished_at') or datetime.now().isoformat()
+            step['passed_hosts'] = self.runner.passed_hosts(step['execution_id']) if status != 'cancelled' else []
+
+    def _advance(self, pipeline: Dict):
+        """Start or skip every step whose dependencies finished, and finish the pipeline when done"""
+        steps = {step['name']: step for step in pipeline['steps']}
+        progressed = True
+        while progressed:
+            progressed = False
+            for step in pipeline['steps']:
+                if step['status'] != 'waiting':
+                    continue
+                deps = [steps[name] for name in step['depends_on']]
+                if any(dep['status'] not in STEP_FINAL_STATUSES for dep in deps):
+                    continue
+                progressed = True
+                if pipeline['status'] == 'cancelled':
+                    step['status'] = 'cancelled'
+                    continue
+                if deps:
+                    passed = [set(dep['passed_hosts'] or ()) for dep in deps]
+                    first = deps[0]['passed_hosts'] or []
+                    targets = [host for host in first if all(host in p for p in passed)]
+                    if not targets:
+                        step['status'] = 'skipped'
+                        step['error'] = "No host passed the steps it depends on"
+                        step['finished_at'] = datetime.now().isoformat()
+                        continue
+                else:
+                    targets = pipeline['hosts']
+                self._launch(pipeline, step, targets)
+
+        if all(step['status'] in STEP_FINAL_STATUSES for step in pipeline['steps']):
+            if pipeline['status'] == 'running':
+                success = all(step['status'] == 'success' for step in pipeline['steps'])
+                pipeline['status'] = 'success' if success else 'failed'
+            pipeline['finished_at'] = datetime.now().isoformat()
+            self.pipelines.pop(pipeline['id'], None)
+        self.store.save(pipeline)
+
+    def _launch(self, pipeline: Dict, step: Dict, hosts: List[str]):
+        """Queue the execution of a step"""
+        step['hosts'] = hosts
+        try:
+            execution_id = self.runner.execute_playbook(
+                step['playbook'],
+                hosts=hosts,
+                tags=step['tags'],
+                extra_vars=step['extra_vars'],
+                ask_password=pipeline['ask_password'],
+                priority=pipeline['priority'],
+                preflight=step['preflight'],
+                on_duplicate='queue',
+                pipeline_id=pipeline['id'],
+                pipeline_step=step['name']
+            )
+        except (FileNotFoundError, ValueError) as e:
+            step['status'] = 'failed'
+            step['error'] = str(e)
+            step['passed_hosts'] = []
+            step['finished_at'] = datetime.now().isoformat()
+            return
+        step['execution_id'] = execution_id
+        self._steps_by_execution[execution_id] = (pipeline['id'], step['name'])
+        # The scheduler may have started the execution, or cancelled it, already
+        self._sync_step(step, self.runner.get_execution(execution_id)['status'])
@@ -0,0 +1,106 @@
+"""Concurrent TCP reachability probes run before launching a playbook"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional, Tuple
+
+from interface.utils.inventory import Inventory
+
+
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_CONCURRENCY = 512
+
+DEFAULT_PORTS = {'ssh': 22, 'paramiko': 22, 'winrm': 5986, 'psrp': 5986}
+WINRM_HTTP_PORT = 5985
+
+# Connections that do not go over the network
+LOCAL_CONNECTIONS = ('local', 'docker', 'podman', 'chroot')
+
+
+def probe_targets(inventory: Inventory, hosts: Optional[List[str]]) -> Tuple[List[Dict], List[str]]:
+    """
+    Resolve the address and port to probe for each target host
+
+    Args:
+        inventory: Indexed inventory; connection settings come from each
+            host's effective variables, including those inherited from parent groups
+        hosts: Host or group names. If None, targets every host in the inventory.
+
+    Returns:
+        Tuple of (targets with name, address and port, hosts that are not
+        probed because they use a local connection or are unknown to the inventory)
+    """
+    names = inventory.expand(hosts) if hosts else list(inventory.hosts)
+
+    targets: List[Dict] = []
+    unprobed: List[str] = []
+    for name in names:
+        if name not in inventory.hosts:
+            unprobed.append(name)
+            continue
+        connection = inventory.host_var(name, 'ansible_connection') or 'ssh'
+        if connection in LOCAL_CONNECTIONS:
+            unprobed.append(name)
+            continue
+        port = inventory.host_var(name, 'ansible_port')
+        if not port:
+            port = DEFAULT_PORTS.get(connection, 22)
+            if connection == 'winrm' and inventory.host_var(name, 'ansible_winrm_scheme') == 'http':
+                port = WINRM_HTTP_PORT
+        targets.append({
+            'name': name,
+            'address': inventory.host_var(name, 'ansible_host') or name,
+            'port': int(port),
+        })
+    return targets, unprobed
+
+
+async def probe(address: str, port: int, timeout: float) -> bool:
+    """Check if a TCP connection to address:port opens within timeout"""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def probe_hosts(
+    targets: List[Dict],
+    timeout: Optional[float] = None,
+    concurrency: Optional[int] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    Probe all targets concurrently
+
+    Probes run in parallel, so with enough concurrency the whole stage takes
+    about one timeout however many hosts are dead.
+
+    Args:
+        targets: Targets as returned by probe_targets
+        timeout: Seconds to wait for each connection. If None, reads
+            ANSIBLE_LABS_PREFLIGHT_TIMEOUT.
+        concurrency: Maximum simultaneous connection attempts. If None, reads
+            ANSIBLE_LABS_PREFLIGHT_CONCURRENCY.
+
+    Returns:
+        Tuple of (reachable host names, unreachable host names), in target order
+    """
+    if timeout is None:
+        timeout = float(os.getenv("ANSIBLE_LABS_PREFLIGHT_TIMEOUT", DEFAULT_TIMEOUT))
+    if concurrency is None:
+        concurrency = int(os.getenv("ANSIBLE_LABS_PREFLIGHT_CONCURRENCY", DEFAULT_CONCURRENCY))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def check(target: Dict) -> bool:
+        async with semaphore:
+            return await probe(target['address'], target['port'], timeout)
+
+    results = await asyncio.gather(*[check(target) for target in targets])
+    reachable = [t['name'] for t, ok in zip(targets, results) if ok]
+    unreachable = [t['name'] for t, ok in zip(targets, results) if not ok]
+    return reachable, unreachable
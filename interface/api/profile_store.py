@@ -0,0 +1,243 @@
+"""Task and role timings parsed from the profile_tasks and profile_roles callbacks"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from interface.api.database import Database
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS execution_task_timings (
+    execution_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    role TEXT,
+    task TEXT NOT NULL,
+    duration REAL NOT NULL,
+    PRIMARY KEY (execution_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_task_timings_task ON execution_task_timings (task, role);
+
+CREATE TABLE IF NOT EXISTS execution_role_timings (
+    execution_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    duration REAL NOT NULL,
+    PRIMARY KEY (execution_id, role)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS execution_profiles (
+    execution_id TEXT PRIMARY KEY,
+    total REAL
+);
+"""
+
+PROFILE_SEPARATOR = re.compile(r'^={20,}$')
+ROLE_TOTAL_SEPARATOR = re.compile(r'^~{20,}$')
+TIMING_LINE = re.compile(r'^(.+?) -+ (\d+(?:\.\d+)?)s$')
+SHARD_PREFIX = re.compile(r'^\[[^\]]+\] ')
+
+PERCENTILES = (50, 90, 99)
+
+
+def parse_profile(lines: Iterable[str]) -> Dict:
+    """
+    Parse the timing blocks printed by profile_tasks and profile_roles
+
+    Both callbacks print a '=====' separator followed by 'name ---- 1.23s'
+    lines. The profile_roles block is told apart by its '~~~~' separator
+    and 'total' line. Lines may carry a '[shard] ' prefix; sharded runs
+    print one block per shard and keep the longest duration of each name.
+
+    Returns:
+        Dictionary with tasks (role, task, duration in run order), roles
+        (role, duration) and total (seconds, or None)
+    """
+    tasks: Dict[Tuple[Optional[str], str], float] = {}
+    roles: Dict[str, float] = {}
+    total: Optional[float] = None
+
+    block: Optional[List[Tuple[str, float]]] = None
+    is_roles = False
+
+    def close_block():
+        nonlocal block
+        if block is None:
+            return
+        if is_roles:
+            for name, duration in block:
+                roles[name] = max(roles.get(name, 0.0), duration)
+        else:
+            for name, duration in block:
+                role, sep, task = name.partition(' : ')
+                key = (role, task) if sep else (None, name)
+                tasks[key] = max(tasks.get(key, 0.0), duration)
+        block = None
+
+    for raw in lines:
+        line = SHARD_PREFIX.sub('', raw.rstrip('\n')).rstrip()
+        if PROFILE_SEPARATOR.match(line):
+            close_block()
+            block, is_roles = [], False
+            continue
+        if block is None:
+            continue
+        if ROLE_TOTAL_SEPARATOR.match(line):
+            is_roles = True
+            continue
+        match = TIMING_LINE.match(line)
+        if not match:
+            close_block()
+            continue
+        name, duration = match.group(1).strip(), float(match.group(2))
+        if is_roles and name == 'total':
+            total = max(total or 0.0, duration)
+        else:
+            block.append((name, duration))
+    close_block()
+
+    return {
+        'tasks': [{'role': role, 'task': task, 'duration': duration} for (role, task), duration in tasks.items()],
+        'roles': [{'role': role, 'duration': duration} for role, duration in roles.items()],
+        'total': total,
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile of sorted values"""
+    if len(values) == 1:
+        return values[0]
+    rank = (len(values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Run count, mean, max and percentiles of a list of durations"""
+    values = sorted(durations)
+    stats = {
+        'runs': len(values),
+        'mean': sum(values) / len(values),
+        'max': values[-1],
+    }
+    for q in PERCENTILES:
+        stats[f'p{q}'] = percentile(values, q)
+    return stats
+
+
+class ProfileStore:
+    """Store per-execution task and role timings and aggregate them across runs"""
+
+    def __init__(self, database: Optional[Database] = None):
+        """
+        Initialize store
+
+        Args:
+            database: Database to use. If None, opens the default database.
+        """
+        self.db = database or Database()
+        self.db.executescript(SCHEMA)
+
+    def save(self, execution_id: str, profile: Dict):
+        """
+        Replace the timings of an execution
+
+        Args:
+            execution_id: Execution ID
+            profile: Parsed profile as returned by parse_profile
+        """
+        with self.db.transaction() as conn:
+            for table in ('execution_task_timings', 'execution_role_timings', 'execution_profiles'):
+                conn.execute(f"DELETE FROM {table} WHERE execution_id = ?", (execution_id,))
+            conn.executemany(
+                "INSERT INTO execution_task_timings (execution_id, position, role, task, duration) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(execution_id, position, t['role'], t['task'], t['duration'])
+                 for position, t in enumerate(profile['tasks'])]
+            )
+            conn.executemany(
+                "INSERT INTO execution_role_timings (execution_id, role, duration) VALUES (?, ?, ?)",
+                [(execution_id, r['role'], r['duration']) for r in profile['roles']]
+            )
+            conn.execute(
+                "INSERT INTO execution_profiles (execution_id, total) VALUES (?, ?)",
+                (execution_id, profile['total'])
+            )
+
+    def get(self, execution_id: str) -> Optional[Dict]:
+        """
+        Get the timings of an execution
+
+        Returns:
+            Dictionary with tasks, roles and total, or None if nothing was recorded
+        """
+        profile = self.db.query_one(
+            "SELECT total FROM execution_profiles WHERE execution_id = ?", (execution_id,)
+        )
+        if profile is None:
+            return None
+        tasks = self.db.query(
+            "SELECT position, role, task, duration FROM execution_task_timings "
+            "WHERE execution_id = ? ORDER BY position",
+            (execution_id,)
+        )
+        roles = self.db.query(
+            "SELECT role, duration FROM execution_role_timings WHERE execution_id = ? ORDER BY duration DESC",
+            (execution_id,)
+        )
+        return {
+            'tasks': [dict(row) for row in tasks],
+            'roles': [dict(row) for row in roles],
+            'total': profile['total'],
+        }
+
+    def aggregate(self, playbook: str, runs: int = 50, limit: int = 20) -> Dict:
+        """
+        Aggregate the timings of the latest runs of a playbook
+
+        Args:
+            playbook: Playbook file name
+            runs: Number of latest profiled runs to include
+            limit: Number of tasks and roles to return, slowest p90 first
+
+        Returns:
+            Dictionary with runs, tasks and roles statistics (runs, mean, max,
+            p50, p90, p99) and total statistics
+        """
+        recent = self.db.query(
+            "SELECT p.execution_id, p.total FROM execution_profiles p "
+            "JOIN executions e ON e.id = p.execution_id "
+            "WHERE e.playbook = ? ORDER BY e.queued_at DESC LIMIT ?",
+            (playbook, runs)
+        )
+        ids = [row['execution_id'] for row in recent]
+        result = {'runs': len(ids), 'tasks': [], 'roles': [], 'total': None}
+        if not ids:
+            return result
+        placeholders = ', '.join('?' for _ in ids)
+
+        tasks: Dict[Tuple[Optional[str], str], List[float]] = {}
+        for row in self.db.query(
+            f"SELECT role, task, duration FROM execution_task_timings WHERE execution_id IN ({placeholders})",
+            ids
+        ):
+            tasks.setdefault((row['role'], row['task']), []).append(row['duration'])
+        roles: Dict[str, List[float]] = {}
+        for row in self.db.query(
+            f"SELECT role, duration FROM execution_role_timings WHERE execution_id IN ({placeholders})",
+            ids
+        ):
+            roles.setdefault(row['role'], []).append(row['duration'])
+
+        result['tasks'] = sorted(
+            ({'role': role, 'task': task, **summarize(durations)} for (role, task), durations in tasks.items()),
+            key=lambda stats: stats['p90'],
+            reverse=True
+        )[:limit]
+        result['roles'] = sorted(
+            ({'role': role, **summarize(durations)} for role, durations in roles.items()),
+            key=lambda stats: stats['p90'],
+            reverse=True
+        )[:limit]
+        totals = [row['total'] for row in recent if row['total'] is not None]
+        result['total'] = summarize(totals) if totals else None
+        return result
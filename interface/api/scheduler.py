@@ -0,0 +1,311 @@
+"""Bounded execution scheduler with priorities and concurrency limits"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+
+PRIORITY_RANK = {'high': 0, 'normal': 1, 'low': 2}
+
+DEFAULT_MAX_CONCURRENT = 2
+DEFAULT_GROUP_LIMIT = 1
+DEFAULT_DURATION = 300.0
+
+
+def parse_group_limits(value: Optional[str]) -> Dict[str, int]:
+    """
+    Parse group limits written as 'lab1=1,lab2=2'
+
+    Args:
+        value: Comma separated group=limit pairs
+
+    Returns:
+        Dictionary of group name to limit
+    """
+    limits: Dict[str, int] = {}
+    if not value:
+        return limits
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        group, limit = item.split('=', 1)
+        try:
+            limits[group.strip()] = int(limit)
+        except ValueError:
+            print(f"Warning: Ignoring invalid group limit: {item}")
+    return limits
+
+
+class QueueEntry:
+    """An execution waiting for or holding a slot"""
+
+    __slots__ = (
+        'execution_id', 'playbook', 'priority', 'groups', 'sequence', 'after', 'owner', 'queued_at', 'started_at'
+    )
+
+    def __init__(
+        self,
+        execution_id: str,
+        playbook: str,
+        priority: str,
+        groups: Set[str],
+        sequence: int,
+        after: Optional[Set[str]] = None,
+        owner: Optional[str] = None
+    ):
+        self.execution_id = execution_id
+        self.playbook = playbook
+        self.priority = priority
+        self.groups = groups
+        self.sequence = sequence
+        self.after = after or set()
+        self.owner = owner or execution_id
+        self.queued_at = time.time()
+        self.started_at: Optional[float] = None
+
+    def sort_key(self):
+        return (PRIORITY_RANK.get(self.priority, PRIORITY_RANK['normal']), self.sequence)
+
+
+class ExecutionScheduler:
+    """
+    Admit executions under a global cap and per-inventory-group caps
+
+    Pending executions are ordered by priority class and then by arrival.
+    An execution whose groups are all busy, or that waits for another
+    execution to finish, does not block later entries that can start.
+    The group 'all' covers every group, so an all-hosts run and a run on
+    any group count against each other's limits. Executions with the same
+    owner, such as the steps of one pipeline, hold a group slot together.
+    """
+
+    def __init__(
+        self,
+        start_callback: Callable[[str], None],
+        max_concurrent: Optional[int] = None,
+        group_limits: Optional[Dict[str, int]] = None,
+        default_group_limit: Optional[int] = None
+    ):
+        """
+        Initialize scheduler
+
+        Args:
+            start_callback: Function called with the execution ID when it is admitted
+            max_concurrent: Global limit of running executions. If None, reads
+                ANSIBLE_LABS_MAX_CONCURRENT or uses DEFAULT_MAX_CONCURRENT.
+            group_limits: Per-group limits. If None, reads ANSIBLE_LABS_GROUP_LIMITS.
+            default_group_limit: Limit for groups without an explicit one. If None,
+                reads ANSIBLE_LABS_DEFAULT_GROUP_LIMIT or uses DEFAULT_GROUP_LIMIT.
+        """
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("ANSIBLE_LABS_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT))
+        if group_limits is None:
+            group_limits = parse_group_limits(os.getenv("ANSIBLE_LABS_GROUP_LIMITS"))
+        if default_group_limit is None:
+            default_group_limit = int(os.getenv("ANSIBLE_LABS_DEFAULT_GROUP_LIMIT", DEFAULT_GROUP_LIMIT))
+
+        self.start_callback = start_callback
+        self.max_concurrent = max(1, max_concurrent)
+        self.group_limits = group_limits
+        self.default_group_limit = max(1, default_group_limit)
+        self._pending: Dict[str, QueueEntry] = {}
+        self._running: Dict[str, QueueEntry] = {}
+        self._durations: Dict[str, Deque[float]] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.RLock()
+
+    @property
+    def pending_count(self) -> int:
+        """Number of executions waiting in the queue"""
+        return len(self._pending)
+
+    @property
+    def running_count(self) -> int:
+        """Number of executions holding a slot"""
+        return len(self._running)
+
+    def group_limit(self, group: str) -> int:
+        """Get the concurrency limit of a group"""
+        return self.group_limits.get(group, self.default_group_limit)
+
+    def submit(
+        self,
+        execution_id: str,
+        playbook: str,
+        priority: str = 'normal',
+        groups: Optional[Set[str]] = None,
+        after: Optional[Set[str]] = None,
+        owner: Optional[str] = None
+    ):
+        """
+        Queue an execution and start it as soon as limits allow
+
+        Args:
+            execution_id: Execution ID
+            playbook: Playbook file name, used for duration estimates
+            priority: Priority class ('high', 'normal' or 'low')
+            groups: Inventory groups targeted by the execution
+            after: Executions that must leave the scheduler before this one starts
+            owner: Executions with the same owner count once against group
+                limits. If None, the execution is its own owner.
+        """
+        with self._lock:
+            entry = QueueEntry(
+                execution_id, playbook, priority, set(groups or {'all'}), next(self._sequence), set(after or ()),
+                owner
+            )
+            self._pending[execution_id] = entry
+        self._dispatch()
+
+    def release(self, execution_id: str):
+        """Free the slot held by a finished execution and admit the next ones"""
+        with self._lock:
+            entry = self._running.pop(execution_id, None)
+            if entry is not None and entry.started_at is not None:
+                history = self._durations.setdefault(entry.playbook, deque(maxlen=20))
+                history.append(time.time() - entry.started_at)
+        self._dispatch()
+
+    def cancel(self, execution_id: str) -> bool:
+        """
+        Remove a pending execution from the queue
+
+        Entries that waited for it through after may start now.
+
+        Returns:
+            True if the execution was pending
+        """
+        with self._lock:
+            removed = self._pending.pop(execution_id, None) is not None
+        if removed:
+            self._dispatch()
+        return removed
+
+    def is_pending(self, execution_id: str) -> bool:
+        """Check if an execution is waiting in the queue"""
+        with self._lock:
+            return execution_id in self._pending
+
+    def _fits(self, entry: QueueEntry, group_usage: Dict[str, Set[str]]) -> bool:
+        if any(other in self._pending or other in self._running for other in entry.after):
+            return False
+        # 'all' touches every group: an all-hosts run needs room in every busy
+        # group, and every other run needs room under the limit of 'all'
+        groups = set(group_usage) | entry.groups if 'all' in entry.groups else entry.groups | {'all'}
+        return all(
+            len(group_usage.get(group, set()) - {entry.owner}) < self.group_limit(group)
+            for group in groups
+        )
+
+    def _group_usage(self) -> Dict[str, Set[str]]:
+        """Map every busy group to the owners of its running executions"""
+        usage: Dict[str, Set[str]] = {}
+        for entry in self._running.values():
+            for group in entry.groups:
+                usage.setdefault(group, set()).add(entry.owner)
+        return usage
+
+    def _dispatch(self):
+        """Admit pending executions that fit the current limits"""
+        admitted: List[str] = []
+        with self._lock:
+            usage = self._group_usage()
+            for entry in sorted(self._pending.values(), key=QueueEntry.sort_key):
+                if len(self._running) >= self.max_concurrent:
+                    break
+                if not self._fits(entry, usage):
+                    continue
+                del self._pending[entry.execution_id]
+                entry.started_at = time.time()
+                self._running[entry.execution_id] = entry
+                for group in entry.groups:
+                    usage.setdefault(group, set()).add(entry.owner)
+                admitted.append(entry.execution_id)
+
+        for execution_id in admitted:
+            try:
+                self.start_callback(execution_id)
+            except Exception as e:
+                print(f"Warning: Failed to start execution {execution_id}: {e}")
+                self.release(execution_id)
+
+    def expected_duration(self, playbook: str) -> float:
+        """Estimate how long a playbook runs from its recent history"""
+        history = self._durations.get(playbook)
+        if history:
+            return sum(history) / len(history)
+        all_durations = [d for h in self._durations.values() for d in h]
+        if all_durations:
+            return sum(all_durations) / len(all_durations)
+        return DEFAULT_DURATION
+
+    def queue_position(self, execution_id: str) -> Optional[int]:
+        """Get the 1-based position of a pending execution"""
+        with self._lock:
+            ordered = sorted(self._pending.values(), key=QueueEntry.sort_key)
+            for position, entry in enumerate(ordered, start=1):
+                if entry.execution_id == execution_id:
+                    return position
+        return None
+
+    def estimated_starts(self) -> Dict[str, str]:
+        """
+        Estimate start times of all pending executions
+
+        Simulates the global slots with the expected durations of running and
+        pending executions. Group limits are not simulated, so the estimate
+        is a lower bound when groups are contended.
+
+        Returns:
+            Dictionary of execution ID to ISO timestamp
+        """
+        now = time.time()
+        with self._lock:
+            slots = [
+                max(now, entry.started_at + self.expected_duration(entry.playbook))
+                for entry in self._running.values()
+            ]
+            slots.extend([now] * (self.max_concurrent - len(slots)))
+            heapq.heapify(slots)
+            estimates: Dict[str, str] = {}
+            for entry in sorted(self._pending.values(), key=QueueEntry.sort_key):
+                start = heapq.heappop(slots)
+                estimates[entry.execution_id] = datetime.fromtimestamp(start).isoformat()
+                heapq.heappush(slots, start + self.expected_duration(entry.playbook))
+        return estimates
+
+    def snapshot(self) -> Dict:
+        """Get the current queue state"""
+        estimates = self.estimated_starts()
+        with self._lock:
+            pending = sorted(self._pending.values(), key=QueueEntry.sort_key)
+            return {
+                'max_concurrent': self.max_concurrent,
+                'default_group_limit': self.default_group_limit,
+                'group_limits': dict(self.group_limits),
+                'running': [
+                    {
+                        'execution_id': entry.execution_id,
+                        'playbook': entry.playbook,
+                        'priority': entry.priority,
+                        'groups': sorted(entry.groups)
+                    }
+                    for entry in self._running.values()
+                ],
+                'pending': [
+                    {
+                        'execution_id': entry.execution_id,
+                        'playbook': entry.playbook,
+                        'priority': entry.priority,
+                        'groups': sorted(entry.groups),
+                        'position': position,
+                        'estimated_start_at': estimates.get(entry.execution_id)
+                    }
+                    for position, entry in enumerate(pending, start=1)
+                ]
+            }
@@ -0,0 +1,69 @@
+"""Split an execution's targets into shards that run as parallel processes"""
+
+import os
+from typing import Dict, List, Optional
+
+from interface.api.scheduler import parse_group_limits
+from interface.utils.inventory import Inventory
+
+
+SHARD_MODES = ('group', 'connection')
+
+DEFAULT_FORKS = 10
+DEFAULT_CONNECTION_FORKS = {'winrm': 10, 'ssh': 5}
+
+
+def plan_shards(
+    inventory: Inventory,
+    hosts: Optional[List[str]],
+    shard_by: str,
+    fork_budgets: Optional[Dict[str, int]] = None
+) -> List[Dict]:
+    """
+    Split target hosts into shards
+
+    Args:
+        inventory: Indexed inventory; connections come from each host's
+            effective variables, including those inherited from parent groups
+        hosts: Host or group names. If None, targets every host in the inventory.
+        shard_by: 'group' to make one shard per inventory group, 'connection'
+            to make one shard per connection type (winrm, ssh, ...)
+        fork_budgets: Forks per shard name. If None, reads ANSIBLE_LABS_SHARD_FORKS
+            (e.g. 'winrm=20,ssh=5,lab1=8') on top of the defaults.
+
+    Returns:
+        List of shards with name, hosts and forks, in inventory order
+    """
+    if shard_by not in SHARD_MODES:
+        raise ValueError(f"Invalid shard mode: {shard_by}. Use one of: {', '.join(SHARD_MODES)}")
+    if fork_budgets is None:
+        fork_budgets = dict(DEFAULT_CONNECTION_FORKS)
+        fork_budgets.update(parse_group_limits(os.getenv("ANSIBLE_LABS_SHARD_FORKS")))
+
+    # Hosts selected directly or through one of their groups
+    wanted = set(inventory.expand(hosts)) if hosts else None
+
+    shards: Dict[str, List[str]] = {}
+    assigned = set()
+    # Each host goes to the first group that lists it directly
+    for group_name, group in inventory.groups.items():
+        for name in group.hosts:
+            if name in assigned or (wanted is not None and name not in wanted):
+                continue
+            assigned.add(name)
+            if shard_by == 'group':
+                key = group_name
+            else:
+                key = inventory.host_var(name, 'ansible_connection') or 'ssh'
+            shards.setdefault(key, []).append(name)
+
+    # Targets unknown to the inventory still run, in a shard of their own
+    if wanted is not None:
+        unknown = [name for name in inventory.expand(hosts) if name not in assigned]
+        if unknown:
+            shards.setdefault('ungrouped', []).extend(unknown)
+
+    return [
+        {'name': name, 'hosts': members, 'forks': fork_budgets.get(name, DEFAULT_FORKS)}
+        for name, members in shards.items()
+    ]
@@ -0,0 +1,136 @@
+"""Connection-tuning profiles picked per execution from the targets and the control node"""
+
+import os
+from typing import Dict, List, Optional
+
+from interface.api.sharding import plan_shards
+from interface.utils.inventory import Inventory
+
+
+# Profiles by target count, smallest first: (name, max targets, forks cap, ControlPersist seconds, timeout)
+PROFILES = (
+    ('small', 10, 10, 60, 10),
+    ('medium', 60, 25, 120, 20),
+    ('large', None, 50, 300, 30),
+)
+PROFILE_NAMES = tuple(profile[0] for profile in PROFILES)
+
+# Per fork: WinRM forks encrypt in Python and hold pywinrm sessions, so they cost more
+FORKS_PER_CPU = {'ssh': 8, 'winrm': 4}
+FORK_MEMORY = {'ssh': 64 * 1024 * 1024, 'winrm': 128 * 1024 * 1024}
+
+# Share of the available memory forks may use
+MEMORY_SHARE = 0.75
+
+SSH_CONNECTIONS = ('ssh', 'paramiko')
+
+
+def control_node_resources() -> Dict[str, Optional[int]]:
+    """
+    Get the CPUs and available memory of the control node
+
+    Returns:
+        Dictionary with cpus and memory (available bytes, or None if unknown)
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+
+    memory = None
+    try:
+        with open('/proc/meminfo', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    memory = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError):
+        pass
+    if memory is None:
+        try:
+            memory = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+        except (AttributeError, ValueError, OSError):
+            pass
+    return {'cpus': cpus, 'memory': memory}
+
+
+def target_connections(inventory: Inventory, hosts: Optional[List[str]]) -> Dict[str, int]:
+    """
+    Count the target hosts per connection type
+
+    Hosts unknown to the inventory are counted as ssh, Ansible's default.
+    """
+    counts: Dict[str, int] = {}
+    for shard in plan_shards(inventory, hosts, 'connection', fork_budgets={}):
+        connection = 'ssh' if shard['name'] == 'ungrouped' else shard['name']
+        counts[connection] = counts.get(connection, 0) + len(shard['hosts'])
+    return counts
+
+
+def select_profile(
+    connections: Dict[str, int],
+    cpus: int,
+    memory: Optional[int],
+    name: Optional[str] = None
+) -> Dict:
+    """
+    Pick the tuning of an execution
+
+    The profile comes from the target count; forks are then capped by the
+    targets themselves and by the CPUs and memory of the control node, using
+    the costlier WinRM figures as soon as any target uses WinRM.
+
+    Args:
+        connections: Target hosts per connection type, as returned by target_connections
+        cpus: CPUs of the control node
+        memory: Available memory in bytes, or None if unknown
+        name: Profile to use instead of picking one by target count
+
+    Returns:
+        Dictionary with profile, forks, pipelining, control_persist, timeout,
+        targets, connection, cpus and memory
+    """
+    targets = sum(connections.values())
+    if name is None:
+        profile = next(p for p in PROFILES if p[1] is None or targets <= p[1])
+    else:
+        if name not in PROFILE_NAMES:
+            raise ValueError(f"Invalid tuning profile: {name}. Use one of: {', '.join(PROFILE_NAMES)}")
+        profile = PROFILES[PROFILE_NAMES.index(name)]
+    profile_name, _, forks_cap, control_persist, timeout = profile
+
+    if len(connections) == 1:
+        connection = next(iter(connections))
+    else:
+        connection = 'mixed' if connections else 'ssh'
+    cost = 'winrm' if 'winrm' in connections else 'ssh'
+
+    forks = min(forks_cap, max(targets, 1), max(cpus, 1) * FORKS_PER_CPU[cost])
+    if memory is not None:
+        forks = min(forks, int(memory * MEMORY_SHARE // FORK_MEMORY[cost]))
+    uses_ssh = any(c in SSH_CONNECTIONS for c in connections) or not connections
+
+    return {
+        'profile': profile_name,
+        'forks': max(forks, 1),
+        'pipelining': uses_ssh,
+        'control_persist': control_persist if uses_ssh else None,
+        'timeout': timeout,
+        'targets': targets,
+        'connection': connection,
+        'cpus': cpus,
+        'memory': memory,
+    }
+
+
+def tuning_env(tuning: Dict) -> Dict[str, str]:
+    """Environment variables that apply a tuning to ansible-playbook"""
+    env = {
+        'ANSIBLE_FORKS': str(tuning['forks']),
+        'ANSIBLE_TIMEOUT': str(tuning['timeout']),
+    }
+    if tuning['pipelining']:
+        env['ANSIBLE_PIPELINING'] = 'True'
+    if tuning['control_persist']:
+        env['ANSIBLE_SSH_ARGS'] = f"-C -o ControlMaster=auto -o ControlPersist={tuning['control_persist']}s"
+    return env
@@ -126,7 +126,8 @@ class AnsibleLabsTUI(App):
         # Step 1: Select hosts
         host_screen = HostSelectionScreen(
             hosts=[{'name': h['name'], 'ip': h.get('ip')} for h in self.hosts],
-            groups=[{'name': g['name']} for g in self.groups]
+            groups=[{'name': g['name']} for g in self.groups],
+            api_client=self.api_client
         )
         host_selection = await self.push_screen_wait(host_screen)
         
@@ -148,16 +149,10 @@ class AnsibleLabsTUI(App):
         status.update("Starting execution...")
         
         try:
-            # Build hosts list
-            selected_hosts = []
-            if host_selection.get('groups'):
-                # Get hosts from selected groups
-                for group_name in host_selection['groups']:
-                    group = next((g for g in self.groups if g['name'] == group_name), None)
-                    if group:
-                        selected_hosts.extend([h['name'] for h in group['hosts']])
-            if host_selection.get('hosts'):
-                selected_hosts.extend(host_selection['hosts'])
+            # Send groups and pattern terms as they are; the runner compresses them
+            selected_hosts = host_selection.get('terms')
+            if not selected_hosts:
+                selected_hosts = list(host_selection.get('groups') or []) + list(host_selection.get('hosts') or [])
             
             # Execute
             response = await self.api_client.post(
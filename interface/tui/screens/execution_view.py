@@ -5,6 +5,7 @@ from textual.widgets import Button, Static, Log
 from textual.containers import Container, Vertical, Horizontal
 from textual.app import ComposeResult
 import asyncio
+import json
 from typing import Optional
 
 
@@ -18,6 +19,7 @@ class ExecutionViewScreen(Screen):
         self.execution_id = execution_id
         self.api_client = api_client
         self.running = True
+        self.log_offset = 0
     
     def compose(self) -> ComposeResult:
         with Container(id="execution_container"):
@@ -26,50 +28,73 @@ class ExecutionViewScreen(Screen):
             yield Log(id="execution_log", auto_scroll=True)
             with Horizontal(id="buttons"):
                 yield Button("Cancel Execution", id="cancel_btn", variant="error")
+                yield Button("Retry Failed Hosts", id="retry_btn", variant="warning", disabled=True)
                 yield Button("Close", id="close_btn")
     
     def on_mount(self) -> None:
-        """Start polling for execution updates"""
-        self.set_interval(1.0, self.poll_execution)
+        """Start streaming execution updates"""
+        self.run_worker(self.stream_execution(), exclusive=True)
     
-    async def poll_execution(self) -> None:
-        """Poll execution status and update display"""
-        if not self.running:
-            return
-            
+    async def stream_execution(self) -> None:
+        """Follow the execution's event stream, reconnecting from the last line seen"""
+        log_widget = self.query_one("#execution_log", Log)
+        
+        while self.running:
+            try:
+                async with self.api_client.stream(
+                    "GET",
+                    f"/api/executions/{self.execution_id}/stream",
+                    headers={"Last-Event-ID": str(self.log_offset)},
+                    timeout=None
+                ) as response:
+                    response.raise_for_status()
+                    event_type, data = None, None
+                    async for raw_line in response.aiter_lines():
+                        if raw_line.startswith("event: "):
+                            event_type = raw_line[len("event: "):]
+                        elif raw_line.startswith("id: "):
+                            self.log_offset = int(raw_line[len("id: "):])
+                        elif raw_line.startswith("data: "):
+                            data = json.loads(raw_line[len("data: "):])
+                        elif raw_line == "" and event_type:
+                            self.handle_event(event_type, data or {})
+                            event_type, data = None, None
+                            if not self.running:
+                                return
+            except Exception as e:
+                log_widget.write(f"[ERROR] Stream interrupted: {e}")
+                await asyncio.sleep(2.0)
+    
+    def handle_event(self, event_type: str, data: dict) -> None:
+        """Apply a single stream event to the display"""
         log_widget = self.query_one("#execution_log", Log)
         status_display = self.query_one("#status_display", Static)
         
-        try:
-            response = await self.api_client.get(f"/api/executions/{self.execution_id}")
-            status = response.json()
-            
-            # Update status
-            status_text = f"Status: {status['status'].upper()}"
-            if status.get('return_code') is not None:
-                status_text += f" (Exit: {status['return_code']})"
+        if event_type == "line":
+            if data.get('stream') == 'stderr':
+                log_widget.write(f"[STDERR] {data['line']}")
+            else:
+                log_widget.write(data['line'])
+        elif event_type == "status":
+            status_display.update(f"Status: {data['status'].upper()}")
+        elif event_type == "done":
+            status_text = f"Status: {data['status'].upper()}"
+            if data.get('return_code') is not None:
+                status_text += f" (Exit: {data['return_code']})"
             status_display.update(status_text)
-            
-            # Update log
-            if status.get('stdout'):
-                # Only show new lines
-                current_output = status['stdout']
-                log_widget.write(current_output)
-            
-            if status.get('stderr'):
-                log_widget.write(f"[ERROR] {status['stderr']}")
-            
-            # Check if finished
-            if status['status'] in ['success', 'failed', 'cancelled']:
-                self.running = False
-        except Exception as e:
-            log_widget.write(f"[ERROR] Failed to get status: {e}")
+            self.query_one("#retry_btn", Button).disabled = data['status'] != "failed"
+            self.running = False
+        elif event_type == "error":
+            log_widget.write(f"[ERROR] {data.get('detail')}")
+            self.running = False
     
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses"""
         if event.button.id == "cancel_btn":
             # Cancel execution
             self.run_action(self.cancel_execution)
+        elif event.button.id == "retry_btn":
+            self.run_worker(self.retry_failed_hosts())
         elif event.button.id == "close_btn":
             self.running = False
             self.dismiss()
@@ -82,4 +107,17 @@ class ExecutionViewScreen(Screen):
             self.running = False
         except Exception as e:
             self.notify(f"Failed to cancel: {e}", severity="error")
+    
+    async def retry_failed_hosts(self) -> None:
+        """Run the playbook again on the failed and unreachable hosts only"""
+        try:
+            response = await self.api_client.post(f"/api/executions/{self.execution_id}/retry")
+            if response.status_code != 200:
+                self.notify(f"Retry failed: {response.json().get('detail')}", severity="error")
+                return
+            data = response.json()
+            self.notify(f"Retrying {len(data['hosts'])} host(s)")
+            self.app.switch_screen(ExecutionViewScreen(data['execution_id'], self.api_client))
+        except Exception as e:
+            self.notify(f"Failed to retry: {e}", severity="error")
 
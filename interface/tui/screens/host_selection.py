@@ -1,10 +1,12 @@
 """Host selection screen for TUI"""
 
 from textual.screen import Screen
-from textual.widgets import Button, Select, Static, CheckboxList
+from textual.widgets import Button, Input, Select, Static, CheckboxList
 from textual.containers import Container, Vertical, Horizontal
 from textual.app import ComposeResult
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+PREVIEW_HOSTS = 20
 
 
 class HostSelectionScreen(Screen):
@@ -12,11 +14,15 @@ class HostSelectionScreen(Screen):
     
     BINDINGS = [("escape", "cancel", "Cancel")]
     
-    def __init__(self, hosts: List[Dict], groups: List[Dict], **kwargs):
+    def __init__(self, hosts: List[Dict], groups: List[Dict], api_client=None, **kwargs):
         super().__init__(**kwargs)
         self.hosts = hosts
         self.groups = groups
+        self.api_client = api_client
         self.selected = []
+        self.targets: Optional[List[str]] = None
+        self.terms: Optional[List[str]] = None
+        self.previewed_pattern: Optional[str] = None
     
     def compose(self) -> ComposeResult:
         with Container(id="host_selection_container"):
@@ -26,6 +32,9 @@ class HostSelectionScreen(Screen):
                 yield CheckboxList(id="groups_list")
                 yield Static("Hosts:", classes="section_label")
                 yield CheckboxList(id="hosts_list")
+                yield Static("Pattern (optional):", classes="section_label")
+                yield Input(placeholder="e.g. lab1:lab2:!111 or lab*:&avell", id="pattern_input")
+            yield Static("Targets: 0 hosts", id="target_preview")
             with Horizontal(id="buttons"):
                 yield Button("Cancel", id="cancel_btn", variant="error")
                 yield Button("Confirm", id="confirm_btn", variant="primary")
@@ -42,8 +51,64 @@ class HostSelectionScreen(Screen):
         # Add hosts
         host_options = [(h['name'], h['name']) for h in self.hosts]
         hosts_list.set_options(host_options)
+        
+        # Keep the target preview in step with the selection
+        if self.api_client is not None:
+            self.set_interval(0.5, self.refresh_preview)
     
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    def target_pattern(self) -> str:
+        """Host pattern of the selected groups and hosts plus the typed pattern"""
+        terms = list(self.query_one("#groups_list", CheckboxList).selected)
+        terms += self.query_one("#hosts_list", CheckboxList).selected
+        typed = self.query_one("#pattern_input", Input).value.strip()
+        if typed:
+            terms.append(typed)
+        # Ansible splits a pattern on colons only when it has no commas
+        return (',' if ',' in typed else ':').join(terms)
+    
+    async def refresh_preview(self) -> None:
+        """Show the hosts the selection targets, as ansible-playbook resolves it"""
+        pattern = self.target_pattern()
+        if pattern == self.previewed_pattern:
+            return
+        self.previewed_pattern = pattern
+        preview = self.query_one("#target_preview", Static)
+        if not pattern:
+            self.targets = []
+            preview.update("Targets: 0 hosts")
+            return
+        
+        try:
+            response = await self.api_client.get("/api/inventory/resolve", params={"pattern": pattern})
+            data = response.json()
+        except Exception as e:
+            # Without a preview the run falls back to the selected names
+            self.targets = None
+            self.terms = None
+            preview.update(f"Targets: preview unavailable ({e})")
+            return
+        if pattern != self.target_pattern():
+            # The selection changed meanwhile; the next refresh shows it
+            self.previewed_pattern = None
+            return
+        if response.status_code != 200:
+            self.targets = []
+            preview.update(f"Targets: invalid pattern ({data.get('detail', response.status_code)})")
+            return
+        
+        self.targets = data['hosts']
+        self.terms = data['terms']
+        shown = ', '.join(data['hosts'][:PREVIEW_HOSTS])
+        if data['count'] > PREVIEW_HOSTS:
+            shown += f", ... (+{data['count'] - PREVIEW_HOSTS})"
+        text = f"Targets: {data['count']} hosts"
+        if shown:
+            text += f" - {shown}"
+        if data['unmatched']:
+            text += f"\nNo match: {', '.join(data['unmatched'])}"
+        preview.update(text)
+    
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses"""
         if event.button.id == "cancel_btn":
             self.dismiss(None)
@@ -54,9 +119,18 @@ class HostSelectionScreen(Screen):
             selected_groups = groups_list.selected
             selected_hosts = hosts_list.selected
             
+            if self.api_client is not None:
+                self.previewed_pattern = None
+                await self.refresh_preview()
+                if self.targets == []:
+                    self.notify("No hosts match the selection", severity="error")
+                    return
+            
             self.selected = {
                 'groups': selected_groups,
-                'hosts': selected_hosts
+                'hosts': selected_hosts,
+                'targets': self.targets,
+                'terms': self.terms
             }
             self.dismiss(self.selected)
 
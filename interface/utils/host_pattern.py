@@ -0,0 +1,285 @@
+"""Ansible host patterns resolved against an indexed inventory"""
+
+import fnmatch
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from interface.utils.inventory import Inventory
+
+
+# One pattern term: anything but whitespace, ':' and brackets, or a whole [bracketed] expression
+TERM = re.compile(r'(?:[^\s:\[\]]|\[[^\]]*\])+')
+SUBSCRIPT = re.compile(r'^(.+)\[(?:(-?[0-9]+)|([0-9]+)[:-]([0-9]*))\]$')
+WILDCARDS = ('*', '?', '[')
+PATTERN_MARKERS = WILDCARDS + ('~', '!', '&', ':', ',')
+
+CACHE_SIZE = 256
+
+
+def split_host_pattern(pattern: str) -> List[str]:
+    """
+    Split a host pattern into its terms, as Ansible does
+
+    Terms are separated by commas or, in a pattern without commas, by
+    colons outside brackets, so lab1:lab2, lab1,lab2 and web[0:2]:db all
+    work. An IPv6 address is kept whole.
+    """
+    if ',' in pattern:
+        terms = pattern.split(',')
+    elif '::' in pattern:
+        terms = [pattern]
+    else:
+        terms = TERM.findall(pattern)
+    return [term.strip() for term in terms if term.strip()]
+
+
+def is_host_pattern(target: str) -> bool:
+    """Check if a target is a host pattern rather than a plain host or group name"""
+    return any(marker in target for marker in PATTERN_MARKERS)
+
+
+class PatternTerm:
+    """One term of a host pattern: an operator, an expression and an optional subscript"""
+
+    __slots__ = ('text', 'operator', 'expression', 'subscript', 'regex')
+
+    def __init__(self, text: str):
+        """
+        Parse a term
+
+        Raises:
+            ValueError: If the term has an invalid regex or wildcard
+        """
+        self.text = text
+        self.operator = text[0] if text[0] in '!&' else ''
+        expression = text[len(self.operator):]
+        if not expression:
+            raise ValueError(f"Empty host pattern term: {text}")
+        self.subscript: Optional[Tuple[int, Optional[int]]] = None
+        if expression[0] != '~':
+            match = SUBSCRIPT.match(expression)
+            if match:
+                expression, index, start, end = match.groups()
+                if index is not None:
+                    self.subscript = (int(index), None)
+                else:
+                    # Ansible slices include the end; web[2:] runs to the last host
+                    self.subscript = (int(start), int(end) if end else -1)
+        self.expression = expression
+        self.regex: Optional[re.Pattern] = None
+        try:
+            if expression[0] == '~':
+                self.regex = re.compile(expression[1:])
+            elif any(char in expression for char in WILDCARDS):
+                self.regex = re.compile(fnmatch.translate(expression))
+        except re.error as e:
+            raise ValueError(f"Invalid host pattern {text}: {e}") from None
+
+    def slice(self, hosts: Tuple[str, ...]) -> Tuple[str, ...]:
+        if self.subscript is None:
+            return hosts
+        start, end = self.subscript
+        if end is None:
+            return (hosts[start],) if -len(hosts) <= start < len(hosts) else ()
+        return hosts[start:] if end == -1 else hosts[start:end + 1]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_host_pattern(pattern: str) -> Tuple[PatternTerm, ...]:
+    """
+    Parse a host pattern into terms in evaluation order
+
+    Ansible applies every union first, then the &intersections and then the
+    !exclusions, whatever their order in the pattern; a pattern with only
+    intersections and exclusions starts from 'all'.
+
+    Raises:
+        ValueError: If a term is invalid
+    """
+    terms = [PatternTerm(text) for text in split_host_pattern(pattern)]
+    union = [term for term in terms if not term.operator]
+    if not union:
+        union = [PatternTerm('all')]
+    return tuple(
+        union
+        + [term for term in terms if term.operator == '&']
+        + [term for term in terms if term.operator == '!']
+    )
+
+
+class PatternResolution:
+    """Hosts a pattern targets, with the terms that matched nothing"""
+
+    __slots__ = ('pattern', 'hosts', 'unmatched')
+
+    def __init__(self, pattern: str, hosts: Tuple[str, ...], unmatched: Tuple[str, ...]):
+        self.pattern = pattern
+        self.hosts = hosts
+        self.unmatched = unmatched
+
+
+class HostPatternResolver:
+    """
+    Resolve host patterns the way ansible-playbook does
+
+    Supports unions (a:b or a,b), intersections (&a), exclusions (!a),
+    wildcards (lab*), regexes (~lab[12]) and subscripts (lab1[0], lab1[0:9],
+    lab1[10:]). Exact names are dictionary lookups on the inventory index,
+    and results are cached per pattern, so resolving a pattern again costs
+    a few microseconds. Hosts come in the order Ansible runs them: pattern
+    order, then inventory order within each term.
+    """
+
+    def __init__(self, inventory: Inventory):
+        self.inventory = inventory
+        self._cache: Dict[str, PatternResolution] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, pattern: str) -> PatternResolution:
+        """
+        Resolve a host pattern
+
+        Raises:
+            ValueError: If the pattern has an invalid term
+        """
+        resolution = self._cache.get(pattern)
+        if resolution is not None:
+            return resolution
+
+        hosts: Dict[str, None] = {}
+        unmatched: List[str] = []
+        for term in parse_host_pattern(pattern):
+            matched = term.slice(self.match(term))
+            if not matched and term.text != 'all':
+                unmatched.append(term.text)
+            if term.operator == '!':
+                for host in matched:
+                    hosts.pop(host, None)
+            elif term.operator == '&':
+                keep = set(matched)
+                hosts = {host: None for host in hosts if host in keep}
+            else:
+                hosts.update(dict.fromkeys(matched))
+
+        resolution = PatternResolution(pattern, tuple(hosts), tuple(unmatched))
+        with self._lock:
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            self._cache[pattern] = resolution
+        return resolution
+
+    def match(self, term: PatternTerm) -> Tuple[str, ...]:
+        """Hosts of the groups and hosts a term's expression names, before its subscript"""
+        inventory = self.inventory
+        if term.regex is None:
+            if term.expression in inventory.group_hosts:
+                return inventory.group_hosts[term.expression]
+            return (term.expression,) if term.expression in inventory.hosts else ()
+
+        found: Dict[str, None] = {}
+        for name, members in inventory.group_hosts.items():
+            if term.regex.match(name):
+                found.update(dict.fromkeys(members))
+        # Wildcards and regexes also match host names, as in Ansible
+        found.update(dict.fromkeys(name for name in inventory.hosts if term.regex.match(name)))
+        return tuple(found)
+
+
+def _slices(inventory: Inventory, names: Dict[str, None], allowed) -> List[str]:
+    """
+    Cover names with subscripts of groups that list them in order, e.g. lab1[3:9]
+
+    A slice may only span hosts in allowed. Covered names are removed from
+    names; a slice is used only where it is shorter than the names it replaces.
+    """
+    terms = []
+    for group_name, group in inventory.groups.items():
+        # Only groups without children keep a member order Ansible is sure to share
+        if not names or group.children or group_name in ('all', 'ungrouped'):
+            continue
+        members = group.hosts
+        start = None
+        for position in range(len(members) + 1):
+            if position < len(members) and members[position] in allowed:
+                if start is None:
+                    start = position
+                continue
+            if start is not None:
+                # Trim the run to the names it still has to cover
+                run = [p for p in range(start, position) if members[p] in names]
+                if len(run) > 1:
+                    term = f"{group_name}[{run[0]}:{run[-1]}]"
+                    if len(term) < sum(len(members[p]) + 1 for p in run) - 1:
+                        terms.append(term)
+                        for p in range(run[0], run[-1] + 1):
+                            names.pop(members[p], None)
+                start = None
+    return terms
+
+
+def _group_cover(inventory: Inventory, wanted: Dict[str, None]) -> List[str]:
+    """Pick whole groups greedily, then cover what is left and the exclusions with subscripts and names"""
+    uncovered = dict(wanted)
+    excluded: Dict[str, None] = {}
+    groups: List[str] = []
+    candidates = [name for name in inventory.group_hosts if name != 'ungrouped']
+    while uncovered:
+        best, best_gain = None, 0
+        for name in candidates:
+            members = inventory.group_hosts[name]
+            gain = -len(name) - 1
+            for host in members:
+                if host in uncovered:
+                    gain += len(host) + 1
+                elif host not in wanted and host not in excluded:
+                    gain -= len(host) + 2
+            if gain > best_gain:
+                best, best_gain = name, gain
+        if best is None:
+            break
+        groups.append(best)
+        candidates.remove(best)
+        for host in inventory.group_hosts[best]:
+            if host in wanted:
+                uncovered.pop(host, None)
+            else:
+                excluded[host] = None
+
+    # Run the groups in inventory order, as the selection would have
+    order = {name: index for index, name in enumerate(inventory.group_hosts)}
+    groups.sort(key=order.__getitem__)
+    terms = groups + _slices(inventory, uncovered, wanted) + list(uncovered)
+    exclusions = _slices(inventory, excluded, set(inventory.hosts).difference(wanted))
+    return terms + ['!' + term for term in exclusions + list(excluded)]
+
+
+def compress_targets(inventory: Inventory, hosts: Iterable[str]) -> List[str]:
+    """
+    Express a set of hosts as a short host pattern
+
+    Whole groups are used wherever they save more than the exclusions they
+    need, e.g. lab1 and lab2 without 111 becomes lab1,lab2,!111; the hosts
+    left over and the exclusions are then grouped into subscripts of the
+    groups that list them in a row. Where subscripts alone are shorter, e.g.
+    lab1[2:6] rather than lab1,!lab1[0:1],!lab1-08, they are used instead.
+    Names the inventory does not know are kept as they are.
+
+    Returns:
+        Pattern terms; joined with commas they resolve to exactly the hosts
+    """
+    wanted: Dict[str, None] = dict.fromkeys(hosts)
+    unknown = [name for name in wanted if name not in inventory.hosts]
+    for name in unknown:
+        del wanted[name]
+    if wanted and len(wanted) == len(inventory.hosts):
+        return ['all'] + unknown
+
+    grouped = _group_cover(inventory, wanted)
+    remaining = dict(wanted)
+    sliced = _slices(inventory, remaining, wanted) + list(remaining)
+    terms = min(grouped, sliced, key=lambda candidate: len(','.join(candidate)))
+    # Exclusions go last, after the unknown names
+    split = next((index for index, term in enumerate(terms) if term.startswith('!')), len(terms))
+    return terms[:split] + unknown + terms[split:]
@@ -0,0 +1,321 @@
+"""Indexed in-memory model of an Ansible INI inventory"""
+
+import re
+import shlex
+import string
+import sys
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+RANGE = re.compile(r'^(.*?)\[([a-zA-Z0-9]*):([a-zA-Z0-9]+)(?::(\d+))?\](.*)$')
+SECTION = re.compile(r'^\[([^\]]+)\]$')
+HOST_PORT = re.compile(r'^([^:\[\]]+):(\d+)$')
+INLINE_COMMENT = re.compile(r'\s[#;].*$')
+COMMENT_MARKERS = ('#', ';')
+
+EMPTY: Mapping[str, str] = MappingProxyType({})
+
+
+def expand_host_range(pattern: str) -> List[str]:
+    """
+    Expand an Ansible host range, e.g. lab1-[01:40], db-[a:c] or pc[1:9:2]
+
+    Numeric ranges starting with 0 keep their width; ranges may be nested
+    in one name. Names without a range are returned as they are.
+
+    Raises:
+        ValueError: If the range is malformed
+    """
+    match = RANGE.match(pattern)
+    if match is None:
+        return [pattern]
+    head, begin, end, step, tail = match.groups()
+    step = int(step or 1)
+    if step < 1:
+        raise ValueError(f"Host range step must be positive: {pattern}")
+    begin = begin or '0'
+    if begin.isdigit() and end.isdigit():
+        if int(begin) > int(end):
+            raise ValueError(f"Host range must have begin <= end: {pattern}")
+        if begin[0] == '0' and len(begin) > 1:
+            if len(begin) != len(end):
+                raise ValueError(f"Host range must have begin and end of equal width: {pattern}")
+            values = [str(n).zfill(len(begin)) for n in range(int(begin), int(end) + 1, step)]
+        else:
+            values = [str(n) for n in range(int(begin), int(end) + 1, step)]
+    elif len(begin) == 1 and len(end) == 1 and begin.isalpha() and end.isalpha():
+        first, last = string.ascii_letters.index(begin), string.ascii_letters.index(end)
+        if first > last:
+            raise ValueError(f"Host range must have begin <= end: {pattern}")
+        values = list(string.ascii_letters[first:last + 1:step])
+    else:
+        raise ValueError(f"Invalid host range: {pattern}")
+    names: List[str] = []
+    for value in values:
+        names.extend(expand_host_range(head + value + tail))
+    return names
+
+
+def split_host_line(line: str) -> List[str]:
+    """Split a host line into words, dropping an inline comment as Ansible does"""
+    if '"' in line or "'" in line:
+        return shlex.split(line, comments=True)
+    return INLINE_COMMENT.sub('', line).split()
+
+
+def unquote(value: str) -> str:
+    """Strip whitespace and one pair of matching quotes around a value"""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+
+class Host:
+    """One inventory host with the variables set on its own lines"""
+
+    __slots__ = ('name', 'vars', 'groups')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.vars: Mapping[str, str] = EMPTY
+        # Groups that list the host directly, in file order
+        self.groups: Tuple[str, ...] = ()
+
+    def __repr__(self) -> str:
+        return f"Host({self.name!r})"
+
+
+class Group:
+    """One inventory group with its direct members and [group:vars]"""
+
+    __slots__ = ('name', 'hosts', 'children', 'parents', 'vars')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hosts: Tuple[str, ...] = ()
+        self.children: Tuple[str, ...] = ()
+        self.parents: Tuple[str, ...] = ()
+        self.vars: Mapping[str, str] = EMPTY
+
+    def __repr__(self) -> str:
+        return f"Group({self.name!r})"
+
+
+class Inventory:
+    """
+    Parsed inventory with every lookup precomputed
+
+    Hosts and groups are slotted records keyed by name. group_hosts and
+    host_groups follow [group:children] transitively, and effective_vars
+    holds each host's variables with Ansible's precedence: [all:vars],
+    then group vars from parent to child groups (ties by
+    ansible_group_priority, then name), then host vars. Hosts in the same
+    groups without vars of their own share one mapping, so memory grows
+    with the groups rather than the hosts.
+    """
+
+    def __init__(self, hosts: Dict[str, Host], groups: Dict[str, Group]):
+        self.hosts = hosts
+        self.groups = groups
+        self.group_hosts: Dict[str, Tuple[str, ...]] = {}
+        self.host_groups: Dict[str, Tuple[str, ...]] = {}
+        self.subgroups: Dict[str, Tuple[str, ...]] = {}
+        self.effective_vars: Dict[str, Mapping[str, str]] = {}
+        self.by_address: Dict[str, str] = {}
+        self._index()
+
+    def _index(self):
+        order = list(self.groups)
+        for name in order:
+            self.subgroups[name] = tuple(self._descendants(name))
+        for name in order:
+            members: Dict[str, None] = dict.fromkeys(self.groups[name].hosts)
+            for child in self.subgroups[name]:
+                members.update(dict.fromkeys(self.groups[child].hosts))
+            self.group_hosts[name] = tuple(members)
+        self.group_hosts['all'] = tuple(self.hosts)
+
+        ancestors = {name: self._ancestors(name) for name in order}
+        depths: Dict[str, int] = {}
+        rank = {name: (self._depth(name, depths), self._priority(name), name) for name in order}
+        merged_by_groups: Dict[Tuple[str, ...], Mapping[str, str]] = {}
+        all_vars = self.groups['all'].vars if 'all' in self.groups else EMPTY
+        for host in self.hosts.values():
+            found: Dict[str, None] = {}
+            for group in host.groups:
+                found[group] = None
+                found.update(dict.fromkeys(ancestors[group]))
+            found.pop('all', None)
+            groups = tuple(found)
+            self.host_groups[host.name] = groups
+
+            key = tuple(sorted(groups, key=rank.__getitem__))
+            merged = merged_by_groups.get(key)
+            if merged is None:
+                values = dict(all_vars)
+                for group in key:
+                    values.update(self.groups[group].vars)
+                merged = merged_by_groups[key] = MappingProxyType(values)
+            if host.vars:
+                values = dict(merged)
+                values.update(host.vars)
+                merged = MappingProxyType(values)
+            self.effective_vars[host.name] = merged
+
+            address = merged.get('ansible_host')
+            if address:
+                self.by_address.setdefault(address, host.name)
+
+    def _descendants(self, name: str) -> List[str]:
+        found: Dict[str, None] = {}
+        stack = list(reversed(self.groups[name].children))
+        while stack:
+            child = stack.pop()
+            if child in found or child == name:
+                continue
+            found[child] = None
+            stack.extend(reversed(self.groups[child].children))
+        return list(found)
+
+    def _ancestors(self, name: str) -> List[str]:
+        found: Dict[str, None] = {}
+        stack = list(self.groups[name].parents)
+        while stack:
+            parent = stack.pop()
+            if parent in found or parent == name:
+                continue
+            found[parent] = None
+            stack.extend(self.groups[parent].parents)
+        return list(found)
+
+    def _depth(self, name: str, depths: Dict[str, int]) -> int:
+        """Distance from the top of the group tree; children override their parents"""
+        if name not in depths:
+            depths[name] = 1  # Placeholder that stops cycles
+            parents = [p for p in self.groups[name].parents if p != 'all']
+            depths[name] = 1 + max((self._depth(p, depths) for p in parents), default=0)
+        return depths[name]
+
+    def _priority(self, name: str) -> int:
+        try:
+            return int(self.groups[name].vars.get('ansible_group_priority', 1))
+        except ValueError:
+            return 1
+
+    def host(self, name: str) -> Optional[Host]:
+        """Get a host by name, or by its ansible_host address"""
+        host = self.hosts.get(name)
+        if host is None and name in self.by_address:
+            host = self.hosts[self.by_address[name]]
+        return host
+
+    def host_var(self, host: str, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Get the effective value of a host variable"""
+        return self.effective_vars.get(host, EMPTY).get(name, default)
+
+    def expand(self, targets: Iterable[str]) -> List[str]:
+        """
+        Expand host and group names into host names, in target order
+
+        Names that are neither are kept, since Ansible may still know them.
+        """
+        found: Dict[str, None] = {}
+        for target in targets:
+            if target in self.group_hosts:
+                found.update(dict.fromkeys(self.group_hosts[target]))
+            else:
+                found[target] = None
+        return list(found)
+
+
+def parse_inventory(text: str) -> Inventory:
+    """
+    Parse the text of an INI inventory
+
+    Supports [group], [group:vars] and [group:children] sections, host
+    ranges, name:port, quoted values, and full-line and inline comments.
+    Hosts before the first section belong to 'ungrouped'.
+
+    Raises:
+        ValueError: On a malformed host range, with its line number
+    """
+    hosts: Dict[str, Host] = {}
+    groups: Dict[str, Group] = {}
+    host_vars: Dict[str, Dict[str, str]] = {}
+    group_vars: Dict[str, Dict[str, str]] = {}
+    members: Dict[str, Dict[str, None]] = {}
+    children: Dict[str, Dict[str, None]] = {}
+    host_groups: Dict[str, Dict[str, None]] = {}
+
+    def group(name: str) -> str:
+        name = sys.intern(name)
+        if name not in groups:
+            groups[name] = Group(name)
+        return name
+
+    section, kind = 'ungrouped', 'hosts'
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line or line[0] in COMMENT_MARKERS:
+            continue
+        match = SECTION.match(line)
+        if match:
+            section, _, kind = match.group(1).partition(':')
+            kind = kind or 'hosts'
+            group(section)
+            continue
+
+        if kind == 'vars':
+            key, sep, value = line.partition('=')
+            if sep:
+                group_vars.setdefault(section, {})[sys.intern(key.strip())] = unquote(value)
+        elif kind == 'children':
+            words = split_host_line(line)
+            if words:
+                children.setdefault(section, {})[group(words[0])] = None
+        else:
+            words = split_host_line(line)
+            if not words:
+                continue
+            name, variables = words[0], {}
+            port = HOST_PORT.match(name)
+            if port:
+                name, variables['ansible_port'] = port.group(1), port.group(2)
+            for word in words[1:]:
+                key, sep, value = word.partition('=')
+                if sep:
+                    variables[sys.intern(key)] = value
+            try:
+                names = expand_host_range(name)
+            except ValueError as e:
+                raise ValueError(f"Line {number}: {e}") from None
+            group(section)
+            for name in names:
+                if name not in hosts:
+                    hosts[name] = Host(name)
+                if variables:
+                    host_vars.setdefault(name, {}).update(variables)
+                members.setdefault(section, {})[name] = None
+                host_groups.setdefault(name, {})[section] = None
+
+    # 'ungrouped' only exists if some host is in it
+    if 'ungrouped' in groups and not members.get('ungrouped') and not group_vars.get('ungrouped'):
+        del groups['ungrouped']
+
+    parents: Dict[str, Dict[str, None]] = {}
+    for parent, names in children.items():
+        for child in names:
+            parents.setdefault(child, {})[parent] = None
+    for name, record in groups.items():
+        record.hosts = tuple(members.get(name, ()))
+        record.children = tuple(children.get(name, ()))
+        record.parents = tuple(parents.get(name, ()))
+        if name in group_vars:
+            record.vars = MappingProxyType(group_vars[name])
+    for name, record in hosts.items():
+        record.groups = tuple(host_groups.get(name, ()))
+        if name in host_vars:
+            record.vars = MappingProxyType(host_vars[name])
+    return Inventory(hosts, groups)
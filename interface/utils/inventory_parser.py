@@ -1,120 +1,195 @@
 """Parser for Ansible inventory.ini files"""
 
 import os
-import re
-from typing import Dict, List, Optional
+import time
+import hashlib
+import threading
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from pathlib import Path
 
+from interface.utils.inventory import Inventory, parse_inventory
+from interface.utils.host_pattern import HostPatternResolver, PatternResolution
+
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+def inventory_data(inventory: Inventory) -> Mapping[str, any]:
+    """
+    Build the dictionary view of an inventory returned by InventoryParser.parse
+
+    groups maps each group to all its hosts, including those of child
+    groups; groups with hosts of their own come first, so code that takes
+    the first group of a host gets the most specific one. Host entries hold
+    the host's own variables, as on its inventory line.
+    """
+    records = {}
+    for name, host in inventory.hosts.items():
+        record = {'name': name}
+        record.update(host.vars)
+        if 'ansible_host' in record:
+            record['ip'] = record['ansible_host']
+        records[name] = MappingProxyType(record)
+    names = [name for name, group in inventory.groups.items() if group.hosts and name != 'all']
+    names += [name for name, group in inventory.groups.items()
+              if not group.hosts and name != 'all' and inventory.group_hosts[name]]
+    return MappingProxyType({
+        'groups': MappingProxyType({
+            name: tuple(records[host] for host in inventory.group_hosts[name]) for name in names
+        }),
+        'all_hosts': tuple(records.values()),
+        'group_vars': MappingProxyType({
+            name: group.vars for name, group in inventory.groups.items() if group.vars
+        })
+    })
+
+
+class InventorySnapshot:
+    """
+    Parsed inventory at one version of the file
+
+    Holds the indexed model, its dictionary view and a host pattern
+    resolver. All are read-only (mappings and tuples), so every reader can
+    share the same snapshot without copying it.
+    """
+
+    __slots__ = ('version', 'inventory', 'data', 'resolver', 'file_key', 'digest', 'loaded_at')
+
+    def __init__(self, version: int, inventory: Inventory, file_key: Tuple[int, int, int], digest: str):
+        self.version = version
+        self.inventory = inventory
+        self.data = inventory_data(inventory)
+        self.resolver = HostPatternResolver(inventory)
+        self.file_key = file_key
+        self.digest = digest
+        self.loaded_at = datetime.now().isoformat()
+
 
 class InventoryParser:
-    """Parse Ansible inventory.ini files"""
+    """
+    Parse Ansible inventory.ini files
+
+    The file is parsed once into a snapshot that is shared by all readers.
+    It is parsed again only when its modification time, size or inode
+    changes, and the file is checked at most once per check interval, so
+    repeated reads cost no file I/O at all.
+    """
     
-    def __init__(self, inventory_path: Optional[str] = None):
+    def __init__(self, inventory_path: Optional[str] = None, check_interval: Optional[float] = None):
         """
         Initialize parser with inventory file path
         
         Args:
             inventory_path: Path to inventory.ini file. If None, uses default.
+            check_interval: Seconds between checks of the file for changes. If
+                None, reads ANSIBLE_LABS_INVENTORY_CHECK_INTERVAL (default 1;
+                0 checks on every read).
         """
         if inventory_path is None:
             # Default to inventory.ini in project root
             project_root = Path(__file__).parent.parent.parent
             inventory_path = project_root / "inventory.ini"
+        if check_interval is None:
+            check_interval = float(os.getenv("ANSIBLE_LABS_INVENTORY_CHECK_INTERVAL", DEFAULT_CHECK_INTERVAL))
         
         self.inventory_path = Path(inventory_path)
         if not self.inventory_path.exists():
             raise FileNotFoundError(f"Inventory file not found: {inventory_path}")
+        self.check_interval = check_interval
+        self._snapshot: Optional[InventorySnapshot] = None
+        self._checked_at = 0.0
+        self._invalid_key: Optional[Tuple[int, int, int]] = None
+        self._lock = threading.Lock()
+    
+    def snapshot(self) -> InventorySnapshot:
+        """
+        Get the current snapshot, parsing the file again if it changed
+
+        If the file disappears or becomes invalid after a successful parse,
+        e.g. while an editor replaces it, the last snapshot is kept until the
+        file is back or fixed.
+        """
+        current = self._snapshot
+        if current is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return current
+        with self._lock:
+            # Another reader may have checked while this one waited
+            if self._snapshot is not current and time.monotonic() - self._checked_at < self.check_interval:
+                return self._snapshot
+            try:
+                stat = os.stat(self.inventory_path)
+            except OSError:
+                if self._snapshot is None:
+                    raise
+                return self._snapshot
+            file_key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if self._snapshot is None or file_key not in (self._snapshot.file_key, self._invalid_key):
+                with open(self.inventory_path, 'rb') as f:
+                    content = f.read()
+                digest = hashlib.sha256(content).hexdigest()
+                if self._snapshot is not None and self._snapshot.digest == digest:
+                    # Touched but unchanged; keep the version
+                    self._snapshot.file_key = file_key
+                else:
+                    try:
+                        inventory = parse_inventory(content.decode('utf-8'))
+                    except ValueError as e:
+                        if self._snapshot is None:
+                            raise
+                        print(f"Warning: Keeping the previous inventory, {self.inventory_path} is invalid: {e}")
+                        self._invalid_key = file_key
+                    else:
+                        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+                        self._snapshot = InventorySnapshot(version, inventory, file_key, digest)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+    
+    @property
+    def version(self) -> int:
+        """Version of the current snapshot, increased every time the file changes"""
+        return self.snapshot().version
     
-    def parse(self) -> Dict[str, any]:
+    def parse(self) -> Mapping[str, any]:
         """
-        Parse inventory file and return structured data
+        Get the parsed inventory
         
         Returns:
-            Dictionary with groups and hosts information
+            Read-only mapping with groups and hosts information, shared by
+            all callers until the file changes
         """
-        groups: Dict[str, List[Dict[str, str]]] = {}
-        current_group: Optional[str] = None
-        current_vars_group: Optional[str] = None  # Track which group's vars we're processing
-        group_vars: Dict[str, Dict[str, str]] = {}
-        all_hosts: List[Dict[str, str]] = []
-        
-        with open(self.inventory_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Check for group definition [group_name]
-                group_match = re.match(r'^\[([^\]]+)\]$', line)
-                if group_match:
-                    group_name = group_match.group(1)
-                    
-                    # Check if it's a vars section
-                    if group_name.endswith(':vars'):
-                        current_group = None  # Don't process hosts in vars sections
-                        current_vars_group = group_name.replace(':vars', '')
-                        if current_vars_group not in group_vars:
-                            group_vars[current_vars_group] = {}
-                    else:
-                        current_group = group_name
-                        current_vars_group = None
-                        if current_group not in groups:
-                            groups[current_group] = []
-                    continue
-                
-                # Parse host line (only if we're in a regular group, not vars)
-                if current_group and current_group in groups:
-                    # Parse host definition: hostname ansible_host=ip other_vars
-                    parts = line.split()
-                    if parts:
-                        hostname = parts[0]
-                        host_info: Dict[str, str] = {'name': hostname}
-                        
-                        # Parse variables
-                        for part in parts[1:]:
-                            if '=' in part:
-                                key, value = part.split('=', 1)
-                                host_info[key] = value
-                        
-                        # Extract IP if available
-                        if 'ansible_host' in host_info:
-                            host_info['ip'] = host_info['ansible_host']
-                        
-                        groups[current_group].append(host_info)
-                        all_hosts.append(host_info)
-                
-                # Parse group variables (when we're in a :vars section)
-                elif current_vars_group is not None:
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        group_vars[current_vars_group][key.strip()] = value.strip()
+        return self.snapshot().data
+    
+    def inventory(self) -> Inventory:
+        """Get the indexed inventory model of the current snapshot"""
+        return self.snapshot().inventory
+    
+    def resolve(self, pattern: str) -> PatternResolution:
+        """
+        Resolve an Ansible host pattern, e.g. lab1:lab2:!111 or lab*:&winrm
         
-        return {
-            'groups': groups,
-            'all_hosts': all_hosts,
-            'group_vars': group_vars
-        }
+        Raises:
+            ValueError: If the pattern has an invalid term
+        """
+        return self.snapshot().resolver.resolve(pattern)
     
     def get_groups(self) -> List[str]:
         """Get list of all group names"""
-        data = self.parse()
-        return [g for g in data['groups'].keys() if not g.endswith(':vars')]
+        return list(self.parse()['groups'])
     
-    def get_hosts_by_group(self, group_name: str) -> List[Dict[str, str]]:
+    def get_hosts_by_group(self, group_name: str) -> List[Mapping[str, str]]:
         """Get all hosts in a specific group"""
         data = self.parse()
-        return data['groups'].get(group_name, [])
+        return list(data['groups'].get(group_name, ()))
     
-    def get_all_hosts(self) -> List[Dict[str, str]]:
+    def get_all_hosts(self) -> List[Mapping[str, str]]:
         """Get all hosts from all groups"""
         data = self.parse()
-        return data['all_hosts']
+        return list(data['all_hosts'])
     
     def get_host_names(self) -> List[str]:
         """Get list of all host names"""
-        return [host['name'] for host in self.get_all_hosts()]
+        return list(self.inventory().hosts)
 
 
 if __name__ == "__main__":
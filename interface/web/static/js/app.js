@@ -3,6 +3,11 @@
 const API_BASE = window.location.origin;
 let currentExecutionId = null;
 let pollInterval = null;
+let logOffset = 0;
+let eventSource = null;
+let targetHosts = [];
+let targetTerms = [];
+let previewTimer = null;
 
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', async () => {
@@ -175,9 +180,18 @@ function setupEventListeners() {
             updateSelectedCount();
             updateSelectedTags();
             updateExecuteButton();
+            if (e.target.dataset.type !== 'tag') {
+                schedulePreview();
+            }
         }
     });
 
+    // Host pattern
+    document.getElementById('pattern-input').addEventListener('input', () => {
+        updateExecuteButton();
+        schedulePreview();
+    });
+
     // Playbook selection
     document.getElementById('playbook-select').addEventListener('change', () => {
         updateExecuteButton();
@@ -188,6 +202,9 @@ function setupEventListeners() {
     
     // Cancel button
     document.getElementById('cancel-btn').addEventListener('click', cancelExecution);
+    
+    // Retry button
+    document.getElementById('retry-btn').addEventListener('click', retryFailedHosts);
 }
 
 // Update selected count
@@ -199,6 +216,66 @@ function updateSelectedCount() {
     document.getElementById('selected-count').textContent = count;
 }
 
+// Host pattern of the selected groups and hosts plus the typed pattern
+function targetPattern() {
+    const terms = Array.from(document.querySelectorAll('input[type="checkbox"]:checked'))
+        .filter(cb => cb.dataset.type === 'group' || cb.dataset.type === 'host')
+        .map(cb => cb.value);
+    const typed = document.getElementById('pattern-input').value.trim();
+    if (typed) {
+        terms.push(typed);
+    }
+    // Ansible splits a pattern on colons only when it has no commas
+    return terms.join(typed.includes(',') ? ',' : ':');
+}
+
+// Refresh the target preview once the selection stops changing
+function schedulePreview() {
+    clearTimeout(previewTimer);
+    previewTimer = setTimeout(updatePreview, 200);
+}
+
+// Show the hosts the current selection targets, as ansible-playbook resolves it
+async function updatePreview() {
+    const pattern = targetPattern();
+    const count = document.getElementById('target-count');
+    const unmatched = document.getElementById('target-unmatched');
+    const list = document.getElementById('target-hosts');
+    targetHosts = [];
+    targetTerms = [];
+    unmatched.textContent = '';
+    if (!pattern) {
+        count.textContent = '0';
+        list.textContent = '';
+        return targetHosts;
+    }
+
+    try {
+        const response = await fetch(`${API_BASE}/api/inventory/resolve?pattern=${encodeURIComponent(pattern)}`);
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.detail || `HTTP error! status: ${response.status}`);
+        }
+        // Ignore a response that a newer selection already replaced
+        if (pattern !== targetPattern()) {
+            return targetHosts;
+        }
+        targetHosts = data.hosts;
+        targetTerms = data.terms;
+        count.textContent = data.count;
+        list.textContent = data.hosts.join(', ');
+        if (data.unmatched.length > 0) {
+            unmatched.textContent = `sem correspondência: ${data.unmatched.join(', ')}`;
+        }
+    } catch (error) {
+        console.error('Error resolving hosts:', error);
+        count.textContent = '0';
+        list.textContent = '';
+        unmatched.textContent = error.message;
+    }
+    return targetHosts;
+}
+
 // Update selected tags
 function updateSelectedTags() {
     const selected = Array.from(document.querySelectorAll('input[type="checkbox"]:checked'))
@@ -215,7 +292,7 @@ function updateExecuteButton() {
     const selected = document.querySelectorAll('input[type="checkbox"]:checked');
     const hasSelection = Array.from(selected).some(cb => 
         cb.dataset.type === 'group' || cb.dataset.type === 'host'
-    );
+    ) || document.getElementById('pattern-input').value.trim() !== '';
     
     const btn = document.getElementById('execute-btn');
     btn.disabled = !playbook || !hasSelection;
@@ -224,43 +301,21 @@ function updateExecuteButton() {
 // Execute playbook
 async function executePlaybook() {
     const playbook = document.getElementById('playbook-select').value;
-    const selectedGroups = Array.from(document.querySelectorAll('input[type="checkbox"]:checked'))
-        .filter(cb => cb.dataset.type === 'group')
-        .map(cb => cb.value);
-    const selectedHosts = Array.from(document.querySelectorAll('input[type="checkbox"]:checked'))
-        .filter(cb => cb.dataset.type === 'host')
-        .map(cb => cb.value);
     const selectedTags = Array.from(document.querySelectorAll('input[type="checkbox"]:checked'))
         .filter(cb => cb.dataset.type === 'tag')
         .map(cb => cb.value);
 
-    // Build hosts list (include hosts from selected groups)
-    let hosts = [...selectedHosts];
-    
-    // Get hosts from selected groups
-    if (selectedGroups.length > 0) {
-        try {
-            const groupsResponse = await fetch(`${API_BASE}/api/inventory/groups`);
-            const groups = await groupsResponse.json();
-            
-            selectedGroups.forEach(groupName => {
-                const group = groups.find(g => g.name === groupName);
-                if (group) {
-                    group.hosts.forEach(host => {
-                        if (!hosts.includes(host.name)) {
-                            hosts.push(host.name);
-                        }
-                    });
-                }
-            });
-        } catch (error) {
-            console.error('Error getting group hosts:', error);
-        }
+    // Send the selected groups and pattern terms; the runner compresses them into the command
+    clearTimeout(previewTimer);
+    const targets = await updatePreview();
+    if (targets.length === 0) {
+        alert('Nenhum host corresponde à seleção');
+        return;
     }
 
     const requestBody = {
         playbook: playbook,
-        hosts: hosts.length > 0 ? hosts : null,
+        hosts: targetTerms,
         tags: selectedTags.length > 0 ? selectedTags : null,
         ask_password: true
     };
@@ -279,28 +334,112 @@ async function executePlaybook() {
         }
 
         const data = await response.json();
-        currentExecutionId = data.execution_id;
-        
-        // Show execution card
-        document.getElementById('execution-card').style.display = 'block';
-        document.getElementById('execution-id').textContent = currentExecutionId;
-        document.getElementById('execution-status').textContent = 'Running...';
-        document.getElementById('execution-status').className = 'status-running';
-        document.getElementById('execution-log').textContent = '';
-        
-        // Show cancel button, hide execute
-        document.getElementById('execute-btn').style.display = 'none';
-        document.getElementById('cancel-btn').style.display = 'block';
-        
-        // Start polling
-        startPolling();
+        followExecution(data.execution_id);
     } catch (error) {
         console.error('Error executing playbook:', error);
         alert(`Erro ao executar playbook: ${error.message}`);
     }
 }
 
-// Start polling execution status
+// Show an execution and follow its output
+function followExecution(executionId) {
+    currentExecutionId = executionId;
+    
+    // Show execution card
+    document.getElementById('execution-card').style.display = 'block';
+    document.getElementById('execution-id').textContent = currentExecutionId;
+    document.getElementById('execution-status').textContent = 'Running...';
+    document.getElementById('execution-status').className = 'status-running';
+    document.getElementById('execution-log').textContent = '';
+    logOffset = 0;
+    
+    // Show cancel button, hide execute and retry
+    document.getElementById('execute-btn').style.display = 'none';
+    document.getElementById('retry-btn').style.display = 'none';
+    document.getElementById('cancel-btn').style.display = 'block';
+    
+    // Stream output (fall back to polling without EventSource support)
+    if (window.EventSource) {
+        startStreaming();
+    } else {
+        startPolling();
+    }
+}
+
+// Restore the buttons once the execution finished
+function finishExecution(status) {
+    document.getElementById('execute-btn').style.display = 'block';
+    document.getElementById('cancel-btn').style.display = 'none';
+    document.getElementById('retry-btn').style.display = status === 'failed' ? 'block' : 'none';
+}
+
+// Run the playbook again on the failed and unreachable hosts only
+async function retryFailedHosts() {
+    if (!currentExecutionId) return;
+    
+    try {
+        const response = await fetch(`${API_BASE}/api/executions/${currentExecutionId}/retry`, {
+            method: 'POST'
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.detail || `HTTP error! status: ${response.status}`);
+        }
+        followExecution(data.execution_id);
+    } catch (error) {
+        console.error('Error retrying execution:', error);
+        alert(`Erro ao repetir execução: ${error.message}`);
+    }
+}
+
+// Stream execution output via Server-Sent Events
+function startStreaming() {
+    stopStreaming();
+    
+    // EventSource reconnects on its own and resumes from the last event id
+    eventSource = new EventSource(`${API_BASE}/api/executions/${currentExecutionId}/stream?since=${logOffset}`);
+    const logEl = document.getElementById('execution-log');
+    
+    eventSource.addEventListener('line', (e) => {
+        const data = JSON.parse(e.data);
+        logEl.textContent += formatLogLine(data.line, data.stream);
+        logOffset = parseInt(e.lastEventId, 10) || logOffset;
+        logEl.scrollTop = logEl.scrollHeight;
+    });
+    
+    eventSource.addEventListener('status', (e) => {
+        const data = JSON.parse(e.data);
+        const statusEl = document.getElementById('execution-status');
+        statusEl.textContent = data.status.toUpperCase();
+        statusEl.className = `status-${data.status}`;
+    });
+    
+    eventSource.addEventListener('done', (e) => {
+        const data = JSON.parse(e.data);
+        const statusEl = document.getElementById('execution-status');
+        statusEl.textContent = data.status.toUpperCase();
+        statusEl.className = `status-${data.status}`;
+        stopStreaming();
+        finishExecution(data.status);
+    });
+    
+    eventSource.addEventListener('error', (e) => {
+        if (e.data) {
+            console.error('Stream error:', e.data);
+            stopStreaming();
+        }
+    });
+}
+
+// Stop streaming execution output
+function stopStreaming() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
+// Poll execution status (fallback when EventSource is unavailable)
 function startPolling() {
     if (pollInterval) {
         clearInterval(pollInterval);
@@ -310,32 +449,29 @@ function startPolling() {
         if (!currentExecutionId) return;
         
         try {
-            const response = await fetch(`${API_BASE}/api/executions/${currentExecutionId}`);
-            const status = await response.json();
+            const response = await fetch(`${API_BASE}/api/executions/${currentExecutionId}/log?since=${logOffset}`);
+            const log = await response.json();
             
             // Update status
             const statusEl = document.getElementById('execution-status');
-            statusEl.textContent = status.status.toUpperCase();
-            statusEl.className = `status-${status.status}`;
+            statusEl.textContent = log.status.toUpperCase();
+            statusEl.className = `status-${log.status}`;
             
-            // Update log
+            // Append only the new lines
             const logEl = document.getElementById('execution-log');
-            if (status.stdout) {
-                logEl.textContent = status.stdout;
-            }
-            if (status.stderr) {
-                logEl.textContent += '\n[ERROR] ' + status.stderr;
+            if (log.lines.length > 0) {
+                logEl.textContent += log.lines.map((line, i) => formatLogLine(line, log.streams[i])).join('');
             }
+            logOffset = log.next_offset;
             
             // Scroll to bottom
             logEl.scrollTop = logEl.scrollHeight;
             
             // Check if finished
-            if (['success', 'failed', 'cancelled'].includes(status.status)) {
+            if (log.complete) {
                 clearInterval(pollInterval);
                 pollInterval = null;
-                document.getElementById('execute-btn').style.display = 'block';
-                document.getElementById('cancel-btn').style.display = 'none';
+                finishExecution(log.status);
             }
         } catch (error) {
             console.error('Error polling status:', error);
@@ -343,6 +479,11 @@ function startPolling() {
     }, 1000);
 }
 
+// Prefix stderr lines so they stand out in the interleaved log
+function formatLogLine(line, stream) {
+    return stream === 'stderr' ? '[STDERR] ' + line : line;
+}
+
 // Cancel execution
 async function cancelExecution() {
     if (!currentExecutionId) return;
@@ -353,14 +494,14 @@ async function cancelExecution() {
         });
         
         if (response.ok) {
+            stopStreaming();
             if (pollInterval) {
                 clearInterval(pollInterval);
                 pollInterval = null;
             }
             document.getElementById('execution-status').textContent = 'CANCELLED';
             document.getElementById('execution-status').className = 'status-cancelled';
-            document.getElementById('execute-btn').style.display = 'block';
-            document.getElementById('cancel-btn').style.display = 'none';
+            finishExecution('cancelled');
         }
     } catch (error) {
         console.error('Error cancelling execution:', error);
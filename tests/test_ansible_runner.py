@@ -0,0 +1,89 @@
+"""Tests for cancellation and secret handling in the Ansible runner"""
+
+import shlex
+import sys
+import threading
+import time
+
+import pytest
+
+from interface.api.ansible_runner import AnsibleRunner
+from interface.api.database import Database
+from interface.api.execution_store import ExecutionStore
+
+
+# Stand-in for ansible-playbook that leaves a marker when it is started
+PLAYBOOK_COMMAND = "import pathlib, sys; pathlib.Path(sys.argv[1]).touch()"
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    monkeypatch.setenv('ANSIBLE_LABS_FACT_CACHE_DIR', str(tmp_path / 'facts'))
+    (tmp_path / 'site.yaml').write_text('- hosts: "{{ local }}"\n')
+    command = shlex.join([sys.executable, '-c', PLAYBOOK_COMMAND, str(tmp_path / 'spawned')])
+    runner = AnsibleRunner(
+        project_dir=str(tmp_path),
+        store=ExecutionStore(Database(':memory:')),
+        tuning='off',
+        ansible_playbook=command
+    )
+    return runner
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+def test_cancel_before_the_process_starts(runner, tmp_path):
+    # Hold the execution in fact expiry, before any process is spawned
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_expire(host_groups):
+        entered.set()
+        release.wait(5)
+        return []
+
+    runner.facts.expire = slow_expire
+    execution_id = runner.execute_playbook('site.yaml', ask_password=False)
+    assert entered.wait(5)
+    assert runner.get_execution(execution_id)['status'] == 'running'
+
+    assert runner.cancel_execution(execution_id)
+    release.set()
+    wait_for(lambda: execution_id not in runner.executions)
+
+    execution = runner.get_execution(execution_id)
+    assert execution['status'] == 'cancelled'
+    assert execution['return_code'] is None
+    assert not (tmp_path / 'spawned').exists()
+    assert not runner.cancel_execution(execution_id)
+
+
+def test_cancel_pending_execution(runner):
+    runner.scheduler.max_concurrent = 0
+    execution_id = runner.execute_playbook('site.yaml', ask_password=False)
+    assert runner.get_execution(execution_id)['status'] == 'pending'
+    assert runner.cancel_execution(execution_id)
+    assert runner.get_execution(execution_id)['status'] == 'cancelled'
+
+
+def test_finished_records_are_cached_redacted(runner, monkeypatch):
+    execution_id = runner.execute_playbook(
+        'site.yaml', hosts=['111'], extra_vars={'ansible_password': 'hunter2', 'user': 'aluno'}, ask_password=False
+    )
+    wait_for(lambda: execution_id not in runner.executions)
+    record = runner.get_execution(execution_id)
+    assert record['extra_vars'] == {'ansible_password': '********', 'user': 'aluno'}
+    assert 'hunter2' not in record['cmd']
+
+    # A retry still gets the real value
+    monkeypatch.setattr(runner, 'retry_targets', lambda execution_id: ['111'])
+    retry_id = runner.retry_execution(execution_id)
+    assert 'ansible_password=hunter2' in runner.executions[retry_id]['cmd']
+
+    runner._retry_secrets.clear()
+    with pytest.raises(ValueError, match='no longer known'):
+        runner.retry_execution(execution_id)
@@ -0,0 +1,61 @@
+"""Tests for the bounded cache of finished executions"""
+
+import time
+
+from interface.api.execution_cache import ExecutionCache, output_size
+from interface.api.output_buffer import OutputBuffer
+
+
+def make_output(lines=10):
+    output = OutputBuffer()
+    for number in range(lines):
+        output.append(f"line {number}\n")
+    return output
+
+
+def test_lru_bounds_by_count_and_bytes():
+    output = make_output()
+    cache = ExecutionCache(max_entries=2, max_bytes=output_size(output) * 2, ttl=60)
+    cache.put('a', {'id': 'a'}, make_output())
+    cache.put('b', {'id': 'b'}, make_output())
+    assert cache.get('a') is not None
+    cache.put('c', {'id': 'c'}, make_output())
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.byte_size == output_size(output) * 2
+
+
+def test_oversized_output_keeps_record_only():
+    cache = ExecutionCache(max_entries=5, max_bytes=10, ttl=60)
+    cache.put('a', {'id': 'a'}, make_output())
+    assert cache.get('a') == {'id': 'a'}
+    assert cache.get_output('a') is None
+
+
+def test_reads_drop_every_expired_entry():
+    cache = ExecutionCache(max_entries=5, max_bytes=1 << 20, ttl=0.3)
+    cache._start_sweeper = lambda: None
+    cache.put('a', {'id': 'a'}, make_output())
+    time.sleep(0.2)
+    cache.put('b', {'id': 'b'})
+    time.sleep(0.15)
+    # Reading another execution releases the output of the expired one
+    assert cache.get_output('b') is None
+    assert len(cache) == 1
+    assert cache.byte_size == 0
+
+
+def test_expired_output_is_purged_without_access():
+    cache = ExecutionCache(max_entries=5, max_bytes=1 << 20, ttl=0.05)
+    cache.put('a', {'id': 'a'}, make_output())
+    deadline = time.monotonic() + 2
+    while len(cache) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(cache) == 0
+    assert cache.byte_size == 0
+
+
+def test_disabled_cache_keeps_nothing():
+    cache = ExecutionCache(max_entries=0, max_bytes=1 << 20, ttl=60)
+    cache.put('a', {'id': 'a'})
+    assert cache.get('a') is None
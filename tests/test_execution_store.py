@@ -0,0 +1,57 @@
+"""Tests for the execution history store"""
+
+import pytest
+
+from interface.api.database import Database
+from interface.api.execution_store import REDACTED, ExecutionStore, redact_secrets
+from interface.api.pipeline import PipelineStore
+
+
+@pytest.fixture
+def database():
+    return Database(':memory:')
+
+
+def make_execution(extra_vars=None, cmd="ansible-playbook site.yaml"):
+    return {
+        'id': 'run', 'playbook': 'site.yaml', 'status': 'running', 'cmd': cmd,
+        'hosts': ['lab1'], 'extra_vars': extra_vars, 'queued_at': '2024-01-01T00:00:00',
+        'attempt': 1, 'retries': 0, 'preflight': False,
+    }
+
+
+def test_redact_secrets_masks_sensitive_vars_and_their_arguments():
+    extra_vars = {'ansible_become_pass': 'hunter2', 'db_password': 'p w', 'api_token': 't', 'release': '1.2'}
+    cmd = "ansible-playbook site.yaml " + ' '.join(f"-e {key}={value}" for key, value in extra_vars.items())
+    redacted = redact_secrets(make_execution(extra_vars, cmd + " --vault-password-file /etc/vault\nsecond --vault-id=dev@prompt"))
+    assert redacted['extra_vars'] == {
+        'ansible_become_pass': REDACTED, 'db_password': REDACTED, 'api_token': REDACTED, 'release': '1.2'
+    }
+    for secret in ('hunter2', 'p w', '=t ', '/etc/vault', 'dev@prompt'):
+        assert secret not in redacted['cmd']
+    assert '-e release=1.2' in redacted['cmd']
+    assert f"--vault-id={REDACTED}" in redacted['cmd']
+
+
+def test_redact_secrets_keeps_records_without_secrets():
+    execution = make_execution({'release': '1.2', 'bypass_cache': True})
+    assert redact_secrets(execution) is execution
+
+
+def test_save_stores_redacted_copy(database):
+    store = ExecutionStore(database)
+    execution = make_execution({'ansible_password': 'hunter2'}, "ansible-playbook site.yaml -e ansible_password=hunter2")
+    store.save(execution, target_hosts=['lab1'])
+    saved = store.get('run')
+    assert saved['extra_vars'] == {'ansible_password': REDACTED}
+    assert 'hunter2' not in saved['cmd']
+    # The live record keeps the secret for the run itself
+    assert execution['extra_vars'] == {'ansible_password': 'hunter2'}
+
+
+def test_pipeline_steps_are_stored_redacted(database):
+    store = PipelineStore(database)
+    step = {'name': 'deploy', 'playbook': 'site.yaml', 'extra_vars': {'vault_secret': 's3'}}
+    store.save({'id': 'p', 'status': 'running', 'steps': [step]})
+    assert store.get('p')['steps'][0]['extra_vars'] == {'vault_secret': REDACTED}
+    assert step['extra_vars'] == {'vault_secret': 's3'}
@@ -0,0 +1,101 @@
+"""Tests for the fact cache TTLs and invalidation"""
+
+import json
+import os
+import time
+
+import pytest
+
+from interface.api.fact_cache import FactCache, is_safe_host, lookup_fact
+
+
+FACTS = {'ansible_product_name': 'HP Compaq 6005', 'ansible_default_ipv4': {'address': '10.0.0.11'}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FactCache(tmp_path / 'facts', default_ttl=100, group_ttls={'lab1': 10, 'servers': 50})
+
+
+def write_facts(cache, host, age=0.0, facts=FACTS):
+    path = cache.cache_dir / host
+    path.write_text(json.dumps(facts), encoding='utf-8')
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+
+def test_lookup_fact_with_and_without_prefix():
+    assert lookup_fact(FACTS, 'product_name') == 'HP Compaq 6005'
+    assert lookup_fact(FACTS, 'default_ipv4.address') == '10.0.0.11'
+    assert lookup_fact(FACTS, 'default_ipv4.address.missing') is None
+
+
+def test_host_ttl_uses_shortest_group_ttl(cache):
+    assert cache.host_ttl(['lab1', 'servers']) == 10
+    assert cache.host_ttl(['servers', 'other']) == 50
+    assert cache.host_ttl([]) == 100
+
+
+def test_expire_applies_group_ttls(cache):
+    write_facts(cache, '111', age=20)
+    write_facts(cache, '211', age=20)
+    write_facts(cache, 'old', age=200)
+    expired = cache.expire({'111': ['lab1'], '211': ['lab2']})
+    assert sorted(expired) == ['111', 'old']
+    assert cache.get('111') is None
+    assert cache.get('211')['fresh']
+
+
+def test_get_reports_age_and_ttl(cache):
+    write_facts(cache, '111', age=20)
+    entry = cache.get('111', {'111': ['lab1']})
+    assert entry['ttl'] == 10
+    assert not entry['fresh']
+    assert entry['facts'] == FACTS
+
+
+def test_invalidate_hosts_and_whole_cache(cache):
+    for host in ('111', '112', '211'):
+        write_facts(cache, host)
+    assert cache.invalidate(['111', 'missing']) == ['111']
+    assert [entry['host'] for entry in cache.query()] == ['112', '211']
+    assert sorted(cache.invalidate()) == ['112', '211']
+    assert cache.query() == []
+
+
+def test_reload_after_file_changes(cache):
+    write_facts(cache, '111', age=10)
+    assert cache.get('111')['facts'] == FACTS
+    write_facts(cache, '111', facts={'ansible_product_name': 'Other'})
+    assert cache.get('111')['facts'] == {'ansible_product_name': 'Other'}
+
+
+@pytest.mark.parametrize('host', ['..', '../secret', 'a/b', '.hidden', 'lab..1', 'a\\b', '111\n', ''])
+def test_unsafe_host_names_are_rejected(cache, tmp_path, host):
+    victim = tmp_path / 'secret'
+    victim.write_text('keep')
+    assert not is_safe_host(host)
+    with pytest.raises(ValueError):
+        cache.invalidate([host])
+    assert cache.get(host) is None
+    assert victim.exists()
+
+
+@pytest.mark.parametrize('host', ['111', 'lab-1.example.com', 'fe80::1', 'host_2'])
+def test_safe_host_names(host):
+    assert is_safe_host(host)
+
+
+def test_invalidate_rejects_before_removing_anything(cache):
+    write_facts(cache, '111')
+    with pytest.raises(ValueError):
+        cache.invalidate(['111', '../111'])
+    assert cache.get('111') is not None
+
+
+def test_query_filters_and_selects_fields(cache):
+    write_facts(cache, '111')
+    write_facts(cache, '112', facts={'ansible_product_name': 'Other'})
+    results = cache.query(where={'product_name': 'hp compaq 6005'}, fields=['default_ipv4.address'])
+    assert [(entry['host'], entry['facts']) for entry in results] == [('111', {'default_ipv4.address': '10.0.0.11'})]
+    assert cache.query(hosts=['112'])[0]['host'] == '112'
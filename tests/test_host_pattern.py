@@ -0,0 +1,145 @@
+"""Tests for host pattern parsing, resolution and compression"""
+
+import pytest
+
+from interface.utils.host_pattern import (
+    HostPatternResolver, compress_targets, is_host_pattern, parse_host_pattern, split_host_pattern
+)
+from interface.utils.inventory import parse_inventory
+
+
+INVENTORY = """
+[lab1]
+lab1-[01:08]
+
+[lab2]
+lab2-[01:04]
+
+[servers]
+srv1
+srv2
+
+[labs:children]
+lab1
+lab2
+"""
+
+LAB1 = tuple(f"lab1-{n:02d}" for n in range(1, 9))
+LAB2 = tuple(f"lab2-{n:02d}" for n in range(1, 5))
+
+
+@pytest.fixture(scope='module')
+def inventory():
+    return parse_inventory(INVENTORY)
+
+
+@pytest.fixture
+def resolver(inventory):
+    return HostPatternResolver(inventory)
+
+
+@pytest.mark.parametrize('pattern, terms', [
+    ('lab1:lab2', ['lab1', 'lab2']),
+    ('lab1, lab2', ['lab1', 'lab2']),
+    ('web[0:2]:db', ['web[0:2]', 'db']),
+    ('lab1:&labs:!srv1', ['lab1', '&labs', '!srv1']),
+    ('fe80::1', ['fe80::1']),
+    ('', []),
+])
+def test_split_host_pattern(pattern, terms):
+    assert split_host_pattern(pattern) == terms
+
+
+def test_is_host_pattern():
+    assert not is_host_pattern('lab1')
+    assert not is_host_pattern('10.0.0.1')
+    for pattern in ('lab*', '~lab', '!lab1', '&lab1', 'lab1:lab2', 'lab1,lab2', 'lab1[0]'):
+        assert is_host_pattern(pattern)
+
+
+def test_parse_applies_unions_then_intersections_then_exclusions():
+    terms = parse_host_pattern('!srv1:&labs:lab1:servers')
+    assert [term.text for term in terms] == ['lab1', 'servers', '&labs', '!srv1']
+    assert [term.text for term in parse_host_pattern('!srv1')] == ['all', '!srv1']
+
+
+@pytest.mark.parametrize('text, expression, subscript', [
+    ('lab1[0]', 'lab1', (0, None)),
+    ('lab1[-1]', 'lab1', (-1, None)),
+    ('lab1[2:4]', 'lab1', (2, 4)),
+    ('lab1[2-4]', 'lab1', (2, 4)),
+    ('lab1[3:]', 'lab1', (3, -1)),
+    ('~lab1[0-9]', '~lab1[0-9]', None),
+])
+def test_subscripts(text, expression, subscript):
+    term = parse_host_pattern(text)[0]
+    assert (term.expression, term.subscript) == (expression, subscript)
+
+
+@pytest.mark.parametrize('pattern', ['~(lab', '!', 'lab1:&'])
+def test_invalid_patterns(resolver, pattern):
+    with pytest.raises(ValueError):
+        resolver.resolve(pattern)
+
+
+@pytest.mark.parametrize('pattern, hosts', [
+    ('lab2', LAB2),
+    ('lab2-03', ('lab2-03',)),
+    ('lab2:srv1', LAB2 + ('srv1',)),
+    ('srv1,lab2', ('srv1',) + LAB2),
+    ('labs:!lab1', LAB2),
+    ('labs:&lab2', LAB2),
+    ('!labs', ('srv1', 'srv2')),
+    ('lab2-0*', LAB2),
+    ('~srv[12]', ('srv1', 'srv2')),
+    ('lab1[0]', LAB1[:1]),
+    ('lab1[-1]', LAB1[-1:]),
+    ('lab1[2:4]', LAB1[2:5]),
+    ('lab1[6:]', LAB1[6:]),
+    ('lab2:lab2-01:!lab2[2:3]', LAB2[:2]),
+])
+def test_resolve(resolver, pattern, hosts):
+    resolution = resolver.resolve(pattern)
+    assert resolution.hosts == hosts
+    assert resolution.unmatched == ()
+
+
+def test_resolve_reports_unmatched_terms(resolver):
+    resolution = resolver.resolve('lab2:nope:lab9*:lab1[20]')
+    assert resolution.hosts == LAB2
+    assert resolution.unmatched == ('nope', 'lab9*', 'lab1[20]')
+
+
+def test_resolve_caches_results(resolver):
+    assert resolver.resolve('labs:!lab2-01') is resolver.resolve('labs:!lab2-01')
+
+
+@pytest.mark.parametrize('hosts', [
+    LAB1,
+    LAB1 + LAB2,
+    LAB1[:-1] + LAB2,
+    LAB1[2:6],
+    LAB1[::2],
+    LAB1[1:] + ('srv2',),
+    ('srv1', 'lab2-02', 'lab1-05'),
+    ('lab2-01',),
+    (),
+])
+def test_compress_targets_round_trip(inventory, resolver, hosts):
+    terms = compress_targets(inventory, hosts)
+    if hosts:
+        assert set(resolver.resolve(','.join(terms)).hosts) == set(hosts)
+    else:
+        assert terms == []
+    assert len(','.join(terms)) <= len(','.join(hosts)) or len(hosts) < 2
+
+
+def test_compress_targets_prefers_groups_and_slices(inventory):
+    assert compress_targets(inventory, LAB1) == ['lab1']
+    assert compress_targets(inventory, LAB1 + LAB2 + ('srv1', 'srv2')) == ['all']
+    assert compress_targets(inventory, LAB1[2:7]) == ['lab1[2:6]']
+    assert compress_targets(inventory, LAB1 + LAB2[:-1]) == ['labs', '!lab2-04']
+
+
+def test_compress_targets_keeps_unknown_names(inventory):
+    assert compress_targets(inventory, LAB2 + ('localhost',)) == ['lab2', 'localhost']
@@ -0,0 +1,135 @@
+"""Tests for the indexed inventory model and the code that reads connection settings from it"""
+
+import pytest
+
+from interface.api.preflight import probe_targets
+from interface.api.sharding import plan_shards
+from interface.api.tuning import target_connections
+from interface.utils.inventory import expand_host_range, parse_inventory
+
+
+CHILDREN_INVENTORY = """
+[lab7]
+pc-01 ansible_host=10.0.7.1
+pc-02 ansible_host=10.0.7.2
+pc-03 ansible_host=10.0.7.3
+
+[lab1]
+111 ansible_host=10.0.1.11
+
+[windows:children]
+lab7
+
+[windows:vars]
+ansible_connection=winrm
+ansible_port=5985
+"""
+
+
+@pytest.mark.parametrize('pattern, expected', [
+    ('web', ['web']),
+    ('pc[1:3]', ['pc1', 'pc2', 'pc3']),
+    ('pc[01:03]', ['pc01', 'pc02', 'pc03']),
+    ('pc[1:9:4]', ['pc1', 'pc5', 'pc9']),
+    ('db-[a:c]', ['db-a', 'db-b', 'db-c']),
+    ('r[1:2]-[a:b]', ['r1-a', 'r1-b', 'r2-a', 'r2-b']),
+])
+def test_expand_host_range(pattern, expected):
+    assert expand_host_range(pattern) == expected
+
+
+@pytest.mark.parametrize('pattern', ['pc[3:1]', 'pc[01:100]', 'pc[1:3:0]', 'pc[a:3]'])
+def test_expand_host_range_rejects_malformed_ranges(pattern):
+    with pytest.raises(ValueError):
+        expand_host_range(pattern)
+
+
+def test_parse_inventory_sections_ports_and_comments():
+    inventory = parse_inventory("""
+loose.example.com
+[web]
+web[1:2] ansible_user=deploy  # inline comment
+db:2222 label="two words"
+; full-line comment
+""")
+    assert list(inventory.hosts) == ['loose.example.com', 'web1', 'web2', 'db']
+    assert inventory.group_hosts['ungrouped'] == ('loose.example.com',)
+    assert inventory.group_hosts['web'] == ('web1', 'web2', 'db')
+    assert inventory.hosts['db'].vars == {'ansible_port': '2222', 'label': 'two words'}
+    assert inventory.host_var('web2', 'ansible_user') == 'deploy'
+
+
+def test_parse_inventory_reports_the_line_of_a_bad_range():
+    with pytest.raises(ValueError, match='Line 3'):
+        parse_inventory("[web]\nweb1\nweb[5:1]\n")
+
+
+def test_children_inherit_hosts_and_vars():
+    inventory = parse_inventory(CHILDREN_INVENTORY)
+    assert inventory.group_hosts['windows'] == ('pc-01', 'pc-02', 'pc-03')
+    assert inventory.host_groups['pc-01'] == ('lab7', 'windows')
+    assert inventory.host_var('pc-01', 'ansible_connection') == 'winrm'
+    assert inventory.host_var('pc-01', 'ansible_port') == '5985'
+    assert inventory.host_var('111', 'ansible_connection') is None
+
+
+def test_variable_precedence():
+    inventory = parse_inventory("""
+[lab]
+pc1 color=host
+pc2
+
+[labs:children]
+lab
+
+[all:vars]
+color=all
+shell=sh
+
+[labs:vars]
+color=parent
+
+[lab:vars]
+color=child
+""")
+    assert inventory.host_var('pc1', 'color') == 'host'
+    assert inventory.host_var('pc2', 'color') == 'child'
+    assert inventory.host_var('pc2', 'shell') == 'sh'
+
+
+def test_host_lookup_by_address():
+    inventory = parse_inventory(CHILDREN_INVENTORY)
+    assert inventory.host('10.0.7.2').name == 'pc-02'
+    assert inventory.host('10.9.9.9') is None
+
+
+def test_probe_targets_use_inherited_connection_vars():
+    inventory = parse_inventory(CHILDREN_INVENTORY)
+    targets, unprobed = probe_targets(inventory, ['windows', 'ghost'])
+    assert targets == [
+        {'name': 'pc-01', 'address': '10.0.7.1', 'port': 5985},
+        {'name': 'pc-02', 'address': '10.0.7.2', 'port': 5985},
+        {'name': 'pc-03', 'address': '10.0.7.3', 'port': 5985},
+    ]
+    assert unprobed == ['ghost']
+
+
+def test_plan_shards_by_inherited_connection():
+    inventory = parse_inventory(CHILDREN_INVENTORY)
+    shards = plan_shards(inventory, None, 'connection', fork_budgets={'winrm': 10, 'ssh': 5})
+    assert shards == [
+        {'name': 'winrm', 'hosts': ['pc-01', 'pc-02', 'pc-03'], 'forks': 10},
+        {'name': 'ssh', 'hosts': ['111'], 'forks': 5},
+    ]
+
+
+def test_plan_shards_by_group_keeps_unknown_targets():
+    inventory = parse_inventory(CHILDREN_INVENTORY)
+    shards = plan_shards(inventory, ['lab1', 'ghost'], 'group', fork_budgets={})
+    assert [(shard['name'], shard['hosts']) for shard in shards] == [('lab1', ['111']), ('ungrouped', ['ghost'])]
+
+
+def test_target_connections_use_inherited_connection_vars():
+    inventory = parse_inventory(CHILDREN_INVENTORY)
+    assert target_connections(inventory, ['lab7']) == {'winrm': 3}
+    assert target_connections(inventory, ['lab1', 'ghost']) == {'ssh': 2}
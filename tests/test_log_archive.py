@@ -0,0 +1,80 @@
+"""Tests for the block-compressed log archive"""
+
+import pytest
+
+from interface.api.log_archive import LogArchive
+from interface.api.output_buffer import format_log_line
+
+
+LINES = [f"line {number}" for number in range(10)]
+
+
+def write_log(logs_dir, execution_id, lines=LINES):
+    path = logs_dir / f"{execution_id}.log"
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for number, line in enumerate(lines):
+            stream = 'stderr' if number % 3 == 0 else 'stdout'
+            f.write(format_log_line(line + '\n', stream, 1000.0 + number))
+    return path
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = LogArchive(tmp_path, retention_days=0, max_bytes=0, block_lines=4)
+    write_log(tmp_path, 'run')
+    assert archive.archive('run')
+    return archive
+
+
+def test_archive_replaces_plain_log(archive, tmp_path):
+    assert not (tmp_path / 'run.log').exists()
+    assert archive.has_archive('run')
+    assert archive.archived_ids() == ['run']
+    records = archive.read_records('run')
+    assert records['lines'] == [line + '\n' for line in LINES]
+    assert records['streams'][:4] == ['stderr', 'stdout', 'stdout', 'stderr']
+    assert records['timestamps'][9] == 1009.0
+    assert records['next_offset'] == records['total_lines'] == 10
+
+
+@pytest.mark.parametrize('since,limit', [(0, 4), (2, 5), (3, 2), (4, 4), (5, None), (7, 100), (9, 1), (10, 5)])
+def test_read_records_across_block_boundaries(archive, since, limit):
+    records = archive.read_records('run', since=since, limit=limit)
+    end = 10 if limit is None else min(10, since + limit)
+    assert records['lines'] == [line + '\n' for line in LINES[since:end]]
+    assert records['next_offset'] == end
+    assert records['byte_offset'] == sum(len(line) + 1 for line in LINES[:end])
+
+
+def test_read_records_without_archive(tmp_path):
+    assert LogArchive(tmp_path, block_lines=4).read_records('missing') is None
+
+
+def test_rotate_skips_active_logs(tmp_path):
+    archive = LogArchive(tmp_path, retention_days=0, max_bytes=0, block_lines=4)
+    write_log(tmp_path, 'done')
+    write_log(tmp_path, 'live')
+    assert archive.rotate(active={'live'}) == 1
+    assert archive.has_archive('done')
+    assert (tmp_path / 'live.log').exists()
+
+
+def test_rotate_rechecks_active_for_every_log(tmp_path):
+    archive = LogArchive(tmp_path, retention_days=0, max_bytes=0, block_lines=4)
+    write_log(tmp_path, 'a')
+    write_log(tmp_path, 'b')
+
+    class StartsDuringRotation:
+        """Both runs are idle at first; whichever is checked first starts the other"""
+
+        def __init__(self):
+            self.running = set()
+
+        def __contains__(self, execution_id):
+            if not self.running:
+                self.running.add('b' if execution_id == 'a' else 'a')
+            return execution_id in self.running
+
+    assert archive.rotate(active=StartsDuringRotation()) == 1
+    assert len(archive.archived_ids()) == 1
+    assert len(list(tmp_path.glob('*.log'))) == 1
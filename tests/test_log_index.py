@@ -0,0 +1,100 @@
+"""Tests for output line classification and full-text log search"""
+
+import pytest
+
+from interface.api.database import Database
+from interface.api.execution_store import ExecutionStore
+from interface.api.log_index import LineClassifier, LogIndex, fts_query
+
+
+OUTPUT = [
+    "PLAY [lab1] *********",
+    "TASK [Gathering Facts] *********",
+    "ok: [111]",
+    "fatal: [112]: UNREACHABLE! => {\"msg\": \"timed out\"}",
+    "TASK [Update firefox] *********",
+    "changed: [111]",
+    "fatal: [113]: FAILED! => {\"msg\": \"disk full\"}",
+    "skipping: [114]",
+    "some detail line",
+    "PLAY RECAP *********",
+    "111 : ok=2 changed=1",
+]
+
+
+@pytest.mark.parametrize('text,query', [
+    ('disk full', '"disk" "full"'),
+    ('"disk full"', '"disk full"'),
+    ('fire*', '"fire"*'),
+    ('NOT OR AND', '"NOT" "OR" "AND"'),
+    ('host:111 (a', '"host:111" "(a"'),
+    ('say "hi', '"say" "hi"'),
+    ('a"b', '"a""b"'),
+    ('* ""', ''),
+])
+def test_fts_query_quotes_every_term(text, query):
+    assert fts_query(text) == query
+
+
+def test_classifier_tracks_task_host_and_result():
+    classifier = LineClassifier()
+    results = [classifier.classify(line) for line in OUTPUT]
+    assert results == [
+        (None, None, None),
+        (None, 'Gathering Facts', None),
+        ('111', 'Gathering Facts', 'ok'),
+        ('112', 'Gathering Facts', 'unreachable'),
+        (None, 'Update firefox', None),
+        ('111', 'Update firefox', 'changed'),
+        ('113', 'Update firefox', 'failed'),
+        ('114', 'Update firefox', 'skipped'),
+        (None, 'Update firefox', None),
+        (None, None, None),
+        (None, None, None),
+    ]
+
+
+def test_classifier_keeps_a_task_per_shard():
+    classifier = LineClassifier()
+    classifier.classify("[lab1] TASK [Install] *****")
+    classifier.classify("[winrm] TASK [Reboot] *****")
+    assert classifier.classify("[lab1] ok: [111]") == ('111', 'Install', 'ok')
+    assert classifier.classify("[winrm] changed: [211]") == ('211', 'Reboot', 'changed')
+    assert classifier.classify("unprefixed") == (None, 'Reboot', None)
+
+
+@pytest.fixture
+def index():
+    database = Database(':memory:')
+    index = LogIndex(database)
+    if not index.enabled:
+        pytest.skip("SQLite lacks FTS5")
+    ExecutionStore(database).save({
+        'id': 'run', 'playbook': 'site.yaml', 'status': 'failed', 'queued_at': '2024-01-01T00:00:00',
+        'attempt': 1, 'retries': 0, 'preflight': False,
+    })
+    index.index_lines('run', [(line + '\n', 'stdout') for line in OUTPUT])
+    return index
+
+
+def test_search_filters_by_text_host_task_and_result(index):
+    assert index.is_indexed('run')
+    items, more = index.search('disk full')
+    assert [(item['host'], item['task'], item['result']) for item in items] == [('113', 'Update firefox', 'failed')]
+    assert not more
+    assert [item['line_no'] for item in index.search(host='111')[0]] == [5, 2]
+    assert [item['line_no'] for item in index.search(task='firefox', result='skipped')[0]] == [7]
+    assert [item['line'] for item in index.search('UNREACH*')[0]] == [OUTPUT[3]]
+
+
+def test_search_treats_operators_literally(index):
+    assert index.search('NOT OR')[0] == []
+    assert index.search('"timed out" AND')[0] == []
+    with pytest.raises(ValueError):
+        index.search('""')
+
+
+def test_delete_removes_execution(index):
+    index.delete('run')
+    assert not index.is_indexed('run')
+    assert index.search('disk')[0] == []
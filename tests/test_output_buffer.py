@@ -0,0 +1,70 @@
+"""Tests for the output buffer and the log file record format"""
+
+import pytest
+
+from interface.api.log_archive import LogArchive
+from interface.api.output_buffer import OutputBuffer, format_log_line, parse_log_line
+
+
+# Partial chunks of an overlong line, mixed streams and an unterminated last line
+RECORDS = [
+    ('PLAY [lab1] ***\n', 'stdout'),
+    ('partial-no-newline', 'stdout'),
+    ('warning line\n', 'stderr'),
+    ('x' * 50, 'stdout'),
+    ('y' * 20 + '\n', 'stdout'),
+    ('ümlaut\n', 'stderr'),
+    ('\n', 'stdout'),
+    ('trailing stderr', 'stderr'),
+    ('last line without newline', 'stdout'),
+]
+
+
+@pytest.fixture
+def buffer():
+    buffer = OutputBuffer(chunk_lines=3)
+    for number, (line, stream) in enumerate(RECORDS):
+        buffer.append(line, stream=stream, timestamp=1000.0 + number)
+    return buffer
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / 'run.log'
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for number, (line, stream) in enumerate(RECORDS):
+            f.write(format_log_line(line, stream, 1000.0 + number))
+    return path
+
+
+def test_every_record_is_terminated():
+    assert format_log_line('partial', 'stdout', 1.0) == '1.000 o partial\n'
+    assert format_log_line('whole\n', 'stderr', 2.0) == '2.000 E whole\n'
+    assert parse_log_line('1.000 o partial\n') == ('partial', 'stdout', 1.0)
+    assert parse_log_line('2.000 e warn\n') == ('warn', 'stderr', 2.0)
+    assert parse_log_line('3.000 O whole\n') == ('whole\n', 'stdout', 3.0)
+
+
+def test_untagged_lines_parse_as_stdout():
+    assert parse_log_line('old style line\n') == ('old style line\n', 'stdout', None)
+
+
+def test_plain_log_round_trip(buffer, log_path):
+    with open(log_path, 'r', encoding='utf-8', newline='\n') as f:
+        parsed = [parse_log_line(raw) for raw in f]
+    lines, streams, timestamps, next_offset = buffer.read_records_since(0)
+    assert parsed == list(zip(lines, streams, timestamps))
+    assert [(line, stream) for line, stream, _ in parsed] == RECORDS
+    assert next_offset == len(RECORDS)
+
+
+@pytest.mark.parametrize('since,limit', [(0, None), (1, 2), (2, 3), (3, 3), (7, 5)])
+def test_archive_round_trip_keeps_cursors(buffer, log_path, tmp_path, since, limit):
+    archive = LogArchive(tmp_path, retention_days=0, max_bytes=0, block_lines=2)
+    assert archive.archive('run')
+    records = archive.read_records('run', since=since, limit=limit)
+    lines, streams, timestamps, next_offset = buffer.read_records_since(since, limit)
+    assert (records['lines'], records['streams'], records['timestamps']) == (lines, streams, timestamps)
+    assert records['next_offset'] == next_offset
+    assert records['total_lines'] == buffer.line_count
+    assert records['byte_offset'] == buffer.byte_offset(next_offset)
@@ -0,0 +1,136 @@
+"""Tests for pipeline step validation, ordering and execution"""
+
+import pytest
+
+from interface.api.database import Database
+from interface.api.pipeline import PipelineManager, PipelineStore, order_steps
+
+
+def step(name, *depends_on):
+    return {'name': name, 'playbook': f"{name}.yaml", 'depends_on': list(depends_on)}
+
+
+def test_dependencies_come_first():
+    steps = [step('power', 'firefox', 'defender'), step('firefox', 'clean'), step('defender', 'clean'), step('clean')]
+    ordered = order_steps(steps)
+    assert sorted(ordered) == ['clean', 'defender', 'firefox', 'power']
+    for item in steps:
+        for dep in item['depends_on']:
+            assert ordered.index(dep) < ordered.index(item['name'])
+
+
+def test_independent_steps_keep_their_order():
+    assert order_steps([step('b'), step('a'), {'name': 'c', 'playbook': 'c.yaml'}]) == ['b', 'a', 'c']
+
+
+@pytest.mark.parametrize('steps,cycle', [
+    ([step('a', 'a')], 'a -> a'),
+    ([step('a', 'b'), step('b', 'a')], 'a -> b -> a'),
+    ([step('start'), step('a', 'start', 'c'), step('b', 'a'), step('c', 'b')], 'a -> c -> b -> a'),
+])
+def test_cycles_are_rejected(steps, cycle):
+    with pytest.raises(ValueError, match=f"Dependency cycle: {cycle}$"):
+        order_steps(steps)
+
+
+def test_duplicate_and_unknown_steps_are_rejected():
+    with pytest.raises(ValueError, match='Duplicate step names: a'):
+        order_steps([step('a'), step('a')])
+    with pytest.raises(ValueError, match='Step a depends on unknown steps: missing'):
+        order_steps([step('a', 'missing')])
+
+
+class FakeRunner:
+    """Records the executions a pipeline queues; tests finish them by hand"""
+
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        self.executions = {}
+        self.launched = {}
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def execute_playbook(self, playbook, hosts=None, pipeline_step=None, **kwargs):
+        self.executions[pipeline_step] = {'status': 'pending', 'passed': []}
+        self.launched[pipeline_step] = hosts
+        return pipeline_step
+
+    def get_execution(self, execution_id):
+        return self.executions.get(execution_id)
+
+    def passed_hosts(self, execution_id):
+        return self.executions[execution_id]['passed']
+
+    def finish(self, execution_id, status, passed=()):
+        self.executions[execution_id].update(status=status, passed=list(passed))
+        for listener in self.listeners:
+            listener(execution_id, 'status', status)
+
+    def cancel_execution(self, execution_id):
+        self.finish(execution_id, 'cancelled')
+        return True
+
+
+@pytest.fixture
+def runner(tmp_path):
+    for name in ('clean', 'firefox', 'defender', 'power'):
+        (tmp_path / f"{name}.yaml").write_text('- hosts: "{{ local }}"\n')
+    return FakeRunner(tmp_path)
+
+
+@pytest.fixture
+def manager(runner):
+    return PipelineManager(runner, PipelineStore(Database(':memory:')))
+
+
+WINDOW = [step('clean'), step('firefox', 'clean'), step('defender', 'clean'), step('power', 'firefox', 'defender')]
+
+
+def statuses(manager, pipeline_id):
+    return {item['name']: item['status'] for item in manager.get_pipeline(pipeline_id)['steps']}
+
+
+def test_dependent_steps_run_on_the_hosts_that_passed(manager, runner):
+    pipeline_id = manager.create_pipeline(WINDOW, hosts=['lab1'])
+    assert runner.launched == {'clean': ['lab1']}
+    runner.finish('clean', 'success', ['111', '112', '113'])
+    assert runner.launched['firefox'] == runner.launched['defender'] == ['111', '112', '113']
+    runner.finish('firefox', 'failed', ['111', '112'])
+    assert 'power' not in runner.launched
+    runner.finish('defender', 'success', ['112', '113'])
+    assert runner.launched['power'] == ['112']
+    runner.finish('power', 'success', ['112'])
+    pipeline = manager.get_pipeline(pipeline_id)
+    assert pipeline['status'] == 'failed'
+    assert pipeline['finished_at'] is not None
+
+
+def test_steps_are_skipped_when_no_host_passed(manager, runner):
+    pipeline_id = manager.create_pipeline(WINDOW, hosts=['lab1'])
+    runner.finish('clean', 'failed')
+    assert statuses(manager, pipeline_id) == {
+        'clean': 'failed', 'firefox': 'skipped', 'defender': 'skipped', 'power': 'skipped'
+    }
+    assert list(runner.launched) == ['clean']
+    assert manager.get_pipeline(pipeline_id)['status'] == 'failed'
+
+
+def test_cancel_stops_running_and_waiting_steps(manager, runner):
+    pipeline_id = manager.create_pipeline(WINDOW, hosts=['lab1'])
+    runner.finish('clean', 'success', ['111'])
+    runner.finish('firefox', 'success', ['111'])
+    assert manager.cancel_pipeline(pipeline_id)
+    assert statuses(manager, pipeline_id) == {
+        'clean': 'success', 'firefox': 'success', 'defender': 'cancelled', 'power': 'cancelled'
+    }
+    assert runner.executions['defender']['status'] == 'cancelled'
+    assert 'power' not in runner.launched
+    assert manager.get_pipeline(pipeline_id)['status'] == 'cancelled'
+    assert not manager.cancel_pipeline(pipeline_id)
+
+
+def test_pipelines_need_hosts(manager):
+    with pytest.raises(ValueError, match='needs target hosts'):
+        manager.create_pipeline(WINDOW)
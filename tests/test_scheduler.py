@@ -0,0 +1,112 @@
+"""Tests for the bounded execution scheduler"""
+
+import pytest
+
+from interface.api.scheduler import ExecutionScheduler, parse_group_limits
+
+
+@pytest.fixture
+def started():
+    return []
+
+
+def make_scheduler(started, max_concurrent=2, group_limits=None, default_group_limit=1):
+    return ExecutionScheduler(
+        started.append,
+        max_concurrent=max_concurrent,
+        group_limits=group_limits or {},
+        default_group_limit=default_group_limit
+    )
+
+
+def test_parse_group_limits_skips_invalid_items():
+    assert parse_group_limits('lab1=1, lab2=3,broken,lab3=x') == {'lab1': 1, 'lab2': 3}
+    assert parse_group_limits(None) == {}
+
+
+def test_global_cap_and_release(started):
+    scheduler = make_scheduler(started, max_concurrent=2, default_group_limit=5)
+    for name in ('a', 'b', 'c'):
+        scheduler.submit(name, 'site.yaml', groups={'lab1'})
+    assert started == ['a', 'b']
+    assert scheduler.pending_count == 1
+    scheduler.release('a')
+    assert started == ['a', 'b', 'c']
+
+
+def test_priorities_order_the_queue(started):
+    scheduler = make_scheduler(started, max_concurrent=1, default_group_limit=5)
+    scheduler.submit('running', 'site.yaml')
+    scheduler.submit('low', 'site.yaml', priority='low')
+    scheduler.submit('normal', 'site.yaml')
+    scheduler.submit('high', 'site.yaml', priority='high')
+    assert scheduler.queue_position('high') == 1
+    assert scheduler.queue_position('low') == 3
+    scheduler.release('running')
+    scheduler.release('high')
+    scheduler.release('normal')
+    assert started == ['running', 'high', 'normal', 'low']
+
+
+def test_busy_group_does_not_block_other_groups(started):
+    scheduler = make_scheduler(started, max_concurrent=3, group_limits={'lab2': 2})
+    scheduler.submit('a', 'site.yaml', groups={'lab1'})
+    scheduler.submit('b', 'site.yaml', groups={'lab1'})
+    scheduler.submit('c', 'site.yaml', groups={'lab2'})
+    scheduler.submit('d', 'site.yaml', groups={'lab2'})
+    assert started == ['a', 'c', 'd']
+    assert scheduler.is_pending('b')
+
+
+def test_all_hosts_runs_contend_with_every_group(started):
+    scheduler = make_scheduler(started, max_concurrent=5)
+    scheduler.submit('lab1', 'site.yaml', groups={'lab1'})
+    scheduler.submit('all', 'site.yaml', groups={'all'})
+    scheduler.submit('lab2', 'site.yaml', groups={'lab2'})
+    assert started == ['lab1', 'lab2']
+    scheduler.release('lab1')
+    assert started == ['lab1', 'lab2']
+    scheduler.release('lab2')
+    assert started == ['lab1', 'lab2', 'all']
+    scheduler.submit('later', 'site.yaml', groups={'lab2'})
+    assert scheduler.is_pending('later')
+
+
+def test_executions_of_one_owner_share_a_group_slot(started):
+    scheduler = make_scheduler(started, max_concurrent=5)
+    scheduler.submit('step1', 'a.yaml', groups={'lab1'}, owner='pipeline')
+    scheduler.submit('other', 'b.yaml', groups={'lab1'})
+    scheduler.submit('step2', 'c.yaml', groups={'lab1'}, owner='pipeline')
+    assert started == ['step1', 'step2']
+    scheduler.release('step1')
+    assert scheduler.is_pending('other')
+    scheduler.release('step2')
+    assert started == ['step1', 'step2', 'other']
+
+
+def test_after_waits_for_the_other_execution(started):
+    scheduler = make_scheduler(started, max_concurrent=2, default_group_limit=5)
+    scheduler.submit('first', 'site.yaml')
+    scheduler.submit('second', 'site.yaml', after={'first'})
+    assert started == ['first']
+    scheduler.release('first')
+    assert started == ['first', 'second']
+
+
+def test_cancel_pending_dispatches_entries_waiting_on_it(started):
+    scheduler = make_scheduler(started, max_concurrent=2, default_group_limit=5)
+    scheduler.submit('gate', 'site.yaml')
+    scheduler.submit('step1', 'site.yaml', after={'gate'})
+    scheduler.submit('step2', 'site.yaml', after={'step1'})
+    assert started == ['gate']
+
+    assert scheduler.cancel('step1') is True
+    assert started == ['gate', 'step2']
+    assert scheduler.cancel('step1') is False
+
+
+def test_cancel_running_execution_is_refused(started):
+    scheduler = make_scheduler(started)
+    scheduler.submit('a', 'site.yaml')
+    assert scheduler.cancel('a') is False
+    assert scheduler.running_count == 1